@@ -0,0 +1,188 @@
+"""
+Journal des modifications (table journal_modifications) : flux de deltas des listes /general.
+
+Chaque écriture ajoute une ligne (table, clé, "upsert" | "delete") numérotée par une
+version croissante, dans la transaction d'écriture :
+- écritures ORM (routes /write) : écouteur after_flush de la session
+- écritures en masse (INSERT Core) : appel explicite à record_changes
+
+Un rechargement en masse (db_seed) ajoute une ligne "reload" par table (clé "*") :
+la version avance sans lister les clés, et un delta qui couvre cette ligne renvoie
+toute la table (resynchronisation complète, "full": true).
+
+Une région paire synchronise une liste avec ?since=<version> : elle ne reçoit que les
+lignes ajoutées, modifiées ou supprimées depuis, et la version à demander la fois suivante.
+
+Sur PostgreSQL, les versions sont attribuées à l'insertion mais visibles au commit : une
+transaction lente peut valider la version N après qu'un lecteur a déjà renvoyé N+1.
+changes_since renvoie donc aussi les changements journalisés dans les SAFETY_WINDOW
+précédant `since` (déjà envoyés pour la plupart : réenvoi sans effet, les lignes sont
+renvoyées dans leur état courant). Une écriture dont la transaction reste ouverte plus
+longtemps que la fenêtre après son insertion dans le journal peut encore être manquée.
+SQLite sérialise les écritures : l'ordre des versions y est celui des commits.
+
+Après chaque commit, les fonctions enregistrées par on_commit reçoivent l'ensemble des
+tables modifiées (ex : invalidation du cache des réponses).
+"""
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+import sqlalchemy as sa
+from sqlalchemy import event, inspect
+from .db_connect import db
+from .db_tables import Personnel, Article, OperationCommerciale, Formation, Surveillance, Modification
+
+journal = Modification.__table__
+
+# Tables exposées par les listes /general
+TRACKED_TABLES = {
+    model.__tablename__ for model in (Personnel, Article, OperationCommerciale, Formation, Surveillance)
+}
+
+UPSERT, DELETE, RELOAD = "upsert", "delete", "reload"
+
+# Chevauchement des deltas sur PostgreSQL (durée maximale écriture -> commit couverte)
+SAFETY_WINDOW = timedelta(seconds=int(os.getenv("DELTA_SAFETY_WINDOW_S", "60")))
+
+_commit_hooks = []  # fonctions (tables modifiées) appelées après chaque commit
+
+
+def on_commit(hook):
+    """
+    Enregistre `hook(tables)`, appelé après chaque commit qui a modifié des tables suivies.
+    """
+    _commit_hooks.append(hook)
+    return hook
+
+
+def parse_since(value):
+    """
+    ?since= : numéro de version (entier) ou date ISO 8601 (convertie en UTC sans fuseau).
+    Lève ValueError si la valeur n'est ni l'un ni l'autre.
+    """
+    if value.isdigit():
+        return int(value)
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def record_changes(conn, table_name, keys, operation=UPSERT):
+    """
+    Ajoute au journal, dans la transaction de `conn`, une ligne par clé modifiée.
+    """
+    params = [{"table_name": table_name, "cle": str(key), "operation": operation} for key in keys]
+    if params:
+        conn.execute(journal.insert(), params)
+        db.session.info.setdefault("tables_modifiees", set()).add(table_name)
+
+
+def current_version(conn):
+    """
+    Dernière version du journal (0 s'il est vide).
+    """
+    return conn.execute(sa.select(sa.func.coalesce(sa.func.max(journal.c.version), 0))).scalar()
+
+
+def last_change(conn, tables):
+    """
+    Dernière modification journalisée d'une des `tables`.
+
+    Returns:
+        (version, date UTC sans fuseau), ou (0, None) si aucune modification n'est journalisée
+    """
+    latest = sa.select(sa.func.max(journal.c.version)).where(journal.c.table_name.in_(tables)).scalar_subquery()
+    row = conn.execute(
+        sa.select(journal.c.version, journal.c.date_modification).where(journal.c.version == latest)
+    ).first()
+    return tuple(row) if row else (0, None)
+
+
+def _window():
+    return SAFETY_WINDOW if db.engine.dialect.name == "postgresql" else timedelta(0)
+
+
+def changes_since(conn, table_name, since, until, window=None):
+    """
+    Dernière opération de chaque clé de `table_name` modifiée après `since`
+    (version ou date) et jusqu'à la version `until` incluse, plus celles journalisées
+    dans la fenêtre `window` qui précède `since` (défaut : SAFETY_WINDOW sur PostgreSQL,
+    aucune sur SQLite).
+
+    Returns:
+        (clés ajoutées ou modifiées, clés supprimées), en texte ; None si la table a été
+        rechargée en masse après `since` (clés non journalisées : tout renvoyer)
+    """
+    reloaded = conn.execute(
+        sa.select(journal.c.version).where(
+            journal.c.table_name == table_name, journal.c.operation == RELOAD, journal.c.version <= until,
+            journal.c.version > since if isinstance(since, int) else journal.c.date_modification > since,
+        ).limit(1)
+    ).first()
+    if reloaded is not None:
+        return None
+
+    window = _window() if window is None else window
+    if isinstance(since, int):
+        after = journal.c.version > since
+        if window:
+            moment = conn.execute(sa.select(journal.c.date_modification).where(journal.c.version == since)).scalar()
+            if moment is not None:
+                after = sa.or_(after, journal.c.date_modification >= moment - window)
+    else:
+        after = journal.c.date_modification > since - window
+    rows = conn.execute(
+        sa.select(journal.c.cle, journal.c.operation)
+        .where(journal.c.table_name == table_name, after, journal.c.version <= until)
+        .order_by(journal.c.version)
+    )
+    last = {cle: operation for cle, operation in rows}
+    upserted = [cle for cle, operation in last.items() if operation == UPSERT]
+    deleted = [cle for cle, operation in last.items() if operation == DELETE]
+    return upserted, deleted
+
+
+# -----------------------------
+# Écritures ORM
+# -----------------------------
+def _key(obj):
+    return inspect(obj).mapper.primary_key_from_instance(obj)[0]
+
+
+@event.listens_for(db.session, "after_flush")
+def _record_flush(session, flush_context):
+    """
+    Journalise les ajouts, modifications et suppressions du flush, dans la même transaction.
+    """
+    changes = defaultdict(list)  # (table, opération) -> clés
+    for obj in session.new:
+        if obj.__tablename__ in TRACKED_TABLES:
+            changes[(obj.__tablename__, UPSERT)].append(_key(obj))
+    for obj in session.dirty:
+        if obj.__tablename__ in TRACKED_TABLES and session.is_modified(obj, include_collections=False):
+            changes[(obj.__tablename__, UPSERT)].append(_key(obj))
+    for obj in session.deleted:
+        if obj.__tablename__ in TRACKED_TABLES:
+            changes[(obj.__tablename__, DELETE)].append(_key(obj))
+
+    conn = session.connection()
+    for (table_name, operation), keys in changes.items():
+        record_changes(conn, table_name, keys, operation)
+
+
+@event.listens_for(db.session, "after_commit")
+def _notify_commit(session):
+    tables = session.info.pop("tables_modifiees", None)
+    if not tables:
+        return
+    for hook in _commit_hooks:
+        try:
+            hook(tables)
+        except Exception as e:
+            print(f"Erreur après commit ({hook.__name__}) : {e}")
+
+
+@event.listens_for(db.session, "after_rollback")
+def _forget_changes(session):
+    session.info.pop("tables_modifiees", None)
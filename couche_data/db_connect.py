@@ -3,17 +3,25 @@ from flask_sqlalchemy import SQLAlchemy
 from dotenv import load_dotenv
 import os
 from flask_cors import CORS
+from .db_engine import configure_engine, engine_options
 
 load_dotenv()
 db = SQLAlchemy()
 
-def create_app():
+def create_app(statement_timeout=None):
+    """
+    Application Flask reliée à DATABASE_URL ; pool et timeouts : voir db_engine.py.
+    statement_timeout (ms) remplace DB_STATEMENT_TIMEOUT_MS (0 pour les scripts longs).
+    """
     app = Flask(__name__)
 
     CORS(app)
     app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv("DATABASE_URL")
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(os.getenv("DATABASE_URL"), statement_timeout)
 
     db.init_app(app)
+    with app.app_context():
+        configure_engine(db.engine, statement_timeout)
 
     return app
@@ -1,12 +1,12 @@
-
 from couche_data.db_connect import create_app, db
+from couche_data.db_migrate import upgrade
 import couche_data.db_tables
 
 # -----------------------------
-# Create all tables
+# Create all tables (migrations versionnées jusqu'à la dernière version)
 # -----------------------------
 app = create_app()
 
 with app.app_context():
-    db.create_all()
+    upgrade(db.engine)
     print("✅ Les tables du TP – région BRESIL ont été créées avec succès !")
@@ -1,5 +1,6 @@
 # clear_db.py
 from couche_data.db_connect import create_app, db
+from couche_data.db_migrate import schema_version
 
 app = create_app()
 
@@ -8,6 +9,7 @@ with app.app_context():
     
     # Drop all tables
     db.drop_all()
+    schema_version.drop(db.engine, checkfirst=True)  # la base repart de la version 0
     print("🗑️ Toutes les tables ont été supprimées.")
 
     # Optional: commit if needed (usually drop_all commits automatically)
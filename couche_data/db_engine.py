@@ -0,0 +1,171 @@
+"""
+Configuration du moteur SQLAlchemy (pool de connexions, timeouts), lue dans l'environnement.
+
+PostgreSQL, connexion directe (défaut) :
+- DB_POOL_SIZE (5) connexions gardées ouvertes par worker, DB_MAX_OVERFLOW (10) en plus au pic
+- DB_POOL_TIMEOUT (30 s) : attente maximale d'une connexion libre avant erreur
+- DB_POOL_RECYCLE (300 s) : une connexion plus ancienne est rouverte (coupures de Render au repos)
+- DB_POOL_PRE_PING (1) : connexion testée avant usage, remplacée si le serveur l'a fermée
+
+Avec plusieurs workers gunicorn, le total par instance vaut
+WEB_CONCURRENCY × (DB_POOL_SIZE + DB_MAX_OVERFLOW) : à garder sous max_connections.
+
+DB_PGBOUNCER=1 (PgBouncer en mode transaction) : pas de pool côté application
+(NullPool, PgBouncer s'en charge) et timeouts posés par SET LOCAL à chaque transaction,
+PgBouncer refusant le paramètre de démarrage "options".
+
+Timeouts (ms, 0 = désactivé) : DB_STATEMENT_TIMEOUT_MS (30000), DB_LOCK_TIMEOUT_MS (5000).
+Les scripts longs (db_seed, db_migrate, db_stats) désactivent le statement_timeout.
+
+Le temps d'attente de chaque emprunt au pool est mesuré (pool_snapshot).
+"""
+import os
+import threading
+import time
+from collections import deque
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool, QueuePool
+
+_engines = []  # moteurs créés dans ce processus (libérés après un fork)
+
+
+class PoolMetrics:
+    """
+    Temps d'attente des emprunts au pool (ms) : nombre, moyenne, p95 et maximum
+    sur les `window` derniers, et nombre d'emprunts abandonnés (DB_POOL_TIMEOUT dépassé).
+    """
+
+    def __init__(self, window=1000):
+        self._waits = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.max_wait_ms = 0.0
+
+    def record(self, wait_ms, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self._waits.append(wait_ms)
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+    def snapshot(self):
+        with self._lock:
+            waits = sorted(self._waits)
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_ms": {
+                "mean": round(sum(waits) / len(waits), 3) if waits else None,
+                "p95": round(waits[int(0.95 * (len(waits) - 1))], 3) if waits else None,
+                "max": round(self.max_wait_ms, 3),
+            },
+        }
+
+
+pool_metrics = PoolMetrics()
+
+
+class TimedQueuePool(QueuePool):
+    """
+    QueuePool qui mesure l'attente de chaque emprunt (connexion libre, nouvelle
+    connexion ou attente d'une connexion rendue).
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.record((time.perf_counter() - start) * 1000, timed_out=True)
+            raise
+        pool_metrics.record((time.perf_counter() - start) * 1000)
+        return connection
+
+
+def _env_int(name, default):
+    return int(os.getenv(name, default))
+
+
+def _is_postgres(url):
+    return bool(url) and url.startswith(("postgresql", "postgres"))
+
+
+def _pgbouncer():
+    return os.getenv("DB_PGBOUNCER") == "1"
+
+
+def _timeouts(statement_timeout):
+    if statement_timeout is None:
+        statement_timeout = _env_int("DB_STATEMENT_TIMEOUT_MS", 30000)
+    return {"statement_timeout": statement_timeout, "lock_timeout": _env_int("DB_LOCK_TIMEOUT_MS", 5000)}
+
+
+def engine_options(url, statement_timeout=None):
+    """
+    Options de create_engine (SQLALCHEMY_ENGINE_OPTIONS) pour `url`.
+
+    Args:
+        url: URL de la base (DATABASE_URL)
+        statement_timeout: en ms ; None = DB_STATEMENT_TIMEOUT_MS, 0 = désactivé
+    """
+    if not _is_postgres(url):
+        return {}  # SQLite : pool choisi par Flask-SQLAlchemy
+    if _pgbouncer():
+        return {"poolclass": NullPool}
+
+    options = " ".join(f"-c {name}={value}" for name, value in _timeouts(statement_timeout).items())
+    return {
+        "poolclass": TimedQueuePool,
+        "pool_size": _env_int("DB_POOL_SIZE", 5),
+        "max_overflow": _env_int("DB_MAX_OVERFLOW", 10),
+        "pool_timeout": _env_int("DB_POOL_TIMEOUT", 30),
+        "pool_recycle": _env_int("DB_POOL_RECYCLE", 300),
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "1") == "1",
+        "connect_args": {"options": options},
+    }
+
+
+def configure_engine(engine, statement_timeout=None):
+    """
+    Enregistre `engine` (libération après fork) et, en mode PgBouncer, pose les
+    timeouts au début de chaque transaction.
+    """
+    _engines.append(engine)
+    if not (_is_postgres(engine.url.drivername) and _pgbouncer()):
+        return
+
+    statements = [f"SET LOCAL {name} = {int(value)}" for name, value in _timeouts(statement_timeout).items()]
+
+    @event.listens_for(engine, "begin")
+    def _set_timeouts(conn):
+        for statement in statements:
+            conn.exec_driver_sql(statement)
+
+
+def dispose_engines():
+    """
+    À appeler dans un processus fils après un fork (gunicorn post_fork) : les connexions
+    héritées du parent sont oubliées sans être fermées (elles restent au parent).
+    """
+    for engine in _engines:
+        engine.dispose(close=False)
+
+
+def pool_snapshot(engine):
+    """
+    État du pool de `engine` et temps d'attente des emprunts.
+    """
+    pool = engine.pool
+    report = {"pool": type(pool).__name__, **pool_metrics.snapshot()}
+    if isinstance(pool, QueuePool):
+        report.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+        })
+    return report
@@ -0,0 +1,117 @@
+"""
+Migrations versionnées du schéma.
+
+La version appliquée est enregistrée dans la table schema_version ; chaque
+migration de couche_data/migrations s'exécute dans sa propre transaction.
+
+    python -m couche_data.db_migrate              # jusqu'à la dernière version
+    python -m couche_data.db_migrate upgrade --to 1
+    python -m couche_data.db_migrate downgrade --to 1
+    python -m couche_data.db_migrate current
+"""
+import argparse
+import importlib
+import pkgutil
+from datetime import datetime, timezone
+import sqlalchemy as sa
+from couche_data import migrations
+from couche_data.db_connect import create_app, db
+
+# -----------------------------
+# Table de suivi des versions
+# -----------------------------
+version_metadata = sa.MetaData()
+schema_version = sa.Table(
+    "schema_version", version_metadata,
+    sa.Column("version", sa.Integer, primary_key=True),
+    sa.Column("description", sa.String, nullable=False),
+    sa.Column("applied_at", sa.DateTime, nullable=False),
+)
+
+
+def load_migrations():
+    """
+    Modules de migration triés par VERSION.
+    """
+    modules = [
+        importlib.import_module(f"{migrations.__name__}.{info.name}")
+        for info in pkgutil.iter_modules(migrations.__path__)
+        if info.name.startswith("v")
+    ]
+    modules.sort(key=lambda m: m.VERSION)
+    versions = [m.VERSION for m in modules]
+    if len(set(versions)) != len(versions):
+        raise RuntimeError(f"Versions de migration en double : {versions}")
+    return modules
+
+
+def current_version(engine):
+    """
+    Dernière version appliquée (0 pour une base jamais migrée).
+    """
+    with engine.begin() as conn:
+        version_metadata.create_all(conn, checkfirst=True)
+        return conn.execute(sa.select(sa.func.max(schema_version.c.version))).scalar() or 0
+
+
+def upgrade(engine, target=None):
+    """
+    Applique les migrations de version > actuelle et <= target (toutes si None).
+
+    Returns:
+        liste des versions appliquées
+    """
+    current = current_version(engine)
+    applied = []
+    for module in load_migrations():
+        if module.VERSION <= current or (target is not None and module.VERSION > target):
+            continue
+        with engine.begin() as conn:
+            module.upgrade(conn)
+            conn.execute(schema_version.insert().values(
+                version=module.VERSION,
+                description=module.DESCRIPTION,
+                applied_at=datetime.now(timezone.utc).replace(tzinfo=None),
+            ))
+        print(f"⬆️  {module.VERSION:04d} {module.DESCRIPTION}")
+        applied.append(module.VERSION)
+    return applied
+
+
+def downgrade(engine, target):
+    """
+    Annule les migrations de version > target, de la plus récente à la plus ancienne.
+
+    Returns:
+        liste des versions annulées
+    """
+    current = current_version(engine)
+    reverted = []
+    for module in reversed(load_migrations()):
+        if module.VERSION > current or module.VERSION <= target:
+            continue
+        with engine.begin() as conn:
+            module.downgrade(conn)
+            conn.execute(schema_version.delete().where(schema_version.c.version == module.VERSION))
+        print(f"⬇️  {module.VERSION:04d} {module.DESCRIPTION}")
+        reverted.append(module.VERSION)
+    return reverted
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Migrations du schéma (région Brésil).")
+    parser.add_argument("command", nargs="?", default="upgrade", choices=["upgrade", "downgrade", "current"])
+    parser.add_argument("--to", type=int, help="version cible (upgrade : dernière par défaut, downgrade : 0)")
+    args = parser.parse_args(argv)
+
+    app = create_app(statement_timeout=0)  # chargement long : pas de statement_timeout
+    with app.app_context():
+        if args.command == "upgrade":
+            upgrade(db.engine, args.to)
+        elif args.command == "downgrade":
+            downgrade(db.engine, args.to or 0)
+        print(f"✅ Version du schéma : {current_version(db.engine)}")
+
+
+if __name__ == "__main__":
+    main()
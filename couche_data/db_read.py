@@ -0,0 +1,133 @@
+from sqlalchemy import Date, Enum, String, func, type_coerce
+from .db_connect import db
+from .db_tables import (
+    Personnel, Article, OperationCommerciale, Formation, Surveillance,
+    EtatPersonnel, ServicePersonnel, TypeOperation, EtatEmballage, DetectionForme
+)
+
+# -----------------------------
+# Tables de correspondance des enums : nom stocké en base -> valeur exposée par l'API
+# -----------------------------
+ENUM_LOOKUPS = {
+    enum_cls: {member.name: member.value for member in enum_cls}
+    for enum_cls in (EtatPersonnel, ServicePersonnel, TypeOperation, EtatEmballage, DetectionForme)
+}
+
+
+def _isoformat(value):
+    return value.isoformat() if value is not None else None
+
+
+class ReadModel:
+    """
+    Lecture allégée d'une table pour les routes GET : seules les colonnes exposées
+    sont sélectionnées et les lignes restent des tuples (pas d'objets ORM, pas
+    d'identity map). Les enums sont lus sous leur nom brut et traduits par
+    ENUM_LOOKUPS, les dates converties en ISO.
+
+    Args:
+        model: modèle SQLAlchemy de la table principale
+        key: colonne de clé primaire (pagination)
+        fields: liste de (nom JSON, colonne ou expression)
+        joins: liste de (modèle, condition) en jointure externe
+    """
+
+    def __init__(self, model, key, fields, joins=()):
+        self.model = model
+        self.key = key
+        self.joins = joins
+        self.names = [name for name, _ in fields]
+        self.columns = []
+        self.converters = []  # (index, fonction) pour les seules colonnes à convertir
+
+        for index, (name, column) in enumerate(fields):
+            column_type = getattr(column, "type", None)
+            if isinstance(column_type, Enum) and column_type.enum_class is not None:
+                self.columns.append(type_coerce(column, String).label(name))
+                self.converters.append((index, ENUM_LOOKUPS[column_type.enum_class].get))
+            elif isinstance(column_type, Date):
+                self.columns.append(column.label(name))
+                self.converters.append((index, _isoformat))
+            else:
+                self.columns.append(column.label(name))
+
+    def query(self):
+        """
+        Requête des colonnes projetées (Query renvoyant des tuples).
+        """
+        query = db.session.query(*self.columns).select_from(self.model)
+        for target, on in self.joins:
+            query = query.outerjoin(target, on)
+        return query
+
+    def serialize(self, row):
+        """
+        Tuple -> dict prêt pour le JSON.
+        """
+        if not self.converters:
+            return dict(zip(self.names, row))
+        values = list(row)
+        for index, convert in self.converters:
+            values[index] = convert(values[index])
+        return dict(zip(self.names, values))
+
+
+_responsable_name = func.coalesce(Personnel.nom_prenom, "Inconnu")
+
+# -----------------------------
+# Projections utilisées par /general
+# -----------------------------
+READ_MODELS = {
+    "personnel": ReadModel(Personnel, Personnel.id, [
+        ("id", Personnel.id),
+        ("nom_prenom", Personnel.nom_prenom),
+        ("etat", Personnel.etat),
+        ("service", Personnel.service),
+        ("frequence_cardiaque", Personnel.frequence_cardiaque),
+        ("position", Personnel.position),
+        ("lat", Personnel.lat),
+        ("lon", Personnel.lon),
+    ]),
+    "articles": ReadModel(Article, Article.id, [
+        ("id", Article.id),
+        ("zone", Article.zone),
+        ("etat_emballage", Article.etat_emballage),
+        ("responsable_id", Article.responsable_id),
+        ("responsable_name", _responsable_name),
+        ("position", Article.position),
+        ("pos_x", Article.pos_x),
+        ("pos_y", Article.pos_y),
+        ("pos_z", Article.pos_z),
+        ("rotation", Article.rotation),
+        ("collisions", Article.collisions),
+    ], joins=[(Personnel, Article.responsable_id == Personnel.id)]),
+    "operations": ReadModel(OperationCommerciale, OperationCommerciale.id, [
+        ("id", OperationCommerciale.id),
+        ("type_op", OperationCommerciale.type_op),
+        ("responsable_id", OperationCommerciale.responsable_id),
+        ("responsable_name", _responsable_name),
+        ("marge", OperationCommerciale.marge),
+        ("km_parcourus", OperationCommerciale.km_parcourus),
+        ("mot_cle_responsable", OperationCommerciale.mot_cle_responsable),
+        ("mot_cle_client", OperationCommerciale.mot_cle_client),
+    ], joins=[(Personnel, OperationCommerciale.responsable_id == Personnel.id)]),
+    "formations": ReadModel(Formation, Formation.id, [
+        ("id", Formation.id),
+        ("nom_formation", Formation.nom_formation),
+        ("sujet", Formation.sujet),
+        ("date_formation", Formation.date_formation),
+        ("pourcentage_engagement", Formation.pourcentage_engagement),
+        ("pourcentage_satisfaction", Formation.pourcentage_satisfaction),
+        ("mot_cle_formateur", Formation.mot_cle_formateur),
+        ("mot_cle_personnel", Formation.mot_cle_personnel),
+    ]),
+    "surveillance": ReadModel(Surveillance, Surveillance.zone, [
+        ("zone", Surveillance.zone),
+        ("drones_actifs", Surveillance.drones_actifs),
+        ("drones_panne", Surveillance.drones_panne),
+        ("drones_rechargement", Surveillance.drones_rechargement),
+        ("detection_incendie", Surveillance.detection_incendie),
+        ("detection_forme", Surveillance.detection_forme),
+        ("audit_conformite", Surveillance.audit_conformite),
+    ]),
+}
@@ -0,0 +1,334 @@
+"""
+Génération de données de charge pour la région Brésil.
+
+Contrairement à db_insertion.py (quelques centaines d'objets ORM créés un par un),
+les lignes sont générées par paquets vectorisés (numpy) puis chargées :
+- PostgreSQL : COPY ... FROM STDIN (CSV en mémoire, un paquet à la fois)
+- autres bases (SQLite) : executemany sur le curseur DB-API
+
+Le résultat ne dépend que de --seed et --chunk-size.
+
+Avec --append, les lignes s'ajoutent à la base existante : identifiants générés après
+les existants, responsables tirés parmi le personnel existant et nouveau. Seules les
+tables données explicitement sont alors générées (toutes si aucune ne l'est).
+
+    python -m couche_data.db_seed --scale 50000 --seed 42
+    python -m couche_data.db_seed --operations 5000000 --articles 5000000 --append
+"""
+import argparse
+import io
+import time
+from datetime import date
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, select
+from couche_data.db_changes import RELOAD, TRACKED_TABLES, record_changes
+from couche_data.db_connect import create_app, db
+from couche_data.db_stats import rebuild
+from couche_data.db_tables import (
+    Personnel, OperationCommerciale, Article, Formation, Surveillance,
+    EtatPersonnel, ServicePersonnel, TypeOperation, EtatEmballage, DetectionForme
+)
+
+# -----------------------------
+# Volumes pour --scale 1 (ceux de db_insertion.py)
+# -----------------------------
+BASE_COUNTS = {
+    "personnel": 50,
+    "operations": 150,
+    "articles": 200,
+    "formations": 20,
+    "surveillance": 10,
+}
+DEFAULT_CHUNK_SIZE = 100_000
+DATE_REFERENCE = date(2025, 1, 1)  # dates de formation tirées dans les 1000 jours précédents
+ARTICLE_FIRST_ID = 1000
+
+# -----------------------------
+# Vocabulaire (remplace Faker, trop lent à cette échelle)
+# -----------------------------
+PRENOMS = np.array([
+    "Ana", "João", "Maria", "Pedro", "Lucas", "Juliana", "Gabriel", "Fernanda", "Rafael", "Camila",
+    "Bruno", "Larissa", "Thiago", "Beatriz", "Mateus", "Aline", "Felipe", "Carolina", "Gustavo", "Patrícia",
+])
+NOMS = np.array([
+    "Silva", "Santos", "Oliveira", "Souza", "Lima", "Pereira", "Ferreira", "Costa", "Rodrigues", "Almeida",
+    "Nascimento", "Carvalho", "Araújo", "Ribeiro", "Gomes", "Martins", "Rocha", "Barbosa", "Melo", "Cardoso",
+])
+MOTS = np.array([
+    "logística", "contrato", "entrega", "estoque", "cliente", "fornecedor", "preço", "qualidade",
+    "prazo", "rota", "pedido", "fatura", "desconto", "volume", "caminhão", "armazém",
+])
+FORMATIONS = np.array([
+    "Segurança no trabalho", "Gestão de estoque", "Atendimento ao cliente", "Excel avançado",
+    "Manutenção preventiva", "Liderança", "Cibersegurança", "Análise de dados", "Qualidade total",
+])
+
+# Les enums sont stockés sous leur nom
+ETATS = np.array([m.name for m in EtatPersonnel])
+SERVICES = np.array([m.name for m in ServicePersonnel])
+TYPES_OP = np.array([m.name for m in TypeOperation])
+EMBALLAGES = np.array([m.name for m in EtatEmballage])
+FORMES = np.array([m.name for m in DetectionForme])
+
+
+def personnel_ids(indices):
+    """
+    Identifiants déterministes du personnel : 0 -> BR0000000, 1 -> BR0000001, ...
+    """
+    return np.char.add("BR", np.char.zfill(np.asarray(indices).astype(str), 7))
+
+
+def _triplets(xyz):
+    """
+    Tableau (3, n) d'entiers -> chaînes "x,y,z".
+    """
+    xyz = xyz.astype(str)
+    return np.char.add(np.char.add(np.char.add(xyz[0], ","), np.char.add(xyz[1], ",")), xyz[2])
+
+
+# -----------------------------
+# Générateurs : (rng, début, nombre, volumes) -> DataFrame d'un paquet
+# -----------------------------
+def gen_personnel(rng, start, count, counts):
+    lat = rng.uniform(-33.7, 5.2, count).round(5)
+    lon = rng.uniform(-73.9, -34.8, count).round(5)
+    return pd.DataFrame({
+        "id": personnel_ids(np.arange(start, start + count)),
+        "nom_prenom": np.char.add(np.char.add(rng.choice(PRENOMS, count), " "), rng.choice(NOMS, count)),
+        "etat": rng.choice(ETATS, count),
+        "service": rng.choice(SERVICES, count),
+        "frequence_cardiaque": rng.integers(60, 111, count),
+        "position": np.char.add(np.char.add(lat.astype(str), ","), lon.astype(str)),
+        "lat": lat,
+        "lon": lon,
+    })
+
+
+def gen_operations(rng, start, count, counts):
+    return pd.DataFrame({
+        "type_op": rng.choice(TYPES_OP, count),
+        "responsable_id": personnel_ids(rng.integers(0, counts["personnel"], count)),
+        "marge": rng.uniform(200, 5000, count).round(2),
+        "km_parcourus": rng.uniform(5, 500, count).round(2),
+        "mot_cle_responsable": rng.choice(MOTS, count),
+        "mot_cle_client": rng.choice(MOTS, count),
+    })
+
+
+def gen_articles(rng, start, count, counts):
+    position = rng.integers(0, 11, size=(3, count))
+    return pd.DataFrame({
+        "id": np.arange(ARTICLE_FIRST_ID + start, ARTICLE_FIRST_ID + start + count),
+        "zone": rng.integers(1, 21, count),
+        "etat_emballage": rng.choice(EMBALLAGES, count),
+        "responsable_id": personnel_ids(rng.integers(0, counts["personnel"], count)),
+        "position": _triplets(position),
+        "rotation": _triplets(rng.integers(0, 361, size=(3, count))),
+        "collisions": rng.integers(0, 11, count),
+        "pos_x": position[0].astype(float),
+        "pos_y": position[1].astype(float),
+        "pos_z": position[2].astype(float),
+    })
+
+
+def gen_formations(rng, start, count, counts):
+    jours = rng.integers(0, 1001, count).astype("timedelta64[D]")
+    return pd.DataFrame({
+        "nom_formation": rng.choice(FORMATIONS, count),
+        "sujet": rng.choice(SERVICES, count),
+        "date_formation": (np.datetime64(DATE_REFERENCE) - jours).astype(str),
+        "pourcentage_engagement": rng.integers(50, 101, count).astype(float),
+        "pourcentage_satisfaction": rng.integers(50, 101, count).astype(float),
+        "mot_cle_formateur": rng.choice(MOTS, count),
+        "mot_cle_personnel": rng.choice(MOTS, count),
+    })
+
+
+def gen_surveillance(rng, start, count, counts):
+    return pd.DataFrame({
+        "zone": np.arange(start + 1, start + count + 1),
+        "drones_actifs": rng.integers(0, 6, count),
+        "drones_panne": rng.integers(0, 4, count),
+        "drones_rechargement": rng.integers(0, 4, count),
+        "detection_incendie": rng.random(count) < 0.5,
+        "detection_forme": rng.choice(FORMES, count),
+        "audit_conformite": rng.random(count) < 0.5,
+    })
+
+
+# Ordre de chargement (clés étrangères vers personnel)
+GENERATORS = [
+    ("personnel", Personnel, gen_personnel),
+    ("operations", OperationCommerciale, gen_operations),
+    ("articles", Article, gen_articles),
+    ("formations", Formation, gen_formations),
+    ("surveillance", Surveillance, gen_surveillance),
+]
+
+
+def generate_chunks(name, count, seed, chunk_size, counts, offset=0):
+    """
+    Paquets successifs d'une table ; chaque paquet a son propre générateur
+    (seed, table, numéro de paquet), ce qui rend le résultat reproductible.
+    `offset` : position de la première ligne générée (lignes déjà en base en mode ajout).
+    """
+    table_index = [g[0] for g in GENERATORS].index(name)
+    generator = GENERATORS[table_index][2]
+    for chunk_index, start in enumerate(range(0, count, chunk_size)):
+        rng = np.random.default_rng([seed, table_index, chunk_index])
+        yield generator(rng, offset + start, min(chunk_size, count - start), counts)
+
+
+def existing_offsets(conn):
+    """
+    Mode ajout : position de départ des tables à identifiants générés, après les lignes existantes.
+    """
+    last_personnel = conn.execute(
+        select(func.max(Personnel.id)).where(Personnel.id.like("BR%"))
+    ).scalar()
+    last_article = conn.execute(select(func.max(Article.id))).scalar()
+    last_zone = conn.execute(select(func.max(Surveillance.zone))).scalar()
+    return {
+        "personnel": int(last_personnel[2:]) + 1 if last_personnel else 0,
+        "articles": max(last_article + 1 - ARTICLE_FIRST_ID, 0) if last_article is not None else 0,
+        "surveillance": last_zone or 0,
+    }
+
+
+# -----------------------------
+# Chargement
+# -----------------------------
+def _copy_chunk(cursor, table, df):
+    """
+    PostgreSQL : COPY FROM STDIN d'un paquet sérialisé en CSV.
+    """
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table.name} ({', '.join(df.columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def _executemany_chunk(cursor, table, df, paramstyle):
+    """
+    Repli générique : executemany avec des valeurs Python natives.
+    """
+    marker = "?" if paramstyle == "qmark" else "%s"
+    sql = f"INSERT INTO {table.name} ({', '.join(df.columns)}) VALUES ({', '.join([marker] * len(df.columns))})"
+    cursor.executemany(sql, df.astype(object).to_numpy().tolist())
+
+
+def _reset_sequence(cursor, table):
+    """
+    Après un COPY avec identifiants explicites, recale la séquence PostgreSQL.
+    """
+    pk = list(table.primary_key.columns)[0].name
+    cursor.execute(
+        f"SELECT setval(pg_get_serial_sequence('{table.name}', '{pk}'), "
+        f"COALESCE((SELECT MAX({pk}) FROM {table.name}), 1))"
+    )
+
+
+def seed_database(counts, seed=0, chunk_size=DEFAULT_CHUNK_SIZE, reset=True):
+    """
+    Remplit la base de l'application courante (contexte Flask requis).
+
+    Args:
+        counts: {table: nombre de lignes} pour les clés de BASE_COUNTS
+        seed: graine des générateurs
+        chunk_size: lignes générées et envoyées par paquet
+        reset: supprime et recrée les tables avant le chargement
+
+    Returns:
+        {table: lignes insérées}
+    """
+    if reset:
+        db.drop_all()
+        db.create_all()
+        print("🧹 Tables réinitialisées…")
+        offsets = {}
+    else:
+        with db.engine.connect() as conn:
+            offsets = existing_offsets(conn)
+
+    # Responsables tirés parmi le personnel existant (BR...) et le nouveau
+    pool = {**counts, "personnel": offsets.get("personnel", 0) + counts.get("personnel", 0)}
+    if pool["personnel"] <= 0 and (counts.get("operations") or counts.get("articles")):
+        raise ValueError("Il faut au moins un personnel pour générer des opérations ou des articles")
+
+    use_copy = db.engine.dialect.name == "postgresql"
+    paramstyle = db.engine.dialect.paramstyle
+    inserted = {}
+
+    raw = db.engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        for name, model, _ in GENERATORS:
+            count = counts.get(name, 0)
+            table = model.__table__
+            start = time.perf_counter()
+            for df in generate_chunks(name, count, seed, chunk_size, pool, offsets.get(name, 0)):
+                if use_copy:
+                    _copy_chunk(cursor, table, df)
+                else:
+                    _executemany_chunk(cursor, table, df, paramstyle)
+            if use_copy and count and name in ("articles", "surveillance"):
+                _reset_sequence(cursor, table)
+            raw.commit()
+            inserted[name] = count
+            print(f"✅ {name} : {count:,} lignes en {time.perf_counter() - start:.1f} s")
+        cursor.close()
+    except Exception:
+        raw.rollback()
+        raise
+    finally:
+        raw.close()
+
+    # Le chargement contourne la session : compteurs statistiques recalculés d'un bloc,
+    # et une ligne "reload" par table rechargée dans le journal (nouvelle version, ETag changé)
+    with db.engine.begin() as conn:
+        rebuild(conn)
+        for name, model, _ in GENERATORS:
+            if model.__tablename__ in TRACKED_TABLES and (reset or inserted.get(name)):
+                record_changes(conn, model.__tablename__, ["*"], RELOAD)
+    print("📊 Statistiques : OK")
+
+    return inserted
+
+
+def parse_counts(args):
+    """
+    Volumes finaux : BASE_COUNTS × --scale, puis surcharges par table.
+    Avec --append et au moins une table explicite, les autres tables ne sont pas générées.
+    """
+    explicit = {name: getattr(args, name) for name in BASE_COUNTS if getattr(args, name) is not None}
+    if getattr(args, "append", False) and explicit:
+        return {name: explicit.get(name, 0) for name in BASE_COUNTS}
+
+    counts = {name: int(round(base * args.scale)) for name, base in BASE_COUNTS.items()}
+    counts.update(explicit)
+    if counts["personnel"] <= 0 and (counts["operations"] or counts["articles"]):
+        raise SystemExit("Il faut au moins un personnel pour générer des opérations ou des articles")
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Génère des données de charge (région Brésil).")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplie les volumes de base (50/150/200/20/10)")
+    for name in BASE_COUNTS:
+        parser.add_argument(f"--{name}", type=int, help=f"nombre exact de lignes pour {name}")
+    parser.add_argument("--seed", type=int, default=0, help="graine (résultat reproductible)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="lignes par paquet")
+    parser.add_argument("--append", action="store_true", help="ne pas réinitialiser les tables")
+    args = parser.parse_args(argv)
+
+    counts = parse_counts(args)
+    app = create_app(statement_timeout=0)  # chargement long : pas de statement_timeout
+    with app.app_context():
+        start = time.perf_counter()
+        inserted = seed_database(counts, seed=args.seed, chunk_size=args.chunk_size, reset=not args.append)
+        print(f"🏁 {sum(inserted.values()):,} lignes en {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
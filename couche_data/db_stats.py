@@ -0,0 +1,234 @@
+"""
+Compteurs statistiques matérialisés (table statistiques).
+
+Chaque ligne (nom, cle) -> valeur est tenue à jour dans la transaction d'écriture :
+- écritures ORM (routes /write) : écouteur after_flush de la session
+- écritures en masse (INSERT Core) : appel explicite à apply_deltas
+Les routes /general/stats lisent donc quelques lignes au lieu de parcourir les tables.
+
+Si un chargement contourne ces deux chemins (ex. SQL direct), `rebuild` recalcule
+tout et renvoie l'écart constaté :
+
+    python -m couche_data.db_stats rebuild
+"""
+import enum
+import sys
+from collections import defaultdict
+import sqlalchemy as sa
+from sqlalchemy import event, inspect
+from sqlalchemy.dialects import postgresql, sqlite
+from .db_connect import create_app, db
+from .db_tables import Personnel, Article, OperationCommerciale, Statistique
+
+statistiques = Statistique.__table__
+
+
+def _name(value):
+    """
+    Clé d'un compteur : nom du membre pour un enum, texte sinon.
+    """
+    if isinstance(value, enum.Enum):
+        return value.name
+    return "" if value is None else str(value)
+
+
+# -----------------------------
+# Contribution d'une ligne aux compteurs
+# -----------------------------
+def _personnel(row):
+    yield ("personnel", ""), 1
+    yield ("personnel_etat", _name(row.get("etat"))), 1
+
+
+def _articles(row):
+    yield ("articles_zone", _name(row.get("zone"))), 1
+    yield ("articles_etat", _name(row.get("etat_emballage"))), 1
+
+
+def _operations(row):
+    yield ("operations_type", _name(row.get("type_op"))), 1
+    yield ("operations_km", ""), row.get("km_parcourus") or 0
+    yield ("operations_marge", ""), row.get("marge") or 0
+
+
+CONTRIBUTIONS = {
+    Personnel.__tablename__: _personnel,
+    Article.__tablename__: _articles,
+    OperationCommerciale.__tablename__: _operations,
+}
+
+
+def collect_deltas(table_name, rows, sign=1, deltas=None):
+    """
+    Cumule les variations de compteurs dues à des lignes (dicts colonne -> valeur)
+    ajoutées (sign=1) ou retirées (sign=-1).
+    """
+    deltas = defaultdict(float) if deltas is None else deltas
+    contribution = CONTRIBUTIONS.get(table_name)
+    if contribution is None:
+        return deltas
+    for row in rows:
+        for key, value in contribution(row):
+            deltas[key] += sign * value
+    return deltas
+
+
+def _upsert(conn):
+    """
+    INSERT ... ON CONFLICT (nom, cle) DO UPDATE valeur = valeur + excluded.valeur.
+    """
+    dialect = conn.dialect.name
+    if dialect not in ("postgresql", "sqlite"):
+        return None
+    stmt = (postgresql if dialect == "postgresql" else sqlite).insert(statistiques)
+    return stmt.on_conflict_do_update(
+        index_elements=["nom", "cle"],
+        set_={"valeur": statistiques.c.valeur + stmt.excluded.valeur},
+    )
+
+
+def apply_deltas(conn, deltas):
+    """
+    Applique les variations dans la transaction de `conn`.
+    """
+    params = [{"nom": nom, "cle": cle, "valeur": value} for (nom, cle), value in deltas.items() if value]
+    if not params:
+        return
+
+    stmt = _upsert(conn)
+    if stmt is not None:
+        conn.execute(stmt, params)
+        return
+
+    # Autres bases : UPDATE puis INSERT des compteurs absents
+    for p in params:
+        updated = conn.execute(
+            statistiques.update()
+            .where(statistiques.c.nom == p["nom"], statistiques.c.cle == p["cle"])
+            .values(valeur=statistiques.c.valeur + p["valeur"])
+        )
+        if updated.rowcount == 0:
+            conn.execute(statistiques.insert().values(**p))
+
+
+# -----------------------------
+# Écritures ORM
+# -----------------------------
+def _row(obj, old=False):
+    """
+    Valeurs des colonnes d'un objet ORM ; old=True donne les valeurs avant modification.
+    """
+    state = inspect(obj)
+    row = {}
+    for column in obj.__table__.columns:
+        attr = state.attrs[column.key]
+        history = attr.history
+        row[column.key] = history.deleted[0] if old and history.deleted else attr.value
+    return row
+
+
+@event.listens_for(db.session, "after_flush")
+def _update_counters(session, flush_context):
+    """
+    Répercute les ajouts, modifications et suppressions du flush sur les compteurs,
+    dans la même transaction.
+    """
+    deltas = defaultdict(float)
+    for obj in session.new:
+        collect_deltas(obj.__tablename__, [_row(obj)], 1, deltas)
+    for obj in session.deleted:
+        collect_deltas(obj.__tablename__, [_row(obj, old=True)], -1, deltas)
+    for obj in session.dirty:
+        if obj.__tablename__ in CONTRIBUTIONS and session.is_modified(obj, include_collections=False):
+            collect_deltas(obj.__tablename__, [_row(obj, old=True)], -1, deltas)
+            collect_deltas(obj.__tablename__, [_row(obj)], 1, deltas)
+    apply_deltas(session.connection(), deltas)
+
+
+# -----------------------------
+# Lecture
+# -----------------------------
+def read_stat(nom, cle=""):
+    """
+    Valeur d'un compteur (0 s'il n'existe pas).
+    """
+    value = db.session.query(Statistique.valeur).filter_by(nom=nom, cle=cle).scalar()
+    return value or 0
+
+
+def read_stats(nom):
+    """
+    {cle: valeur} des compteurs non nuls d'une famille.
+    """
+    rows = db.session.query(Statistique.cle, Statistique.valeur)\
+        .filter(Statistique.nom == nom, Statistique.valeur != 0).all()
+    return {cle: valeur for cle, valeur in rows}
+
+
+# -----------------------------
+# Reconstruction
+# -----------------------------
+def compute_stats(conn):
+    """
+    Recalcule tous les compteurs à partir des tables (GROUP BY / SUM).
+    """
+    counters = defaultdict(float)
+    queries = [
+        ("personnel_etat", sa.select(Personnel.etat, sa.func.count()).group_by(Personnel.etat)),
+        ("articles_zone", sa.select(Article.zone, sa.func.count()).group_by(Article.zone)),
+        ("articles_etat", sa.select(Article.etat_emballage, sa.func.count()).group_by(Article.etat_emballage)),
+        ("operations_type", sa.select(OperationCommerciale.type_op, sa.func.count()).group_by(OperationCommerciale.type_op)),
+    ]
+    for nom, query in queries:
+        for key, count in conn.execute(query):
+            counters[(nom, _name(key))] += count
+
+    counters[("personnel", "")] = conn.execute(sa.select(sa.func.count()).select_from(Personnel)).scalar()
+    km, marge = conn.execute(sa.select(
+        sa.func.coalesce(sa.func.sum(OperationCommerciale.km_parcourus), 0),
+        sa.func.coalesce(sa.func.sum(OperationCommerciale.marge), 0),
+    )).one()
+    counters[("operations_km", "")] = km
+    counters[("operations_marge", "")] = marge
+    return {key: value for key, value in counters.items() if value}
+
+
+def rebuild(conn):
+    """
+    Remplace le contenu de la table statistiques par les valeurs recalculées.
+
+    Returns:
+        écart {(nom, cle): (ancienne valeur, nouvelle valeur)} pour les compteurs qui différaient
+    """
+    current = {(nom, cle): valeur for nom, cle, valeur in conn.execute(sa.select(statistiques))}
+    fresh = compute_stats(conn)
+
+    conn.execute(statistiques.delete())
+    if fresh:
+        conn.execute(statistiques.insert(), [
+            {"nom": nom, "cle": cle, "valeur": value} for (nom, cle), value in fresh.items()
+        ])
+
+    return {
+        key: (current.get(key, 0), fresh.get(key, 0))
+        for key in current.keys() | fresh.keys()
+        if abs(current.get(key, 0) - fresh.get(key, 0)) > 1e-6
+    }
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv != ["rebuild"]:
+        raise SystemExit("Usage : python -m couche_data.db_stats rebuild")
+
+    app = create_app(statement_timeout=0)  # chargement long : pas de statement_timeout
+    with app.app_context():
+        with db.engine.begin() as conn:
+            drift = rebuild(conn)
+        for (nom, cle), (old, new) in sorted(drift.items()):
+            print(f"⚠️ {nom}[{cle}] : {old} -> {new}")
+        print(f"✅ Statistiques reconstruites ({len(drift)} compteur(s) corrigé(s))")
+
+
+if __name__ == "__main__":
+    main()
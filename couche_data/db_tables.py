@@ -1,4 +1,6 @@
 import enum
+from datetime import datetime, timezone
+from sqlalchemy.orm import validates
 from .db_connect import db
 
 # Charger les variables d'env
@@ -45,6 +47,20 @@ class DetectionForme(enum.Enum):
     personnel_non_identifie = "personnel non identifiée"
     objet_non_identifie = "objet non identifié"
 
+# -----------------------------
+# Coordonnées
+# -----------------------------
+def parse_coords(value, size):
+    """
+    "a,b[,c]" -> tuple de `size` floats ; (None, ...) si la chaîne est absente ou mal formée.
+    """
+    try:
+        coords = tuple(float(part) for part in value.split(","))
+    except (AttributeError, ValueError):
+        return (None,) * size
+    return coords if len(coords) == size else (None,) * size
+
+
 # -----------------------------
 # 1️⃣ Personnel
 # -----------------------------
@@ -56,6 +72,18 @@ class Personnel(db.Model):
     service = db.Column(db.Enum(ServicePersonnel), nullable=False)
     frequence_cardiaque = db.Column(db.Integer)
     position = db.Column(db.String)  # GPS "lat,lon"
+    lat = db.Column(db.Float)  # tirés de position (requêtes spatiales)
+    lon = db.Column(db.Float)
+
+    __table_args__ = (
+        db.Index("ix_personnel_etat", "etat"),  # /general/stats/personnel/etat
+        db.Index("ix_personnel_lat_lon", "lat", "lon"),
+    )
+
+    @validates("position")
+    def _sync_lat_lon(self, key, value):
+        self.lat, self.lon = parse_coords(value, 2)
+        return value
 
     # Relations : 
     '''
@@ -82,6 +110,11 @@ class OperationCommerciale(db.Model):
     mot_cle_responsable = db.Column(db.String)
     mot_cle_client = db.Column(db.String)
 
+    __table_args__ = (
+        db.Index("ix_operations_commerciales_type_op", "type_op"),
+        db.Index("ix_operations_commerciales_responsable_id", "responsable_id"),
+    )
+
 # -----------------------------
 # 3️⃣ Formations
 # -----------------------------
@@ -106,9 +139,26 @@ class Article(db.Model):
     etat_emballage = db.Column(db.Enum(EtatEmballage))
     responsable_id = db.Column(db.String, db.ForeignKey('personnel.id'))
     position = db.Column(db.String)  # 3 coords "x,y,z"
+    pos_x = db.Column(db.Float)  # tirés de position (requêtes spatiales)
+    pos_y = db.Column(db.Float)
+    pos_z = db.Column(db.Float)
     rotation = db.Column(db.String)  # Euler angles "x,y,z"
     collisions = db.Column(db.Integer)
 
+    # (etat_emballage, collisions) sert aussi les filtres sur etat_emballage seul
+    __table_args__ = (
+        db.Index("ix_articles_etat_emballage_collisions", "etat_emballage", "collisions"),
+        db.Index("ix_articles_zone", "zone"),
+        db.Index("ix_articles_collisions", "collisions"),
+        db.Index("ix_articles_responsable_id", "responsable_id"),
+        db.Index("ix_articles_pos", "pos_x", "pos_y", "pos_z"),
+    )
+
+    @validates("position")
+    def _sync_pos(self, key, value):
+        self.pos_x, self.pos_y, self.pos_z = parse_coords(value, 3)
+        return value
+
 # -----------------------------
 # 5️⃣ Surveillance
 # -----------------------------
@@ -121,3 +171,32 @@ class Surveillance(db.Model):
     detection_incendie = db.Column(db.Boolean)
     detection_forme = db.Column(db.Enum(DetectionForme))
     audit_conformite = db.Column(db.Boolean)
+
+# -----------------------------
+# 6️⃣ Statistiques (compteurs maintenus par couche_data.db_stats)
+# -----------------------------
+class Statistique(db.Model):
+    __tablename__ = 'statistiques'
+    nom = db.Column(db.String, primary_key=True)  # ex: "articles_zone"
+    cle = db.Column(db.String, primary_key=True, default="")  # ex: "3" ; "" pour un total
+    valeur = db.Column(db.Float, nullable=False, default=0)
+
+
+# -----------------------------
+# 7️⃣ Journal des modifications (flux de deltas, tenu par couche_data.db_changes)
+# -----------------------------
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)  # UTC, sans fuseau (colonne DateTime)
+
+class Modification(db.Model):
+    __tablename__ = 'journal_modifications'
+    version = db.Column(db.Integer, primary_key=True, autoincrement=True)  # croissante, toutes tables
+    table_name = db.Column(db.String(50), nullable=False)  # ex: "articles"
+    cle = db.Column(db.String, nullable=False)  # clé primaire de la ligne, en texte
+    operation = db.Column(db.String(10), nullable=False)  # "upsert" ou "delete"
+    date_modification = db.Column(db.DateTime, nullable=False, default=_utcnow)
+
+    __table_args__ = (
+        db.Index("ix_journal_modifications_table_version", "table_name", "version"),
+        db.Index("ix_journal_modifications_table_date", "table_name", "date_modification"),
+    )
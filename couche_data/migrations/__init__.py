@@ -0,0 +1,8 @@
+"""
+Migrations versionnées du schéma (appliquées par couche_data.db_migrate).
+
+Chaque module vNNNN_<nom>.py définit :
+    VERSION      numéro croissant, unique
+    DESCRIPTION  phrase courte enregistrée dans schema_version
+    upgrade(conn)    / downgrade(conn)    sur une connexion SQLAlchemy en transaction
+"""
@@ -0,0 +1,73 @@
+"""
+Schéma initial (celui de db_create.py avant les migrations).
+
+Les tables sont décrites ici telles qu'elles étaient, indépendamment des modèles
+de db_tables.py qui continuent d'évoluer. checkfirst=True : sans effet sur une
+base déjà créée par db.create_all().
+"""
+import sqlalchemy as sa
+from couche_data.db_tables import EtatPersonnel, ServicePersonnel, TypeOperation, EtatEmballage, DetectionForme
+
+VERSION = 1
+DESCRIPTION = "Schéma initial : personnel, opérations, formations, articles, surveillance"
+
+metadata = sa.MetaData()
+
+sa.Table(
+    "personnel", metadata,
+    sa.Column("id", sa.String, primary_key=True),
+    sa.Column("nom_prenom", sa.String, nullable=False),
+    sa.Column("etat", sa.Enum(EtatPersonnel), nullable=False),
+    sa.Column("service", sa.Enum(ServicePersonnel), nullable=False),
+    sa.Column("frequence_cardiaque", sa.Integer),
+    sa.Column("position", sa.String),
+)
+sa.Table(
+    "operations_commerciales", metadata,
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("type_op", sa.Enum(TypeOperation), nullable=False),
+    sa.Column("responsable_id", sa.String, sa.ForeignKey("personnel.id")),
+    sa.Column("marge", sa.Float),
+    sa.Column("km_parcourus", sa.Float),
+    sa.Column("mot_cle_responsable", sa.String),
+    sa.Column("mot_cle_client", sa.String),
+)
+sa.Table(
+    "formations", metadata,
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("nom_formation", sa.String, nullable=False),
+    sa.Column("sujet", sa.Enum(ServicePersonnel)),
+    sa.Column("date_formation", sa.Date),
+    sa.Column("pourcentage_engagement", sa.Float),
+    sa.Column("pourcentage_satisfaction", sa.Float),
+    sa.Column("mot_cle_formateur", sa.String),
+    sa.Column("mot_cle_personnel", sa.String),
+)
+sa.Table(
+    "articles", metadata,
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("zone", sa.Integer, nullable=False),
+    sa.Column("etat_emballage", sa.Enum(EtatEmballage)),
+    sa.Column("responsable_id", sa.String, sa.ForeignKey("personnel.id")),
+    sa.Column("position", sa.String),
+    sa.Column("rotation", sa.String),
+    sa.Column("collisions", sa.Integer),
+)
+sa.Table(
+    "surveillance", metadata,
+    sa.Column("zone", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("drones_actifs", sa.Integer),
+    sa.Column("drones_panne", sa.Integer),
+    sa.Column("drones_rechargement", sa.Integer),
+    sa.Column("detection_incendie", sa.Boolean),
+    sa.Column("detection_forme", sa.Enum(DetectionForme)),
+    sa.Column("audit_conformite", sa.Boolean),
+)
+
+
+def upgrade(conn):
+    metadata.create_all(conn, checkfirst=True)
+
+
+def downgrade(conn):
+    metadata.drop_all(conn, checkfirst=True)
@@ -0,0 +1,33 @@
+"""
+Index secondaires sur les colonnes filtrées, groupées ou jointes par les routes
+(mêmes noms que les Index déclarés dans db_tables.py).
+"""
+import sqlalchemy as sa
+
+VERSION = 2
+DESCRIPTION = "Index sur etat_emballage/collisions, zone, type_op, etat et les clés responsable_id"
+
+INDEXES = [
+    ("ix_personnel_etat", "personnel", ["etat"]),
+    ("ix_operations_commerciales_type_op", "operations_commerciales", ["type_op"]),
+    ("ix_operations_commerciales_responsable_id", "operations_commerciales", ["responsable_id"]),
+    ("ix_articles_etat_emballage_collisions", "articles", ["etat_emballage", "collisions"]),
+    ("ix_articles_zone", "articles", ["zone"]),
+    ("ix_articles_collisions", "articles", ["collisions"]),
+    ("ix_articles_responsable_id", "articles", ["responsable_id"]),
+]
+
+
+def _index(conn, name, table, columns):
+    table = sa.Table(table, sa.MetaData(), autoload_with=conn)
+    return sa.Index(name, *(table.c[col] for col in columns))
+
+
+def upgrade(conn):
+    for name, table, columns in INDEXES:
+        _index(conn, name, table, columns).create(conn, checkfirst=True)
+
+
+def downgrade(conn):
+    for name, table, columns in reversed(INDEXES):
+        _index(conn, name, table, columns).drop(conn, checkfirst=True)
@@ -0,0 +1,28 @@
+"""
+Table des compteurs statistiques (voir couche_data.db_stats), remplie à partir
+des données existantes.
+"""
+import sqlalchemy as sa
+
+VERSION = 3
+DESCRIPTION = "Table statistiques (compteurs par zone, état, type d'opération, km et marge)"
+
+metadata = sa.MetaData()
+
+statistiques = sa.Table(
+    "statistiques", metadata,
+    sa.Column("nom", sa.String, primary_key=True),
+    sa.Column("cle", sa.String, primary_key=True),
+    sa.Column("valeur", sa.Float, nullable=False),
+)
+
+
+def upgrade(conn):
+    from couche_data.db_stats import rebuild
+
+    statistiques.create(conn, checkfirst=True)
+    rebuild(conn)
+
+
+def downgrade(conn):
+    statistiques.drop(conn, checkfirst=True)
@@ -0,0 +1,54 @@
+"""
+Coordonnées numériques tirées des chaînes position : personnel.lat/lon ("lat,lon")
+et articles.pos_x/pos_y/pos_z ("x,y,z"), avec leurs index pour les requêtes spatiales.
+"""
+import sqlalchemy as sa
+from couche_data.db_tables import parse_coords
+
+VERSION = 4
+DESCRIPTION = "Colonnes lat/lon (personnel) et pos_x/pos_y/pos_z (articles) indexées"
+
+COLUMNS = {
+    "personnel": ("id", ["lat", "lon"]),
+    "articles": ("id", ["pos_x", "pos_y", "pos_z"]),
+}
+INDEXES = [
+    ("ix_personnel_lat_lon", "personnel", ["lat", "lon"]),
+    ("ix_articles_pos", "articles", ["pos_x", "pos_y", "pos_z"]),
+]
+BATCH_SIZE = 10000
+
+
+def _backfill(conn, table_name, key, columns):
+    table = sa.Table(table_name, sa.MetaData(), autoload_with=conn)
+    update = table.update().where(table.c[key] == sa.bindparam("_key")).values(
+        {col: sa.bindparam(col) for col in columns}
+    )
+    rows = conn.execute(sa.select(table.c[key], table.c.position).where(table.c.position.isnot(None))).all()
+    for start in range(0, len(rows), BATCH_SIZE):
+        params = [
+            {"_key": row_key, **dict(zip(columns, parse_coords(position, len(columns))))}
+            for row_key, position in rows[start:start + BATCH_SIZE]
+        ]
+        conn.execute(update, params)
+
+
+def upgrade(conn):
+    existing = {table: {c["name"] for c in sa.inspect(conn).get_columns(table)} for table in COLUMNS}
+    for table_name, (key, columns) in COLUMNS.items():
+        for col in columns:
+            if col not in existing[table_name]:
+                conn.exec_driver_sql(f"ALTER TABLE {table_name} ADD COLUMN {col} FLOAT")
+        _backfill(conn, table_name, key, columns)
+
+    for name, table_name, columns in INDEXES:
+        table = sa.Table(table_name, sa.MetaData(), autoload_with=conn)
+        sa.Index(name, *(table.c[col] for col in columns)).create(conn, checkfirst=True)
+
+
+def downgrade(conn):
+    for name, table_name, columns in INDEXES:
+        conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+    for table_name, (key, columns) in COLUMNS.items():
+        for col in columns:
+            conn.exec_driver_sql(f"ALTER TABLE {table_name} DROP COLUMN {col}")
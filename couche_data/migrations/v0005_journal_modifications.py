@@ -0,0 +1,28 @@
+"""
+Journal des modifications (voir couche_data.db_changes) : flux ?since= des listes /general.
+Les lignes existantes n'y figurent pas : une région paire commence par ?since=0 (liste complète).
+"""
+import sqlalchemy as sa
+
+VERSION = 5
+DESCRIPTION = "Table journal_modifications (versions des ajouts, modifications et suppressions)"
+
+metadata = sa.MetaData()
+
+journal_modifications = sa.Table(
+    "journal_modifications", metadata,
+    sa.Column("version", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("table_name", sa.String(50), nullable=False),
+    sa.Column("cle", sa.String, nullable=False),
+    sa.Column("operation", sa.String(10), nullable=False),
+    sa.Column("date_modification", sa.DateTime, nullable=False),
+    sa.Index("ix_journal_modifications_table_version", "table_name", "version"),
+)
+
+
+def upgrade(conn):
+    journal_modifications.create(conn, checkfirst=True)
+
+
+def downgrade(conn):
+    journal_modifications.drop(conn, checkfirst=True)
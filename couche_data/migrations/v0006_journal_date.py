@@ -0,0 +1,21 @@
+"""
+Index (table_name, date_modification) du journal : ?since=<date>, et fenêtre de
+sécurité des deltas sur PostgreSQL (voir couche_data.db_changes.changes_since).
+"""
+import sqlalchemy as sa
+
+VERSION = 6
+DESCRIPTION = "Index sur journal_modifications (table_name, date_modification)"
+
+
+def _index(conn):
+    table = sa.Table("journal_modifications", sa.MetaData(), autoload_with=conn)
+    return sa.Index("ix_journal_modifications_table_date", table.c.table_name, table.c.date_modification)
+
+
+def upgrade(conn):
+    _index(conn).create(conn, checkfirst=True)
+
+
+def downgrade(conn):
+    _index(conn).drop(conn, checkfirst=True)
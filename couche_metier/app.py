@@ -1,23 +1,8 @@
-from flask import Flask
-
-from ..couche_data.db_connect import create_app
-from .assistance_commerciale import assistance_bp
-from .general import general_bp , write_bp
-from .recherche_developpement import rd_bp
-from .finance_gestion import finance_bp
-
-
-
-app = create_app()
-
-
-#  Enregistrement des Blueprints
-app.register_blueprint(assistance_bp)
-app.register_blueprint(general_bp)
-app.register_blueprint(write_bp)
-app.register_blueprint(rd_bp)
-app.register_blueprint(finance_bp)
+# Lancement local (serveur de développement Flask) :
+#     python -m couche_metier.app
+# L'application est celle de wsgi.py (gunicorn) : mêmes blueprints, invalidation du
+# cache des réponses après commit et compression.
+from couche_metier.wsgi import app
 
 if __name__ == "__main__":
     app.run(debug=True)
-
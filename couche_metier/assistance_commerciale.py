@@ -1,7 +1,8 @@
 from flask import Blueprint, jsonify
 from couche_data.db_connect import db
-from couche_data.db_tables import OperationCommerciale
-from couche_metier.utils.data_agregation import aggregate_data_multi
+from couche_data.db_tables import OperationCommerciale, TypeOperation
+from couche_metier.utils.data_agregation import aggregate_data_multi, data_age_seconds, response_cache, VOCABULARIES
+from couche_metier.utils.resultats import totals, extreme_per_group, records
 
 # Création du Blueprint pour le module Assistance Commerciale
 assistance_bp = Blueprint('assistance', __name__, url_prefix='/assistance_commerciale')
@@ -11,6 +12,7 @@ assistance_bp = Blueprint('assistance', __name__, url_prefix='/assistance_commer
 # A - Zone avec le CO2 le plus faible
 # -----------------------------
 @assistance_bp.route('/zone/co2_min')
+@response_cache.cached()
 def zone_co2_min():
     """
     Retourne la zone avec le niveau de CO2 le plus faible
@@ -35,7 +37,8 @@ def zone_co2_min():
         "co2_level": round(min_row["co2"], 2),
         "source": min_row["source"],
         "sources_responded": sources_responded,
-        "num_sources_responded": len(sources_responded)
+        "num_sources_responded": len(sources_responded),
+        "data_age_seconds": data_age_seconds()
     })
 
 
@@ -43,6 +46,7 @@ def zone_co2_min():
 # B - Nombre de responsables en vente
 # -----------------------------
 @assistance_bp.route('/responsables_vente')
+@response_cache.cached("operations_commerciales")
 def responsables_vente():
     """
     Retourne le nombre de responsables ayant effectué au moins
@@ -62,16 +66,22 @@ def responsables_vente():
     )
 
     if df_all.empty:
-        return jsonify({"nombre_responsables_vente": 0, "sources_responded": [], "num_sources_responded": 0})
+        return jsonify({
+            "nombre_responsables_vente": 0,
+            "sources_responded": sources_responded,
+            "num_sources_responded": len(sources_responded),
+            "data_age_seconds": data_age_seconds()
+        })
 
-    # --- Comptage distinct des responsables ---
-    df_all = df_all[df_all["type_op"].str.lower() != "achat"]
+    # --- Comptage distinct des responsables (tout sauf les achats, types inconnus compris) ---
+    df_all = df_all[VOCABULARIES["type_op"].normalize(df_all["type_op"], keep_unknown=True) != TypeOperation.achat.value]
     distinct_count = df_all["responsable_id"].nunique()
 
     return jsonify({
         "nombre_responsables_vente": int(distinct_count),
         "sources_responded": sources_responded,
-        "num_sources_responded": len(sources_responded)
+        "num_sources_responded": len(sources_responded),
+        "data_age_seconds": data_age_seconds()
     })
 
 
@@ -79,6 +89,7 @@ def responsables_vente():
 # C - Zone avec le CO2 minimal par source
 # -----------------------------
 @assistance_bp.route('/zone/co2_min_per_source')
+@response_cache.cached()
 def zone_co2_min_per_source():
     """
     Retourne la zone avec le niveau de CO2 le plus faible
@@ -95,14 +106,8 @@ def zone_co2_min_per_source():
         return jsonify({"error": "Pas de données relevés disponibles"}), 404
 
     # --- Minimum CO2 par source ---
-    result_list = []
-    for source, df_source in df_all.groupby("source"):
-        min_row = df_source.loc[df_source["co2"].idxmin()]
-        result_list.append({
-            "source": source,
-            "zone": min_row["zone"],
-            "co2_level": round(min_row["co2"], 2)
-        })
+    best = extreme_per_group(df_all, "source", "co2", how="min")
+    result_list = records(best, {"source": "source", "zone": "zone", "co2_level": "co2"}, decimals={"co2_level": 2})
 
     return jsonify(result_list)
 
@@ -111,6 +116,7 @@ def zone_co2_min_per_source():
 # D - Nombre de responsables en vente par source
 # -----------------------------
 @assistance_bp.route('/responsables_vente_per_source')
+@response_cache.cached("operations_commerciales")
 def responsables_vente_per_source():
     """
     Retourne le nombre de responsables ayant effectué
@@ -131,15 +137,11 @@ def responsables_vente_per_source():
     if df_all.empty:
         return jsonify([])
 
-    df_all = df_all[df_all["type_op"].str.lower() != "achat"]
+    # --- Tout sauf les achats (types inconnus compris) ---
+    df_all = df_all[VOCABULARIES["type_op"].normalize(df_all["type_op"], keep_unknown=True) != TypeOperation.achat.value]
 
     # --- Comptage distinct par source ---
-    result_list = []
-    for source, df_source in df_all.groupby("source"):
-        distinct_count = df_source["responsable_id"].nunique()
-        result_list.append({
-            "source": source,
-            "nombre_responsables_vente": int(distinct_count)
-        })
+    agg = totals(df_all, "source", "responsable_id", how="nunique")
+    result_list = records(agg, {"source": "source", "nombre_responsables_vente": "responsable_id"})
 
     return jsonify(result_list)
@@ -1,11 +1,11 @@
-import os
-import requests
 from flask import Blueprint, jsonify
-import json
-import pandas as pd
+from sqlalchemy import func
 from couche_data.db_connect import db
 from couche_data.db_tables import Personnel, OperationCommerciale, Surveillance
-from couche_metier.utils.data_agregation import aggregate_data_multi, build_id_map
+from couche_metier.utils.data_agregation import (
+    aggregate_data_multi, build_id_map, data_age_seconds, load_external_sources, response_cache, VOCABULARIES
+)
+from couche_metier.utils.resultats import totals, extreme_per_group, map_names, records
 
 # Création du Blueprint pour le module Finance & Gestion
 finance_bp = Blueprint('finance', __name__, url_prefix='/finance_gestion')
@@ -15,17 +15,25 @@ finance_bp = Blueprint('finance', __name__, url_prefix='/finance_gestion')
 # A - Responsable ayant parcouru le plus de kilomètres
 # -----------------------------
 @finance_bp.route('/responsable/max_km')
+@response_cache.cached("operations_commerciales", "personnel")
 def responsable_max_km():
     """
     Retourne le responsable ayant parcouru le plus de kilomètres,
     en agrégeant la base locale et les APIs externes.
     """
+    # --- Chargement parallèle des opérations et du personnel externes (une fois par requête) ---
+    load_external_sources("operations", "personnel")
+
     df_all, sources_responded = aggregate_data_multi(
-        local_query=db.session.query(OperationCommerciale.responsable_id, OperationCommerciale.km_parcourus),
+        local_query=db.session.query(
+            OperationCommerciale.responsable_id,
+            func.sum(OperationCommerciale.km_parcourus)
+        ).group_by(OperationCommerciale.responsable_id),
         external_key="operations",
         id_col="responsable_id",
         value_cols=["km"],
-        local_source="local (Brésil)"
+        local_source="local (Brésil)",
+        aggregate="sum"
     )
 
     if df_all.empty:
@@ -40,7 +48,7 @@ def responsable_max_km():
     )
 
     # --- Calcul du total km par responsable ---
-    agg = df_all.groupby("responsable_id", as_index=False)["km"].sum()
+    agg = totals(df_all, "responsable_id", "km")
     max_row = agg.loc[agg["km"].idxmax()]
     resp_id = max_row["responsable_id"]
     resp_name = personnel_map.get(resp_id, resp_id)
@@ -52,7 +60,8 @@ def responsable_max_km():
         "total_km_parcourus": round(max_row["km"], 2),
         "source_max": source_max,
         "sources_responded": sources_responded,
-        "num_sources_responded": len(sources_responded)
+        "num_sources_responded": len(sources_responded),
+        "data_age_seconds": data_age_seconds()
     })
 
 
@@ -60,6 +69,7 @@ def responsable_max_km():
 # B - Drone le plus ancien
 # -----------------------------
 @finance_bp.route('/drone/plus_ancien')
+@response_cache.cached("surveillance")
 def drone_plus_ancien():
     """
     Retourne la zone du drone le plus ancien, calculée à partir
@@ -68,20 +78,21 @@ def drone_plus_ancien():
     df_all, sources_responded = aggregate_data_multi(
         local_query=db.session.query(
             Surveillance.zone,
-            Surveillance.drones_panne,
-            Surveillance.drones_rechargement
-        ),
+            func.sum(Surveillance.drones_panne),
+            func.sum(Surveillance.drones_rechargement)
+        ).group_by(Surveillance.zone),
         external_key="drones",
         id_col="zone",
         value_cols=["drones_panne", "drones_rechargement"],
-        local_source="local (Brésil)"
+        local_source="local (Brésil)",
+        aggregate="sum"
     )
 
     if df_all.empty:
         return jsonify({"error": "Pas de données drones disponibles"}), 404
 
     # --- Agrégation globale ---
-    agg = df_all.groupby("zone", as_index=False)[["drones_panne", "drones_rechargement"]].sum()
+    agg = totals(df_all, "zone", ["drones_panne", "drones_rechargement"])
     agg["drone_age"] = agg["drones_panne"] * 2 + agg["drones_rechargement"]
 
     # --- Trouver la zone du drone le plus ancien ---
@@ -96,7 +107,8 @@ def drone_plus_ancien():
         "drones_rechargement": int(max_row["drones_rechargement"]),
         "source_max": source_max,
         "sources_responded": sources_responded,
-        "num_sources_responded": len(sources_responded)
+        "num_sources_responded": len(sources_responded),
+        "data_age_seconds": data_age_seconds()
     })
 
 
@@ -104,16 +116,24 @@ def drone_plus_ancien():
 # C - Total des marges par responsable
 # -----------------------------
 @finance_bp.route('/marges_par_responsable')
+@response_cache.cached("operations_commerciales", "personnel")
 def marges_par_responsable():
     """
     Retourne le total des marges par responsable pour chaque source.
     """
+    # --- Chargement parallèle des opérations et du personnel externes (une fois par requête) ---
+    load_external_sources("operations", "personnel")
+
     df_all, sources_responded = aggregate_data_multi(
-        local_query=db.session.query(OperationCommerciale.responsable_id, OperationCommerciale.marge),
+        local_query=db.session.query(
+            OperationCommerciale.responsable_id,
+            func.sum(OperationCommerciale.marge)
+        ).group_by(OperationCommerciale.responsable_id),
         external_key="operations",
         id_col="responsable_id",
         value_cols=["marge"],
-        local_source="local (Brésil)"
+        local_source="local (Brésil)",
+        aggregate="sum"
     )
 
     if df_all.empty:
@@ -126,17 +146,14 @@ def marges_par_responsable():
         value_field="nomPrenom"
     )
 
-    # --- Calcul des marges totales par responsable et par source ---
-    data = [
-        {
-            "source": source,
-            "responsable_id": row["responsable_id"],
-            "responsable_name": personnel_map.get(row["responsable_id"], row["responsable_id"]),
-            "total_marge": round(row["marge"], 2)
-        }
-        for source, df_source in df_all.groupby("source")
-        for _, row in df_source.groupby("responsable_id", as_index=False)["marge"].sum().iterrows()
-    ]
+    # --- Marges totales par (source, responsable) en une passe ---
+    agg = totals(df_all, ["source", "responsable_id"], "marge")
+    data = records(agg, {
+        "source": "source",
+        "responsable_id": "responsable_id",
+        "responsable_name": map_names(agg["responsable_id"], personnel_map),
+        "total_marge": "marge",
+    }, decimals={"total_marge": 2})
 
     return jsonify(data)
 
@@ -145,27 +162,33 @@ def marges_par_responsable():
 # D - Nombre d’opérations par type (Achat/Vente)
 # -----------------------------
 @finance_bp.route('/operations_par_type')
+@response_cache.cached("operations_commerciales")
 def operations_par_type():
     """
     Retourne le nombre d’opérations par type (Achat/Vente) pour chaque source.
     """
     df_all, sources_responded = aggregate_data_multi(
-        local_query=db.session.query(OperationCommerciale.type_op, OperationCommerciale.id),
+        local_query=db.session.query(
+            OperationCommerciale.type_op,
+            func.count()
+        ).group_by(OperationCommerciale.type_op),
         external_key="operations",
         id_col="type_op",
         value_cols=["id"],
-        local_source="local (Brésil)"
+        local_source="local (Brésil)",
+        aggregate="size"  # COUNT(*) : les lignes sans id comptent aussi
     )
 
     if df_all.empty:
         return jsonify({"error": "Pas de données d'opérations disponibles"}), 404
 
-    # --- Conversion des enums en chaînes de caractères ---
-    df_all["type_op"] = df_all["type_op"].apply(lambda x: x.value if hasattr(x, "value") else str(x))
-    df_all["count"] = 1
-    agg = df_all.groupby(["type_op", "source"], as_index=False)["count"].sum()
+    # --- Libellés communs "Achat"/"Vente" (enums locaux et alias des autres régions) ;
+    #     un type inconnu est compté sous son libellé brut ---
+    df_all["type_op"] = VOCABULARIES["type_op"].normalize(df_all["type_op"], keep_unknown=True)
+    # --- "id" contient déjà le nombre d'opérations par (type, source) ---
+    agg = totals(df_all, ["type_op", "source"], "id")
 
-    data = [{"type_op": row["type_op"], "source": row["source"], "count": int(row["count"])} for _, row in agg.iterrows()]
+    data = records(agg, {"type_op": "type_op", "source": "source", "count": agg["id"].astype(int)})
     return jsonify(data)
 
 
@@ -173,17 +196,25 @@ def operations_par_type():
 # E - Responsable ayant parcouru le plus de kilomètres par source
 # -----------------------------
 @finance_bp.route('/responsable/max_km_per_source')
+@response_cache.cached("operations_commerciales", "personnel")
 def max_km_per_source():
     """
     Retourne le responsable ayant parcouru le plus de kilomètres par source.
     """
+    # --- Chargement parallèle des opérations et du personnel externes (une fois par requête) ---
+    load_external_sources("operations", "personnel")
+
     # --- Agrégation locale + externe ---
     df_all, sources_responded = aggregate_data_multi(
-        local_query=db.session.query(OperationCommerciale.responsable_id, OperationCommerciale.km_parcourus),
+        local_query=db.session.query(
+            OperationCommerciale.responsable_id,
+            func.sum(OperationCommerciale.km_parcourus)
+        ).group_by(OperationCommerciale.responsable_id),
         external_key="operations",
         id_col="responsable_id",
         value_cols=["km"],
-        local_source="local (Brésil)"
+        local_source="local (Brésil)",
+        aggregate="sum"
     )
 
     if df_all.empty:
@@ -196,18 +227,13 @@ def max_km_per_source():
         value_field="nomPrenom"
     )
 
-    # --- Calcul du max km par source ---
-    result_list = []
-    for source, df_source in df_all.groupby("source"):
-        agg = df_source.groupby("responsable_id", as_index=False)["km"].sum()
-        max_row = agg.loc[agg["km"].idxmax()]
-        resp_id = max_row["responsable_id"]
-        resp_name = personnel_map.get(resp_id, resp_id)
-        result_list.append({
-            "source": source,
-            "responsable_id": resp_id,
-            "responsable_name": resp_name,
-            "max_km": round(max_row["km"], 2)
-        })
+    # --- Total km par (source, responsable), puis le maximum de chaque source ---
+    best = extreme_per_group(totals(df_all, ["source", "responsable_id"], "km"), "source", "km")
+    result_list = records(best, {
+        "source": "source",
+        "responsable_id": "responsable_id",
+        "responsable_name": map_names(best["responsable_id"], personnel_map),
+        "max_km": "km",
+    }, decimals={"max_km": 2})
 
     return jsonify(result_list)
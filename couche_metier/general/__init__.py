@@ -1,2 +1,4 @@
 from .get_routes import general_bp   
 from .post_routes import write_bp  
+from . import bulk_routes  # routes /write/<entité>/bulk (enregistrées sur write_bp)
+from . import geo_routes  # routes /general/geo/... (enregistrées sur general_bp)
@@ -0,0 +1,289 @@
+# routes/general/bulk_routes.py
+
+import json
+import numpy as np
+import pandas as pd
+from flask import request, jsonify
+from sqlalchemy import Float, Integer, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from couche_data.db_connect import db
+from couche_data.db_stats import apply_deltas, collect_deltas
+from couche_data.db_changes import record_changes
+from couche_data.db_tables import (
+    Personnel, Article, OperationCommerciale,
+    Formation, Surveillance,
+    EtatPersonnel, ServicePersonnel, TypeOperation,
+    EtatEmballage, DetectionForme
+)
+from .post_routes import write_bp, require_api_key
+
+# -----------------------------
+# Paramètres des écritures en masse
+# -----------------------------
+MAX_BULK_ROWS = 50000  # lignes maximum par requête
+CHUNK_SIZE = 1000      # lignes par INSERT multi-valeurs
+
+# -----------------------------
+# Description des entités : mêmes champs et mêmes règles que les routes unitaires
+# -----------------------------
+BULK_ENTITIES = {
+    "personnel": {
+        "model": Personnel,
+        "fields": ["id", "nom_prenom", "etat", "service", "frequence_cardiaque", "position"],
+        "required": ["id", "nom_prenom", "etat", "service"],
+        "enums": {"etat": EtatPersonnel, "service": ServicePersonnel},
+        "coords": {"position": ["lat", "lon"]},
+    },
+    "article": {
+        "model": Article,
+        "fields": ["id", "zone", "etat_emballage", "responsable_id", "position", "rotation", "collisions"],
+        "required": ["zone"],
+        "enums": {"etat_emballage": EtatEmballage},
+        "defaults": {"collisions": 0},
+        "coords": {"position": ["pos_x", "pos_y", "pos_z"]},
+    },
+    "operation": {
+        "model": OperationCommerciale,
+        "fields": ["id", "type_op", "responsable_id", "marge", "km_parcourus", "mot_cle_responsable", "mot_cle_client"],
+        "required": ["type_op"],
+        "enums": {"type_op": TypeOperation},
+    },
+    "formation": {
+        "model": Formation,
+        "fields": ["id", "nom_formation", "sujet", "date_formation", "pourcentage_engagement",
+                   "pourcentage_satisfaction", "mot_cle_formateur", "mot_cle_personnel"],
+        "required": ["nom_formation"],
+        "enums": {"sujet": ServicePersonnel},
+        "dates": ["date_formation"],
+    },
+    "surveillance": {
+        "model": Surveillance,
+        "fields": ["zone", "drones_actifs", "drones_panne", "drones_rechargement",
+                   "detection_incendie", "detection_forme", "audit_conformite"],
+        "required": [],
+        "enums": {"detection_forme": DetectionForme},
+    },
+}
+
+# Valeur exposée par l'API -> nom stocké en base, pour chaque enum
+ENUM_NAMES = {
+    enum_cls: {member.value: member.name for member in enum_cls}
+    for enum_cls in (EtatPersonnel, ServicePersonnel, TypeOperation, EtatEmballage, DetectionForme)
+}
+
+
+
+class TooManyRows(ValueError):
+    """
+    Lot de plus de MAX_BULK_ROWS lignes (réponse 413).
+    """
+
+
+def _numeric_fields(spec):
+    """
+    Champs numériques de l'entité (colonnes Integer / Float du modèle) -> True si entier.
+    """
+    columns = spec["model"].__table__.columns
+    return {
+        field: isinstance(columns[field].type, Integer)
+        for field in spec["fields"]
+        if isinstance(columns[field].type, (Integer, Float))
+    }
+
+
+def _read_rows():
+    """
+    Lit le corps de la requête : tableau JSON, ou NDJSON (Content-Type application/x-ndjson)
+    lu ligne à ligne. Renvoie (lignes, erreurs de lecture).
+    Un flux NDJSON est interrompu dès qu'il dépasse MAX_BULK_ROWS lignes (TooManyRows).
+    """
+    if request.mimetype == "application/x-ndjson":
+        rows, errors = [], []
+        for line in request.stream:
+            if not line.strip():
+                continue
+            if len(rows) == MAX_BULK_ROWS:
+                raise TooManyRows(f"Trop de lignes : plus de {MAX_BULK_ROWS}")
+            try:
+                rows.append(json.loads(line))
+            except ValueError as e:
+                errors.append({"index": len(rows), "error": f"JSON invalide : {e}"})
+                rows.append(None)  # garde l'index des lignes suivantes
+        return rows, errors
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, list):
+        raise ValueError("Le corps doit être un tableau JSON ou du NDJSON")
+    return data, []
+
+
+def _validate(rows, spec):
+    """
+    Validation vectorisée (pandas) de toutes les lignes en une passe par colonne :
+    champs obligatoires, enums (valeur -> nom en base), nombres et dates.
+
+    Returns:
+        DataFrame des lignes valides (colonnes = champs de l'entité, index = position d'origine),
+        dict {index: message d'erreur}
+    """
+    records = [row if isinstance(row, dict) else {} for row in rows]
+    df = pd.DataFrame.from_records(records, columns=spec["fields"]).astype(object)
+    problems = pd.Series("", index=df.index)
+
+    not_object = pd.Series([not isinstance(row, dict) for row in rows], index=df.index)
+    problems[not_object] += "ligne non objet ; "
+
+    for field, default in spec.get("defaults", {}).items():
+        df[field] = df[field].where(df[field].notna(), default)
+
+    for field in spec["required"]:
+        problems[df[field].isna() & ~not_object] += f"champ manquant : {field} ; "
+
+    for field, enum_cls in spec["enums"].items():
+        names = df[field].map(ENUM_NAMES[enum_cls])
+        problems[df[field].notna() & names.isna()] += f"valeur invalide pour {field} ; "
+        df[field] = names
+
+    for field, integer in _numeric_fields(spec).items():
+        values = df[field]
+        numbers = pd.to_numeric(values.where(~values.map(lambda v: isinstance(v, bool))), errors="coerce")
+        wrong = ~np.isfinite(numbers) | (integer & (numbers % 1 != 0))
+        problems[values.notna() & wrong] += f"nombre invalide pour {field} ; "
+        df[field] = pd.Series([None if pd.isna(n) else int(n) if integer else float(n) for n in numbers],
+                              index=df.index, dtype=object)
+
+    for field in spec.get("dates", []):
+        parsed = pd.to_datetime(df[field], errors="coerce", format="ISO8601")
+        problems[df[field].notna() & parsed.isna()] += f"date invalide pour {field} ; "
+        df[field] = [d.date() if not pd.isna(d) else None for d in parsed]
+
+    # Coordonnées numériques tirées de la chaîne (comme les @validates des modèles)
+    for field, columns in spec.get("coords", {}).items():
+        parts = df[field].where(df[field].map(lambda v: isinstance(v, str))).str.split(",")
+        sized = parts[parts.str.len() == len(columns)]
+        numbers = pd.DataFrame(sized.tolist(), index=sized.index, columns=columns)\
+            .apply(pd.to_numeric, errors="coerce").reindex(df.index)
+        numbers[numbers.isna().any(axis=1)] = None
+        for column in columns:
+            df[column] = numbers[column].astype(object)
+
+    invalid = problems != ""
+    errors = {int(i): msg.rstrip(" ;") for i, msg in problems[invalid].items()}
+    valid = df[~invalid]
+    return valid.where(valid.notna(), None), errors
+
+
+def _insert_statement(table, upsert):
+    """
+    INSERT multi-valeurs, ou INSERT ... ON CONFLICT (clé primaire) DO UPDATE si `upsert`.
+    """
+    dialect = db.engine.dialect.name
+    if not upsert:
+        return insert(table)
+    if dialect not in ("postgresql", "sqlite"):
+        raise ValueError(f"upsert non supporté pour {dialect}")
+
+    stmt = (postgresql if dialect == "postgresql" else sqlite).insert(table)
+    pk = [col.name for col in table.primary_key.columns]
+    return stmt.on_conflict_do_update(
+        index_elements=pk,
+        set_={col.name: stmt.excluded[col.name] for col in table.columns if col.name not in pk},
+    )
+
+
+def _write_rows(table, df, upsert):
+    """
+    Écrit les lignes valides dans une seule transaction, par paquets de CHUNK_SIZE,
+    et met à jour les compteurs statistiques et le journal des modifications dans cette
+    même transaction. Les lignes sans clé primaire (auto-incrément) sont insérées sans
+    cette colonne ; leurs clés sont relues par RETURNING pour le journal.
+
+    En mise à jour, une clé présente plusieurs fois dans le lot n'est écrite qu'une fois
+    (la dernière ligne l'emporte) : compteurs justes, et PostgreSQL refuse qu'un même
+    INSERT ... ON CONFLICT DO UPDATE touche deux fois la même ligne.
+
+    Returns:
+        nombre de lignes écrites
+    """
+    pk = [col.name for col in table.primary_key.columns]
+    has_pk = df[pk].notna().all(axis=1)
+    if upsert:
+        df = df[~has_pk | ~df[pk].duplicated(keep="last")]
+        has_pk = has_pk.loc[df.index]
+    conn = db.session.connection()
+    deltas = collect_deltas(table.name, [])
+
+    for subset, columns in ((df[has_pk], list(df.columns)),
+                            (df[~has_pk], [c for c in df.columns if c not in pk])):
+        if subset.empty:
+            continue
+        update = upsert and len(columns) == len(df.columns)
+        generated = len(columns) < len(df.columns)
+        stmt = _insert_statement(table, update)
+        if generated:
+            stmt = stmt.returning(table.c[pk[0]])
+        records = subset[columns].to_dict("records")
+        for start in range(0, len(records), CHUNK_SIZE):
+            chunk = records[start:start + CHUNK_SIZE]
+            if update:
+                # Les lignes remplacées sortent des compteurs avant d'y rentrer avec leurs nouvelles valeurs
+                keys = [row[pk[0]] for row in chunk]
+                replaced = conn.execute(select(table).where(table.c[pk[0]].in_(keys))).mappings()
+                collect_deltas(table.name, replaced, -1, deltas)
+            result = conn.execute(stmt, chunk)
+            keys = result.scalars().all() if generated else [row[pk[0]] for row in chunk]
+            record_changes(conn, table.name, keys)
+            collect_deltas(table.name, chunk, 1, deltas)
+
+    apply_deltas(conn, deltas)
+    return len(df)
+
+
+# -----------------------------
+# Route d'écriture en masse
+# -----------------------------
+@write_bp.route("/<string:entity>/bulk", methods=["POST"])
+@require_api_key
+def bulk_write(entity):
+    """
+    Ajoute (ou met à jour avec ?on_conflict=update) un lot de lignes d'une entité :
+    personnel, article, operation, formation, surveillance.
+
+    Corps : tableau JSON, ou NDJSON (Content-Type application/x-ndjson).
+    Les lignes invalides sont ignorées et listées dans "errors" (index dans le lot) ;
+    les lignes valides sont écrites dans une seule transaction.
+    En mise à jour, les champs absents d'une ligne sont remis à null.
+    """
+    spec = BULK_ENTITIES.get(entity)
+    if spec is None:
+        return jsonify({"error": f"Entité inconnue : {entity}"}), 404
+
+    try:
+        rows, read_errors = _read_rows()
+    except TooManyRows as e:
+        return jsonify({"error": str(e)}), 413
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if len(rows) > MAX_BULK_ROWS:
+        return jsonify({"error": f"Trop de lignes : {len(rows)} (max {MAX_BULK_ROWS})"}), 413
+
+    df, errors = _validate(rows, spec)
+    errors.update({e["index"]: e["error"] for e in read_errors})
+    report = [{"index": i, "error": errors[i]} for i in sorted(errors)]
+
+    if df.empty:
+        return jsonify({"error": "Aucune ligne valide", "inserted": 0, "errors": report}), 400
+
+    upsert = request.args.get("on_conflict") == "update"
+    try:
+        written = _write_rows(spec["model"].__table__, df, upsert)
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        return jsonify({"error": f"Conflit d'intégrité, lot annulé : {e.orig}", "inserted": 0, "errors": report}), 409
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Erreur serveur : {str(e)}", "inserted": 0, "errors": report}), 500
+
+    return jsonify({"status": "success", "inserted": written, "errors": report}), 201
@@ -0,0 +1,56 @@
+import hashlib
+import json
+from datetime import timezone
+from functools import wraps
+from flask import Response, g, make_response, request
+from werkzeug.http import is_resource_modified
+from couche_data.db_connect import db
+from couche_data.db_changes import last_change
+from couche_metier.utils import columnar
+
+
+def _etag(version, modified):
+    args = sorted(request.args.items(multi=True))
+    fmt = columnar.negotiate(request.accept_mimetypes)
+    route = f"{request.path}?{json.dumps(args)}|{fmt}|{version}|{modified.isoformat()}"
+    return hashlib.sha1(route.encode()).hexdigest()
+
+
+def versioned(*tables):
+    """
+    Requêtes conditionnelles sur les routes qui ne lisent que la base locale.
+
+    L'ETag (faible) et Last-Modified sont tirés de la dernière modification des `tables`
+    dans le journal : un client à jour (If-None-Match / If-Modified-Since) reçoit 304
+    sans que la route, ni le cache des réponses, ne soit exécuté. Sans modification
+    journalisée (base chargée hors de l'application), la route répond normalement.
+
+    La version du journal entre aussi dans la clé du cache des réponses (g.cache_variant) :
+    une écriture faite par un autre worker change la clé même si l'invalidation du cache,
+    locale au processus sans Redis, ne l'a pas atteint. Un corps en cache correspond
+    donc toujours à l'ETag qui l'accompagne.
+
+    Args:
+        tables: tables lues par la route (ex : "articles", "personnel")
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            version, modified = last_change(db.session, tables)
+            if not version:
+                return view(*args, **kwargs)
+
+            etag = _etag(version, modified)
+            modified = modified.replace(tzinfo=timezone.utc)
+            if not is_resource_modified(request.environ, etag=etag, last_modified=modified):
+                response = Response(status=304)
+            else:
+                g.cache_variant = etag
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag, weak=True)
+            response.last_modified = modified
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,235 @@
+# routes/general/geo_routes.py
+
+import math
+from flask import jsonify, request
+from couche_data.db_read import READ_MODELS
+from couche_data.db_tables import Personnel, Article
+from couche_metier.utils.data_agregation import response_cache
+from .conditional import versioned
+from .get_routes import general_bp
+from .listing import MAX_LIMIT
+
+# -----------------------------
+# Paramètres des requêtes spatiales
+# -----------------------------
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.32  # un degré de latitude
+DEFAULT_LIMIT = 100
+DEFAULT_K = 5
+MAX_DOUBLINGS = 32  # nearest : rayon initial × 2^32 au plus
+
+
+class GeoError(ValueError):
+    """
+    Paramètre de requête spatiale invalide (réponse 400).
+    """
+
+
+def _haversine(a, b):
+    """
+    Distance en km entre deux points (lat, lon) en degrés.
+    """
+    lat1, lon1, lat2, lon2 = map(math.radians, (*a, *b))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(h)))
+
+
+def _latlon_box(center, radius):
+    """
+    Rectangle (lat, lon) englobant le cercle de `radius` km ; None pour ne pas borner un axe.
+    """
+    lat, lon = center
+    dlat = radius / KM_PER_DEGREE
+    cos_lat = math.cos(math.radians(lat))
+    dlon = radius / (KM_PER_DEGREE * cos_lat) if cos_lat > 1e-9 else 360
+    lon_box = (lon - dlon, lon + dlon) if dlon < 180 and -180 <= lon - dlon and lon + dlon <= 180 else None
+    return [(lat - dlat, lat + dlat), lon_box]
+
+
+def _cube(center, radius):
+    """
+    Cube englobant la sphère de rayon `radius`.
+    """
+    return [(c - radius, c + radius) for c in center]
+
+
+# -----------------------------
+# Entités interrogeables : axes = (paramètre, colonne, champ JSON)
+# -----------------------------
+GEO_ENTITIES = {
+    "personnel": {
+        "read": READ_MODELS["personnel"],
+        "axes": [("lat", Personnel.lat, "lat"), ("lon", Personnel.lon, "lon")],
+        "distance": _haversine,
+        "box": _latlon_box,
+        "initial_radius": 10.0,  # km
+        "max_radius": math.pi * EARTH_RADIUS_KM,  # demi-circonférence : tout le globe
+    },
+    "articles": {
+        "read": READ_MODELS["articles"],
+        "axes": [("x", Article.pos_x, "pos_x"), ("y", Article.pos_y, "pos_y"), ("z", Article.pos_z, "pos_z")],
+        "distance": math.dist,
+        "box": _cube,
+        "initial_radius": 1.0,
+    },
+}
+
+
+def _float_arg(name):
+    value = request.args.get(name)
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise GeoError(f"Paramètre numérique manquant ou invalide : {name}")
+    if not math.isfinite(value):
+        raise GeoError(f"Paramètre numérique non fini : {name}")
+    return value
+
+
+def _int_arg(name, default):
+    value = request.args.get(name)
+    if value is None:
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise GeoError(f"Paramètre entier invalide : {name}")
+    if value <= 0:
+        raise GeoError(f"{name} doit être positif")
+    return min(value, MAX_LIMIT)
+
+
+def _entity(name):
+    spec = GEO_ENTITIES.get(name)
+    if spec is None:
+        raise GeoError(f"Entité inconnue : {name} (personnel ou articles)")
+    return spec
+
+
+def _box_query(spec, bounds):
+    """
+    Lignes dont les coordonnées sont dans les bornes (index sur les colonnes de coordonnées).
+    """
+    query = spec["read"].query()
+    for (_, column, _), bound in zip(spec["axes"], bounds):
+        query = query.filter(column.isnot(None))
+        if bound is not None:
+            query = query.filter(column.between(*bound))
+    return query
+
+
+def _ranked(spec, center, rows):
+    """
+    Lignes sérialisées avec leur distance au centre (champ "distance"), par distance croissante.
+    """
+    items = []
+    for row in rows:
+        item = spec["read"].serialize(row)
+        item["distance"] = spec["distance"](center, tuple(item[field] for _, _, field in spec["axes"]))
+        items.append(item)
+    items.sort(key=lambda item: item["distance"])
+    return items
+
+
+def _rounded(items):
+    for item in items:
+        item["distance"] = round(item["distance"], 6)
+    return items
+
+
+def _within(spec, center, radius):
+    """
+    Lignes à moins de `radius` du centre, triées par distance croissante.
+    """
+    ranked = _ranked(spec, center, _box_query(spec, spec["box"](center, radius)).all())
+    return [item for item in ranked if item["distance"] <= radius]
+
+
+def _geo_route(handler):
+    """
+    Traduit les GeoError en réponse 400.
+    """
+    def route(entity):
+        try:
+            return handler(_entity(entity))
+        except GeoError as e:
+            return jsonify({"error": str(e)}), 400
+    route.__name__ = handler.__name__
+    route.__doc__ = handler.__doc__
+    return route
+
+
+# -----------------------------
+# Routes
+# -----------------------------
+@general_bp.route('/geo/<string:entity>/radius')
+@versioned("personnel", "articles")
+@response_cache.cached("personnel", "articles")
+@_geo_route
+def geo_radius(spec):
+    """
+    Éléments à moins de r du centre, du plus proche au plus éloigné.
+    personnel : ?lat=&lon=&r=<km> ; articles : ?x=&y=&z=&r=
+    Optionnel : limit (défaut 100).
+    """
+    center = tuple(_float_arg(param) for param, _, _ in spec["axes"])
+    radius = _float_arg("r")
+    if radius < 0:
+        raise GeoError("r doit être positif")
+    items = _within(spec, center, radius)
+    return jsonify(_rounded(items[:_int_arg("limit", DEFAULT_LIMIT)]))
+
+
+@general_bp.route('/geo/<string:entity>/nearest')
+@versioned("personnel", "articles")
+@response_cache.cached("personnel", "articles")
+@_geo_route
+def geo_nearest(spec):
+    """
+    Les k éléments les plus proches du centre (k=5 par défaut).
+    personnel : ?lat=&lon=&k= ; articles : ?x=&y=&z=&k=
+    La recherche part d'une petite boîte indexée qui double tant qu'elle contient moins
+    de k éléments (au plus MAX_DOUBLINGS fois, et pas au-delà du globe pour le personnel).
+    Dès qu'elle en contient k, le rayon est porté à la distance du k-ième : la boîte
+    suivante contient alors toute la sphère des k plus proches.
+    """
+    center = tuple(_float_arg(param) for param, _, _ in spec["axes"])
+    k = _int_arg("k", DEFAULT_K)
+    max_radius = spec.get("max_radius", math.inf)
+    everything = [None] * len(spec["axes"])
+
+    radius, seen = spec["initial_radius"], None
+    for _ in range(MAX_DOUBLINGS):
+        ranked = _ranked(spec, center, _box_query(spec, spec["box"](center, radius)).all())
+        if radius >= max_radius:
+            break  # la boîte couvre toute la table
+        if len(ranked) >= k:
+            if ranked[k - 1]["distance"] <= radius:
+                break
+            radius = ranked[k - 1]["distance"]
+            continue
+        if len(ranked) == seen:
+            # boîte qui ne grossit plus : la table a-t-elle seulement k lignes ?
+            rows = _box_query(spec, everything).limit(k).all()
+            if len(rows) < k:
+                ranked = _ranked(spec, center, rows)
+                break
+        seen = len(ranked)
+        radius = min(radius * 2, max_radius)
+    return jsonify(_rounded(ranked[:k]))
+
+
+@general_bp.route('/geo/<string:entity>/box')
+@versioned("personnel", "articles")
+@response_cache.cached("personnel", "articles")
+@_geo_route
+def geo_box(spec):
+    """
+    Éléments dans une boîte, triés par clé primaire.
+    personnel : ?min_lat=&max_lat=&min_lon=&max_lon= ;
+    articles : ?min_x=&max_x=&min_y=&max_y=&min_z=&max_z=
+    Optionnel : limit (défaut 100).
+    """
+    bounds = [(_float_arg(f"min_{param}"), _float_arg(f"max_{param}")) for param, _, _ in spec["axes"]]
+    query = _box_query(spec, bounds).order_by(spec["read"].key).limit(_int_arg("limit", DEFAULT_LIMIT))
+    return jsonify([spec["read"].serialize(row) for row in query])
@@ -1,12 +1,15 @@
 from flask import Blueprint, jsonify
 from couche_data.db_connect import db
-from couche_data.db_tables import (
-    Personnel, Article, OperationCommerciale,
-    Formation, Surveillance,
-    EtatPersonnel, ServicePersonnel, TypeOperation,
-    EtatEmballage, DetectionForme
+from couche_data.db_tables import EtatPersonnel, EtatEmballage
+from couche_data.db_read import READ_MODELS
+from couche_data.db_engine import pool_snapshot
+from couche_data.db_stats import read_stat, read_stats
+from sqlalchemy import inspect
+from couche_metier.utils.data_agregation import (
+    peer_mirror, prefetcher, response_cache, source_cache, sources_health_report
 )
-from sqlalchemy import func, inspect
+from .conditional import versioned
+from .listing import list_response
 
 # Création du Blueprint pour le module Général
 general_bp = Blueprint('general', __name__, url_prefix='/general')
@@ -25,115 +28,153 @@ def list_tables():
     return jsonify({'tables': tables})
 
 
+# -----------------------------
+# Pool de connexions à la base
+# -----------------------------
+@general_bp.route('/db/pool')
+def db_pool_stats():
+    """
+    Retourne l'état du pool de connexions du worker (taille, connexions empruntées,
+    débordement) et le temps d'attente des emprunts (moyenne, p95, max, timeouts).
+    """
+    return jsonify(pool_snapshot(db.engine))
+
+
+# -----------------------------
+# Cache des sources externes
+# -----------------------------
+@general_bp.route('/sources/cache')
+def sources_cache_stats():
+    """
+    Retourne les compteurs du cache des sources externes (hits, misses, ...)
+    et l'âge de chaque entrée.
+    """
+    return jsonify(source_cache.snapshot())
+
+
+# -----------------------------
+# Préchargement des sources externes
+# -----------------------------
+@general_bp.route('/sources/prefetch')
+def sources_prefetch():
+    """
+    Retourne l'état du préchargement périodique (actif, période, nombre de passes,
+    erreurs, date de la dernière passe).
+    """
+    return jsonify(prefetcher.snapshot())
+
+
+# -----------------------------
+# Miroir local des sources externes
+# -----------------------------
+@general_bp.route('/sources/mirror')
+def sources_mirror():
+    """
+    Retourne, pour chaque source externe, le nombre de lignes du miroir local,
+    l'âge de la dernière synchronisation et la dernière version reçue (sources "delta").
+    """
+    return jsonify(peer_mirror.snapshot())
+
+
+# -----------------------------
+# Cache des réponses GET
+# -----------------------------
+@general_bp.route('/cache/responses')
+def response_cache_stats():
+    """
+    Retourne les compteurs du cache des réponses (hits, misses, invalidations, ...).
+    """
+    return jsonify(response_cache.snapshot())
+
+
+# -----------------------------
+# Santé des sources externes
+# -----------------------------
+@general_bp.route('/sources/health')
+def sources_health():
+    """
+    Retourne, pour chaque source externe, l'état de son disjoncteur
+    (closed / open / half_open), la dernière latence, le taux d'erreur
+    et la date du dernier succès.
+    """
+    return jsonify(sources_health_report())
+
+
 # -----------------------------
 # Personnel
 # -----------------------------
 @general_bp.route('/personnel')
+@versioned("personnel")
+@response_cache.cached("personnel")
 def get_personnel():
     """
     Retourne la liste des personnels avec leur état, service et position.
+    Pagination (?after=&limit=), streaming (?stream=) et deltas (?since=) : voir list_response.
     """
-    personnels = Personnel.query.all()
-    return jsonify([{
-        'id': p.id,
-        'nom_prenom': p.nom_prenom,
-        'etat': p.etat.value,
-        'service': p.service.value,
-        'frequence_cardiaque': p.frequence_cardiaque,
-        'position': p.position
-    } for p in personnels])
+    model = READ_MODELS["personnel"]
+    return list_response(model.query(), model.key, model.serialize)
 
 
 # -----------------------------
 # Articles avec le nom du responsable
 # -----------------------------
 @general_bp.route('/articles')
+@versioned("articles", "personnel")
+@response_cache.cached("articles", "personnel")
 def get_articles():
     """
     Retourne la liste des articles avec l'état de l'emballage
-    et le nom du responsable associé.
+    et le nom du responsable associé (résolu par jointure).
+    Pagination (?after=&limit=), streaming (?stream=) et deltas (?since=) : voir list_response.
     """
-    articles = Article.query.all()
-    # Construction d'une map id_personnel -> nom
-    personnels_map = {p.id: p.nom_prenom for p in Personnel.query.all()}
-
-    return jsonify([{
-        'id': a.id,
-        'zone': a.zone,
-        'etat_emballage': a.etat_emballage.value if a.etat_emballage else None,
-        'responsable_id': a.responsable_id,
-        'responsable_name': personnels_map.get(a.responsable_id, 'Inconnu'),
-        'position': a.position,
-        'rotation': a.rotation,
-        'collisions': a.collisions
-    } for a in articles])
+    model = READ_MODELS["articles"]
+    return list_response(model.query(), model.key, model.serialize)
 
 
 # -----------------------------
 # Opérations commerciales avec nom du responsable
 # -----------------------------
 @general_bp.route('/operations')
+@versioned("operations_commerciales", "personnel")
+@response_cache.cached("operations_commerciales", "personnel")
 def get_operations():
     """
-    Retourne toutes les opérations commerciales avec le nom du responsable.
+    Retourne toutes les opérations commerciales avec le nom du responsable (résolu par jointure).
+    Pagination (?after=&limit=), streaming (?stream=) et deltas (?since=) : voir list_response.
     """
-    ops = OperationCommerciale.query.all()
-    personnels_map = {p.id: p.nom_prenom for p in Personnel.query.all()}
-
-    return jsonify([{
-        'id': o.id,
-        'type_op': o.type_op.value,
-        'responsable_id': o.responsable_id,
-        'responsable_name': personnels_map.get(o.responsable_id, 'Inconnu'),
-        'marge': o.marge,
-        'km_parcourus': o.km_parcourus,
-        'mot_cle_responsable': o.mot_cle_responsable,
-        'mot_cle_client': o.mot_cle_client
-    } for o in ops])
+    model = READ_MODELS["operations"]
+    return list_response(model.query(), model.key, model.serialize)
 
 
 # -----------------------------
 # Formations
 # -----------------------------
 @general_bp.route('/formations')
+@versioned("formations")
+@response_cache.cached("formations")
 def get_formations():
     """
     Retourne toutes les formations avec détails et noms du personnel/formateur.
+    Pagination (?after=&limit=), streaming (?stream=) et deltas (?since=) : voir list_response.
     """
-    formations = Formation.query.all()
-    personnels_map = {p.id: p.nom_prenom for p in Personnel.query.all()}
-
-    return jsonify([{
-        'id': f.id,
-        'nom_formation': f.nom_formation,
-        'sujet': f.sujet.value if f.sujet else None,
-        'date_formation': f.date_formation.isoformat() if f.date_formation else None,
-        'pourcentage_engagement': f.pourcentage_engagement,
-        'pourcentage_satisfaction': f.pourcentage_satisfaction,
-        'mot_cle_formateur': f.mot_cle_formateur,
-        'mot_cle_personnel': f.mot_cle_personnel
-    } for f in formations])
+    model = READ_MODELS["formations"]
+    return list_response(model.query(), model.key, model.serialize)
 
 
 # -----------------------------
 # Surveillance
 # -----------------------------
 @general_bp.route('/surveillance')
+@versioned("surveillance")
+@response_cache.cached("surveillance")
 def get_surveillance():
     """
     Retourne les données de surveillance des zones
     (drones, détection incendie, audit conformité).
+    Pagination (?after=&limit=), streaming (?stream=) et deltas (?since=) : voir list_response.
     """
-    surveils = Surveillance.query.all()
-    return jsonify([{
-        'zone': s.zone,
-        'drones_actifs': s.drones_actifs,
-        'drones_panne': s.drones_panne,
-        'drones_rechargement': s.drones_rechargement,
-        'detection_incendie': s.detection_incendie,
-        'detection_forme': s.detection_forme.value if s.detection_forme else None,
-        'audit_conformite': s.audit_conformite
-    } for s in surveils])
+    model = READ_MODELS["surveillance"]
+    return list_response(model.query(), model.key, model.serialize)
 
 
 # -----------------------------
@@ -142,46 +183,55 @@ def get_surveillance():
 
 # Nombre de personnels
 @general_bp.route('/stats/personnel/count')
+@versioned("personnel")
+@response_cache.cached("personnel")
 def personnel_count():
     """
-    Retourne le nombre total de personnels.
+    Retourne le nombre total de personnels (compteur de la table statistiques).
     """
-    count = Personnel.query.count()
-    return jsonify({'nb_personnel': count})
+    count = read_stat("personnel")
+    return jsonify({'nb_personnel': int(count)})
 
 # Nombre d'articles déformés
 @general_bp.route('/stats/articles/deformes')
+@versioned("articles")
+@response_cache.cached("articles")
 def articles_deformes():
     """
     Retourne le nombre d'articles dont l'état d'emballage est déformé.
     """
-    count = Article.query.filter(Article.etat_emballage==EtatEmballage.defo).count()
-    return jsonify({'nb_articles_deformes': count})
+    count = read_stat("articles_etat", EtatEmballage.defo.name)
+    return jsonify({'nb_articles_deformes': int(count)})
 
 # Total km parcourus dans les opérations
 @general_bp.route('/stats/operations/total_km')
+@versioned("operations_commerciales")
+@response_cache.cached("operations_commerciales")
 def operations_total_km():
     """
     Retourne le total des kilomètres parcourus dans toutes les opérations.
     """
-    total_km = db.session.query(func.sum(OperationCommerciale.km_parcourus)).scalar() or 0
+    total_km = read_stat("operations_km")
     return jsonify({'total_km_parcourus': float(total_km)})
 
 # Distribution des états du personnel
 @general_bp.route('/stats/personnel/etat')
+@versioned("personnel")
+@response_cache.cached("personnel")
 def personnel_etat_distribution():
     """
     Retourne la distribution du personnel par état.
     """
-    result = db.session.query(Personnel.etat, func.count(Personnel.id))\
-        .group_by(Personnel.etat).all()
-    return jsonify({etat.value: count for etat, count in result})
+    result = read_stats("personnel_etat")
+    return jsonify({EtatPersonnel[etat].value: int(count) for etat, count in result.items()})
 
 # Nombre d'articles par zone
 @general_bp.route('/stats/articles/per_zone')
+@versioned("articles")
+@response_cache.cached("articles")
 def articles_per_zone():
     """
     Retourne le nombre d'articles par zone.
     """
-    result = db.session.query(Article.zone, func.count(Article.id)).group_by(Article.zone).all()
-    return jsonify({f'zone_{zone}': count for zone, count in result})
+    result = read_stats("articles_zone")
+    return jsonify({f'zone_{zone}': int(count) for zone, count in result.items()})
@@ -0,0 +1,159 @@
+# routes/general/listing.py
+
+from flask import Response, current_app, jsonify, request, stream_with_context
+from couche_data.db_connect import db
+from couche_data.db_changes import changes_since, current_version, parse_since
+from couche_metier.utils import columnar
+
+# -----------------------------
+# Paramètres des listes /general
+# -----------------------------
+MAX_LIMIT = 10000  # taille maximale d'une page
+YIELD_PER = 1000   # lignes lues par aller-retour avec le curseur serveur en streaming
+
+
+class ListingError(ValueError):
+    """
+    Paramètre de pagination ou de streaming invalide (réponse 400).
+    """
+
+
+def _page_params(key_column):
+    """
+    Lit ?after=<id>&limit=<n> ; `after` est converti au type de la clé primaire.
+    """
+    after = request.args.get("after")
+    limit = request.args.get("limit")
+    try:
+        if after is not None:
+            after = key_column.type.python_type(after)
+        if limit is not None:
+            limit = int(limit)
+            if limit <= 0:
+                raise ValueError(limit)
+            limit = min(limit, MAX_LIMIT)
+    except ValueError:
+        raise ListingError("Paramètres de pagination invalides : after=<id>, limit=<entier positif>")
+    return after, limit
+
+
+def _stream(rows, serialize, fmt):
+    """
+    Générateur de la réponse en streaming : NDJSON ou tableau JSON par morceaux.
+    """
+    dumps = current_app.json.dumps
+    if fmt == "ndjson":
+        for row in rows:
+            yield dumps(serialize(row)) + "\n"
+        return
+
+    yield "["
+    first = True
+    for row in rows:
+        yield ("" if first else ",") + dumps(serialize(row))
+        first = False
+    yield "]"
+
+
+def _delta_response(query, key_column, serialize, since):
+    """
+    Réponse ?since= : lignes ajoutées ou modifiées depuis `since` (version ou date),
+    clés supprimées, et version à demander la fois suivante. ?since=0, ou une table
+    rechargée en masse depuis `since`, renvoie toutes les lignes avec "full": true
+    (le client remplace alors sa copie).
+    """
+    try:
+        since = parse_since(since)
+    except ValueError:
+        return jsonify({"error": "since doit être un numéro de version ou une date ISO 8601"}), 400
+
+    version = current_version(db.session)
+    to_key = key_column.type.python_type
+    changes = None if since == 0 else changes_since(db.session, key_column.table.name, since, version)
+    full = changes is None
+    if full:
+        items = [serialize(row) for row in query.order_by(key_column)]
+        deleted = []
+    else:
+        upserted, deleted = changes
+        keys = [to_key(k) for k in upserted]
+        items = []
+        for start in range(0, len(keys), MAX_LIMIT):
+            chunk = query.filter(key_column.in_(keys[start:start + MAX_LIMIT])).order_by(key_column)
+            items.extend(serialize(row) for row in chunk)
+        deleted = [to_key(k) for k in deleted]
+
+    return _items_response(query, items, version, deleted, full)
+
+
+def _items_response(query, items, version, deleted=None, full=False):
+    """
+    Corps d'une liste (ou d'une réponse ?since= si `deleted` est donné) : JSON, ou
+    Arrow IPC / Parquet si l'en-tête Accept le préfère (voir utils/columnar.py).
+    En colonnaire, la version, les clés supprimées et l'indicateur "full" d'un delta
+    passent dans les métadonnées du schéma.
+    """
+    fmt = columnar.negotiate(request.accept_mimetypes)
+    if fmt is not None:
+        metadata = None if deleted is None else {"version": version, "deleted": deleted, "full": full}
+        names = [column["name"] for column in query.column_descriptions]
+        response = Response(columnar.encode(items, fmt, names, metadata), mimetype=fmt)
+    elif deleted is None:
+        response = jsonify(items)
+    else:
+        response = jsonify({"version": version, "items": items, "deleted": deleted, "full": full})
+    response.headers["X-Change-Version"] = str(version)
+    if columnar.FORMATS:
+        response.vary.add("Accept")
+    return response
+
+
+def list_response(query, key_column, serialize):
+    """
+    Réponse commune des listes /general.
+
+    - sans paramètre : liste JSON complète (comportement historique)
+    - ?after=<id>&limit=<n> : pagination par clé (keyset, triée sur la clé primaire) ;
+      l'en-tête X-Next-After donne la valeur de `after` pour la page suivante
+    - ?stream=ndjson : un objet JSON par ligne ; ?stream=json : tableau JSON envoyé par morceaux.
+      Les lignes sont lues par lots avec un curseur côté serveur (mémoire constante).
+    - ?since=<version|date> : deltas depuis une version du journal (voir _delta_response)
+
+    L'en-tête X-Change-Version donne la version du journal au moment de la lecture.
+    Hors streaming, Accept: application/vnd.apache.arrow.stream (ou Parquet) renvoie
+    la liste en format colonnaire.
+    """
+    since = request.args.get("since")
+    if since is not None:
+        if any(name in request.args for name in ("after", "limit", "stream")):
+            return jsonify({"error": "since ne se combine pas avec after, limit ou stream"}), 400
+        return _delta_response(query, key_column, serialize, since)
+
+    try:
+        after, limit = _page_params(key_column)
+    except ListingError as e:
+        return jsonify({"error": str(e)}), 400
+
+    fmt = request.args.get("stream")
+    if fmt not in (None, "json", "ndjson"):
+        return jsonify({"error": "stream doit valoir 'json' ou 'ndjson'"}), 400
+
+    version = current_version(db.session)  # lue avant les lignes : aucun changement manqué
+    if after is not None or limit is not None:
+        query = query.order_by(key_column)
+        if after is not None:
+            query = query.filter(key_column > after)
+        if limit is not None:
+            query = query.limit(limit)
+
+    if fmt is not None:
+        mimetype = "application/x-ndjson" if fmt == "ndjson" else "application/json"
+        rows = query.yield_per(YIELD_PER)
+        return Response(stream_with_context(_stream(rows, serialize, fmt)), mimetype=mimetype,
+                        headers={"X-Change-Version": str(version)})
+
+    items = [serialize(row) for row in query.all()]
+    response = _items_response(query, items, version)
+    if limit is not None and len(items) == limit:
+        response.headers["X-Next-After"] = str(items[-1][key_column.key])
+    return response
@@ -0,0 +1,54 @@
+"""
+Configuration gunicorn de l'API (région Brésil).
+
+    gunicorn -c couche_metier/gunicorn.conf.py couche_metier.wsgi:app
+
+Mode de déploiement (variable INNOV3D_WORKER_CLASS) :
+- "gevent" (défaut) : chaque requête est une greenlet ; une requête d'agrégation qui
+  attend les autres régions ne bloque plus le worker, qui garde des centaines de
+  requêtes en vol (WORKER_CONNECTIONS). requests/urllib3 et le pool de threads de
+  data_agregation deviennent coopératifs par le monkey-patching de gevent ;
+  psycopg2 l'est aussi si psycogreen est installé (patch appliqué au démarrage du worker).
+- "gthread" : WEB_THREADS threads par worker, sans dépendance supplémentaire.
+- "sync" : comportement gunicorn d'origine (une requête à la fois par worker).
+
+INNOV3D_PREFETCH=1 démarre dans chaque worker le préchargement périodique des sources
+externes (voir _settings.prefetch de Innov3D_endpt.json) : les endpoints d'agrégation
+servent alors les instantanés en cache sans appel sortant. L'application est chargée
+après le fork (pas de preload_app), le thread de préchargement vit donc dans le worker.
+
+Pool de connexions PostgreSQL par worker (DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_PGBOUNCER, ...) :
+voir couche_data/db_engine.py. Si l'application est chargée avant le fork (preload_app),
+post_fork libère dans chaque worker les connexions héritées du maître.
+"""
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+worker_class = os.getenv("INNOV3D_WORKER_CLASS", "gevent")
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_connections = int(os.getenv("WORKER_CONNECTIONS", "1000"))  # gevent : requêtes en vol par worker
+threads = int(os.getenv("WEB_THREADS", "32")) if worker_class == "gthread" else 1
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+keepalive = 5
+
+
+def post_fork(server, worker):
+    """
+    Un worker ne doit pas réutiliser les sockets PostgreSQL ouverts par le maître.
+    """
+    from couche_data.db_engine import dispose_engines
+    dispose_engines()
+
+
+def post_worker_init(worker):
+    """
+    En mode gevent, rend psycopg2 coopératif (sinon une requête SQL bloque toutes les greenlets).
+    """
+    if worker_class != "gevent":
+        return
+    try:
+        from psycogreen.gevent import patch_psycopg
+    except ImportError:
+        worker.log.warning("psycogreen absent : les requêtes PostgreSQL bloquent le worker gevent")
+        return
+    patch_psycopg()
@@ -1,7 +1,9 @@
 from flask import Blueprint, jsonify
 from couche_data.db_connect import db
 from couche_data.db_tables import Article, EtatEmballage
-from couche_metier.utils.data_agregation import aggregate_data_multi
+from couche_metier.utils.data_agregation import aggregate_data_multi, data_age_seconds, response_cache, VOCABULARIES
+from couche_metier.utils.resultats import totals, extreme_per_group, records
+from couche_metier.general.conditional import versioned
 
 # Création du Blueprint pour le module Recherche & Développement
 rd_bp = Blueprint('rd', __name__, url_prefix='/recherche_developpement')
@@ -11,18 +13,20 @@ rd_bp = Blueprint('rd', __name__, url_prefix='/recherche_developpement')
 # A - Articles déformés sans collision
 # -----------------------------
 @rd_bp.route('/articles/deformes_sans_collision')
+@response_cache.cached("articles")
 def articles_deformes_sans_collision():
     """
     Retourne le nombre d'articles dont l'emballage est déformé
     mais qui n'ont subi aucune collision, en agrégeant la base locale et les APIs externes.
     """
     # --- Agrégation des données internes + externes ---
+    # Le filtre local est fait en SQL (index ix_articles_etat_emballage_collisions)
     df_all, sources_responded = aggregate_data_multi(
         local_query=db.session.query(
             Article.id,
             Article.etat_emballage,
             Article.collisions
-        ),
+        ).filter(Article.etat_emballage == EtatEmballage.defo, Article.collisions == 0),
         external_key="articles",
         id_col="id",
         value_cols=["etat_emballage", "collisions"],
@@ -30,22 +34,27 @@ def articles_deformes_sans_collision():
     )
 
     if df_all.empty:
-        return jsonify({"articles_deformes_sans_collision": 0, "sources_responded": [], "num_sources_responded": 0})
+        return jsonify({
+            "articles_deformes_sans_collision": 0,
+            "sources_responded": sources_responded,
+            "num_sources_responded": len(sources_responded),
+            "data_age_seconds": data_age_seconds()
+        })
+
+    # --- Normalisation des états d'emballage (vocabulaire commun, libellés "Déformé"/"Correct") ---
+    df_all["etat_emballage"] = VOCABULARIES["etat_emballage"].normalize(df_all["etat_emballage"])
 
-    # --- Normalisation des états d'emballage en minuscules ---
-    if "etat_emballage" in df_all.columns:
-        df_all["etat_emballage"] = df_all["etat_emballage"].apply(lambda x: str(x).split('.')[-1].lower())
-    
     # --- Filtrage des articles déformés sans collision ---
     df_filtered = df_all[
-        (df_all["etat_emballage"].isin(["defo", "deformé", "déformé", "abimé", "abim", "abim�"]))  
+        (df_all["etat_emballage"] == EtatEmballage.defo.value)
         & (df_all["collisions"] == 0)
     ]
 
     return jsonify({
         "articles_deformes_sans_collision": len(df_filtered),
         "sources_responded": sources_responded,
-        "num_sources_responded": len(sources_responded)
+        "num_sources_responded": len(sources_responded),
+        "data_age_seconds": data_age_seconds()
     })
 
 
@@ -53,6 +62,7 @@ def articles_deformes_sans_collision():
 # B - Machine avec la plus faible cadence (simulée)
 # -----------------------------
 @rd_bp.route('/machine/faible_cadence')
+@response_cache.cached()
 def machine_faible_cadence():
     """
     Retourne la machine (zone) avec la cadence la plus faible à partir des APIs externes.
@@ -78,19 +88,15 @@ def machine_faible_cadence():
     df_all["deduced_cadence"] = df_all["cadence_de_production"].astype(float)
 
     # --- Trouver la machine (zone) avec la cadence minimale par source ---
-    result_list = []
-    for source, df_source in df_all.groupby("source"):
-        min_row = df_source.loc[df_source["deduced_cadence"].idxmin()]
-        result_list.append({
-            "source": source,
-            "zone_machine": min_row["zone"],
-            "cadence": round(min_row["deduced_cadence"], 2)
-        })
+    best = extreme_per_group(df_all, "source", "deduced_cadence", how="min")
+    result_list = records(best, {"source": "source", "zone_machine": "zone", "cadence": "deduced_cadence"},
+                          decimals={"cadence": 2})
 
     return jsonify({
         "machines_faible_cadence": result_list,
         "sources_responded": sources_responded,
-        "num_sources_responded": len(sources_responded)
+        "num_sources_responded": len(sources_responded),
+        "data_age_seconds": data_age_seconds()
     })
 
 
@@ -98,6 +104,8 @@ def machine_faible_cadence():
 # C - Répartition des articles par état d'emballage
 # -----------------------------
 @rd_bp.route('/articles/repartition_emballage')
+@versioned("articles")
+@response_cache.cached("articles")
 def repartition_emballage():
     """
     Retourne la répartition des articles par état d'emballage.
@@ -115,18 +123,20 @@ def repartition_emballage():
 # D - Articles déformés sans collision par source
 # -----------------------------
 @rd_bp.route('/articles/deformes_sans_collision_per_source')
+@response_cache.cached("articles")
 def articles_deformes_sans_collision_per_source():
     """
     Retourne le nombre d'articles déformés sans collision, agrégés par source
     (DB locale + APIs externes).
     """
     # --- Agrégation des données internes + externes ---
+    # Le filtre local est fait en SQL (index ix_articles_etat_emballage_collisions)
     df_all, sources_responded = aggregate_data_multi(
         local_query=db.session.query(
             Article.id,
             Article.etat_emballage,
             Article.collisions
-        ),
+        ).filter(Article.etat_emballage == EtatEmballage.defo, Article.collisions == 0),
         external_key="articles",
         id_col="id",
         value_cols=["etat_emballage", "collisions"],
@@ -134,26 +144,29 @@ def articles_deformes_sans_collision_per_source():
     )
 
     if df_all.empty:
-        return jsonify({"articles_deformes_sans_collision": [], "sources_responded": [], "num_sources_responded": 0})
+        return jsonify({
+            "articles_deformes_sans_collision": [],
+            "sources_responded": sources_responded,
+            "num_sources_responded": len(sources_responded),
+            "data_age_seconds": data_age_seconds()
+        })
 
-    # --- Normalisation des états d'emballage ---
-    if "etat_emballage" in df_all.columns:
-        df_all["etat_emballage"] = df_all["etat_emballage"].apply(lambda x: str(x).split('.')[-1].lower())
+    # --- Normalisation des états d'emballage (vocabulaire commun, libellés "Déformé"/"Correct") ---
+    df_all["etat_emballage"] = VOCABULARIES["etat_emballage"].normalize(df_all["etat_emballage"])
 
     # --- Filtrage des articles déformés sans collision ---
     df_filtered = df_all[
-        (df_all["etat_emballage"].isin(["defo", "deformé", "déformé", "abimé", "abim", "abim�"]))  
-         & (df_all["collisions"] == 0)
+        (df_all["etat_emballage"] == EtatEmballage.defo.value)
+        & (df_all["collisions"] == 0)
     ]
 
     # --- Comptage par source ---
-    counts_per_source = df_filtered.groupby("source").size().reset_index(name="count")
-
-    # --- Conversion en liste de dictionnaires ---
-    result = counts_per_source.to_dict(orient="records")
+    counts_per_source = totals(df_filtered, "source", "id", how="size")
+    result = records(counts_per_source, {"source": "source", "count": "id"})
 
     return jsonify({
         "articles_deformes_sans_collision": result,
         "sources_responded": sources_responded,
-        "num_sources_responded": len(sources_responded)
+        "num_sources_responded": len(sources_responded),
+        "data_age_seconds": data_age_seconds()
     })
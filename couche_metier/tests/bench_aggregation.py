@@ -0,0 +1,120 @@
+"""
+Micro-benchmark de l'assemblage multi-sources de aggregate_data_multi
+et de la construction des réponses JSON.
+
+Compare l'ancien assemblage (DataFrame vide + pd.concat à chaque source)
+à assemble_frame (une seule allocation, colonnes typées), puis la construction
+de la réponse de marges_par_responsable : groupby par source + iterrows
+contre une passe groupby multi-clés + records (couche_metier.utils.resultats).
+
+    python -m couche_metier.tests.bench_aggregation [nb_lignes] [nb_sources] [nb_responsables]
+"""
+import sys
+import time
+import numpy as np
+import pandas as pd
+from couche_metier.utils.data_agregation import assemble_frame
+from couche_metier.utils.resultats import map_names, records, totals
+
+ID_COL, VALUE_COLS = "responsable_id", ["km", "marge"]
+COLUMNS = [ID_COL] + VALUE_COLS
+
+
+def synthetic_sources(nb_rows, nb_sources, nb_ids=500, seed=42):
+    """
+    nb_sources DataFrames (une par région) totalisant nb_rows opérations
+    réparties sur nb_ids responsables.
+    """
+    rng = np.random.default_rng(seed)
+    ids = np.array([f"P{i:06d}" for i in range(nb_ids)], dtype=object)
+    sizes = np.full(nb_sources, nb_rows // nb_sources)
+    sizes[0] += nb_rows - sizes.sum()
+    return {
+        f"Region{i}": pd.DataFrame({
+            ID_COL: ids[rng.integers(0, len(ids), size)],
+            "km": rng.uniform(5, 500, size),
+            "marge": rng.uniform(200, 5000, size),
+        })
+        for i, size in enumerate(sizes)
+    }
+
+
+def concat_repete(sources):
+    """
+    Assemblage d'origine : une copie de tout le DataFrame accumulé par source.
+    """
+    df_all = pd.DataFrame(columns=COLUMNS + ["source"])
+    for country, frame in sources.items():
+        df_all = pd.concat([df_all, frame[COLUMNS].assign(source=country)], ignore_index=True)
+    return df_all
+
+
+def assemblage_unique(sources):
+    """
+    Assemblage actuel : tableaux par colonne puis un seul DataFrame typé.
+    """
+    parts = [(country, {col: frame[col].to_numpy() for col in COLUMNS}) for country, frame in sources.items()]
+    return assemble_frame(parts, COLUMNS)
+
+
+def reponse_iterrows(df_all, names):
+    """
+    Construction d'origine : un groupby par source, puis iterrows.
+    """
+    return [
+        {
+            "source": source,
+            "responsable_id": row[ID_COL],
+            "responsable_name": names.get(row[ID_COL], row[ID_COL]),
+            "total_marge": round(row["marge"], 2)
+        }
+        for source, df_source in df_all.groupby("source", observed=True)
+        for _, row in df_source.groupby(ID_COL, as_index=False)["marge"].sum().iterrows()
+    ]
+
+
+def reponse_colonnes(df_all, names):
+    """
+    Construction actuelle : une passe groupby multi-clés, puis records par colonnes.
+    """
+    agg = totals(df_all, ["source", ID_COL], "marge")
+    return records(agg, {
+        "source": "source",
+        ID_COL: ID_COL,
+        "responsable_name": map_names(agg[ID_COL], names),
+        "total_marge": "marge",
+    }, decimals={"total_marge": 2})
+
+
+def chrono(fn, *args, repeat=3):
+    """
+    Meilleur temps (s) sur `repeat` exécutions, et le dernier résultat.
+    """
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(nb_rows=1_000_000, nb_sources=8, nb_ids=100_000):
+    sources = synthetic_sources(nb_rows, nb_sources, nb_ids)
+    print(f"{nb_rows:,} lignes, {nb_sources} sources, {nb_ids:,} responsables")
+
+    for label, assemble in [("pd.concat répété", concat_repete), ("assemble_frame", assemblage_unique)]:
+        t_build, df_all = chrono(assemble, sources)
+        t_group, _ = chrono(lambda: df_all.groupby(["source", ID_COL], observed=True)["km"].sum())
+        memory = df_all.memory_usage(deep=True).sum() / 1e6
+        print(f"{label:<18} assemblage {t_build * 1000:8.1f} ms | groupby {t_group * 1000:8.1f} ms "
+              f"| mémoire {memory:7.1f} Mo | km: {df_all['km'].dtype}")
+
+    df_all = assemblage_unique(sources)
+    names = {f"P{i:06d}": f"Personne {i}" for i in range(0, nb_ids, 2)}
+    for label, build in [("iterrows", reponse_iterrows), ("records", reponse_colonnes)]:
+        t_build, data = chrono(build, df_all, names, repeat=1 if build is reponse_iterrows else 3)
+        print(f"{label:<18} réponse    {t_build * 1000:8.1f} ms | {len(data):,} lignes JSON")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:4]))
@@ -0,0 +1,84 @@
+"""
+Micro-benchmark des routes de lecture /general (SQLite en mémoire).
+
+Compare la lecture d'origine (objets ORM complets, dicts construits à la main,
+encodeur json de Flask) à la lecture par colonnes de couche_data.db_read
+(tuples, enums traduits par table de correspondance, encodeur orjson).
+
+    python -m couche_metier.tests.bench_general_read [nb_lignes]
+"""
+import os
+import sys
+import time
+
+os.environ["DATABASE_URL"] = "sqlite://"
+
+import random
+from flask.json.provider import DefaultJSONProvider
+from couche_data.db_connect import db
+from couche_data.db_read import READ_MODELS
+from couche_data.db_tables import OperationCommerciale, Personnel, EtatPersonnel, ServicePersonnel
+from couche_metier.wsgi import app
+
+
+def seed(nb_rows):
+    """
+    50 personnels et nb_rows opérations.
+    """
+    db.session.add_all(
+        Personnel(id=f"P{i}", nom_prenom=f"Personne {i}", etat=EtatPersonnel.actif, service=ServicePersonnel.commercial)
+        for i in range(50)
+    )
+    db.session.execute(OperationCommerciale.__table__.insert(), [
+        {"type_op": random.choice(["achat", "vente"]), "responsable_id": f"P{i % 50}",
+         "marge": random.uniform(200, 5000), "km_parcourus": random.uniform(5, 500),
+         "mot_cle_responsable": "mot", "mot_cle_client": "client"}
+        for i in range(nb_rows)
+    ])
+    db.session.commit()
+
+
+def lecture_orm():
+    """
+    Lecture d'origine : hydratation ORM + map id -> nom + json de Flask.
+    """
+    ops = OperationCommerciale.query.all()
+    personnels_map = {p.id: p.nom_prenom for p in Personnel.query.all()}
+    body = DefaultJSONProvider(app).dumps([{
+        'id': o.id,
+        'type_op': o.type_op.value,
+        'responsable_id': o.responsable_id,
+        'responsable_name': personnels_map.get(o.responsable_id, 'Inconnu'),
+        'marge': o.marge,
+        'km_parcourus': o.km_parcourus,
+        'mot_cle_responsable': o.mot_cle_responsable,
+        'mot_cle_client': o.mot_cle_client
+    } for o in ops])
+    db.session.expunge_all()
+    return body
+
+
+def lecture_colonnes():
+    """
+    Lecture actuelle : projection de colonnes + orjson.
+    """
+    model = READ_MODELS["operations"]
+    return app.json.dumps_bytes([model.serialize(row) for row in model.query().all()])
+
+
+def main(nb_rows=100_000):
+    with app.app_context():
+        db.create_all()
+        seed(nb_rows)
+        print(f"{nb_rows:,} opérations")
+        for label, fn in [("ORM + json", lecture_orm), ("colonnes + orjson", lecture_colonnes)]:
+            best = float("inf")
+            for _ in range(3):
+                start = time.perf_counter()
+                fn()
+                best = min(best, time.perf_counter() - start)
+            print(f"{label:<18} {best * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,55 @@
+import os
+
+# -----------------------------
+# Base SQLite en mémoire pour les tests (à définir avant l'import de l'app)
+# -----------------------------
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ.setdefault("API_KEY", "test-key")
+
+import pytest
+from couche_data.db_connect import db
+from couche_data.db_tables import (
+    Personnel, Article, OperationCommerciale, Surveillance,
+    EtatPersonnel, ServicePersonnel, TypeOperation, EtatEmballage, DetectionForme
+)
+from couche_metier.wsgi import app as flask_app
+from couche_metier.utils.data_agregation import response_cache
+
+
+@pytest.fixture
+def app():
+    """
+    Application Flask complète (tous les blueprints) sur une base vide.
+    """
+    response_cache.clear()
+    with flask_app.app_context():
+        db.create_all()
+        yield flask_app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def bresil(app):
+    """
+    Base locale (Brésil) minimale.
+    """
+    db.session.add_all([
+        Personnel(id="B1", nom_prenom="Ana Souza", etat=EtatPersonnel.actif,
+                  service=ServicePersonnel.commercial, position="-23.55,-46.63"),
+        Personnel(id="B2", nom_prenom="João Lima", etat=EtatPersonnel.repos,
+                  service=ServicePersonnel.logistique, position="-22.90,-43.17"),
+    ])
+    db.session.add_all([
+        OperationCommerciale(type_op=TypeOperation.vente, responsable_id="B1", marge=500.0, km_parcourus=300.0),
+        OperationCommerciale(type_op=TypeOperation.vente, responsable_id="B1", marge=250.0, km_parcourus=400.0),
+        OperationCommerciale(type_op=TypeOperation.achat, responsable_id="B2", marge=80.0, km_parcourus=20.0),
+        Article(id=1000, zone=3, etat_emballage=EtatEmballage.defo, responsable_id="B1", collisions=0),
+        Article(id=1001, zone=3, etat_emballage=EtatEmballage.correct, responsable_id="B2", collisions=0),
+        Article(id=1002, zone=4, etat_emballage=EtatEmballage.defo, responsable_id="B2", collisions=1),
+        Surveillance(zone=1, drones_actifs=3, drones_panne=2, drones_rechargement=1,
+                     detection_incendie=False, detection_forme=DetectionForme.aucune, audit_conformite=True),
+        Surveillance(zone=2, drones_actifs=1, drones_panne=0, drones_rechargement=4,
+                     detection_incendie=False, detection_forme=DetectionForme.aucune, audit_conformite=True),
+    ])
+    db.session.commit()
@@ -30,6 +30,8 @@ ALL_ENDPOINTS = [
     # Général
     # -----------------------------
     '/general/tables',
+    '/general/sources/cache',
+    '/general/sources/health',
     '/general/personnel',
     '/general/articles',
     '/general/operations',
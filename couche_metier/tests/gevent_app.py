@@ -0,0 +1,31 @@
+"""
+Application servie par gunicorn dans test_gevent_worker : l'API complète, dont la
+seule source "releves" est une région lente simulée (0,5 s par appel, sans cache).
+"""
+import time
+from flask import jsonify
+from couche_metier.utils import data_agregation
+from couche_metier.wsgi import app
+
+SLOW_PEER_DELAY = 0.5
+RELEVES = [{"zone": 1, "id": 1, "co2": 410.0}, {"zone": 2, "id": 2, "co2": 395.5}]
+
+
+downloads = []
+
+
+def _slow_download(cfg, timeout):
+    downloads.append(cfg["url"])
+    time.sleep(SLOW_PEER_DELAY)  # coopératif sous gevent (monkey-patching du worker)
+    return RELEVES
+
+
+data_agregation.EXTERNAL_APIS["releves"] = {
+    "Lent": {"url": "http://lent/releves", "rename_map": {}, "cache_ttl": 0, "stale_ttl": 0},
+}
+data_agregation._download = _slow_download
+
+
+@app.route("/tests/downloads")
+def count_downloads():
+    return jsonify({"downloads": len(downloads)})
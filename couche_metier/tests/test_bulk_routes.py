@@ -0,0 +1,138 @@
+import json
+from couche_data.db_connect import db
+from couche_data.db_tables import Article, Formation, OperationCommerciale, Personnel, EtatPersonnel, EtatEmballage
+from couche_metier.general import bulk_routes
+
+HEADERS = {"x-api-key": "test-key"}
+
+
+def test_bulk_json_insert(client, app):
+    rows = [
+        {"id": "P1", "nom_prenom": "Ana", "etat": "actif", "service": "commercial"},
+        {"id": "P2", "nom_prenom": "Rui", "etat": "arrêt maladie", "service": "finance et gestion"},
+    ]
+    resp = client.post("/write/personnel/bulk", json=rows, headers=HEADERS)
+
+    assert resp.status_code == 201
+    assert resp.get_json() == {"status": "success", "inserted": 2, "errors": []}
+    assert db.session.get(Personnel, "P2").etat == EtatPersonnel.arret_maladie
+
+
+def test_bulk_reports_invalid_rows(client, app):
+    rows = [
+        {"type_op": "Vente", "marge": 10.0},
+        {"type_op": "Troc"},
+        {"marge": 5.0},
+        "pas un objet",
+        {"type_op": "Achat"},
+    ]
+    resp = client.post("/write/operation/bulk", json=rows, headers=HEADERS)
+    data = resp.get_json()
+
+    assert resp.status_code == 201
+    assert data["inserted"] == 2
+    assert data["errors"] == [
+        {"index": 1, "error": "valeur invalide pour type_op"},
+        {"index": 2, "error": "champ manquant : type_op"},
+        {"index": 3, "error": "ligne non objet"},
+    ]
+    assert OperationCommerciale.query.count() == 2
+
+
+def test_bulk_reports_non_numeric_values(client, app):
+    rows = [
+        {"zone": 1, "collisions": "2"},
+        {"zone": "deux"},
+        {"zone": 1.5},
+        {"zone": 3, "collisions": True},
+        {"zone": 4},
+    ]
+    resp = client.post("/write/article/bulk", json=rows, headers=HEADERS)
+    data = resp.get_json()
+
+    assert resp.status_code == 201
+    assert data["inserted"] == 2
+    assert data["errors"] == [
+        {"index": 1, "error": "nombre invalide pour zone"},
+        {"index": 2, "error": "nombre invalide pour zone"},
+        {"index": 3, "error": "nombre invalide pour collisions"},
+    ]
+    assert Article.query.order_by(Article.id).first().collisions == 2
+
+
+def test_bulk_ndjson_and_dates(client, app):
+    body = "\n".join([
+        json.dumps({"nom_formation": "Sécurité", "sujet": "qualité", "date_formation": "2024-03-01"}),
+        "{cassé",
+        json.dumps({"nom_formation": "Excel", "date_formation": "hier"}),
+    ])
+    resp = client.post("/write/formation/bulk", data=body,
+                       headers={**HEADERS, "Content-Type": "application/x-ndjson"})
+    data = resp.get_json()
+
+    assert resp.status_code == 201
+    assert data["inserted"] == 1
+    assert [e["index"] for e in data["errors"]] == [1, 2]
+    assert Formation.query.one().date_formation.isoformat() == "2024-03-01"
+
+
+def test_bulk_ndjson_several_bad_lines(client, app):
+    good = json.dumps({"type_op": "Vente", "km_parcourus": 1.0})
+    body = "\n".join([good, "{cassé", good, "pas du json", good])
+    resp = client.post("/write/operation/bulk", data=body,
+                       headers={**HEADERS, "Content-Type": "application/x-ndjson"})
+    data = resp.get_json()
+
+    assert data["inserted"] == 3
+    assert [e["index"] for e in data["errors"]] == [1, 3]
+    assert OperationCommerciale.query.count() == 3
+
+
+def test_bulk_upsert(client, bresil):
+    rows = [
+        {"id": 1000, "zone": 9, "etat_emballage": "Correct", "responsable_id": "B1"},
+        {"id": 2000, "zone": 5, "etat_emballage": "Déformé"},
+    ]
+    conflict = client.post("/write/article/bulk", json=rows, headers=HEADERS)
+    assert conflict.status_code == 409
+    assert db.session.get(Article, 2000) is None  # lot entier annulé
+
+    resp = client.post("/write/article/bulk?on_conflict=update", json=rows, headers=HEADERS)
+    assert resp.status_code == 201
+    db.session.expire_all()
+    article = db.session.get(Article, 1000)
+    assert (article.zone, article.etat_emballage, article.collisions) == (9, EtatEmballage.correct, 0)
+    assert db.session.get(Article, 2000).zone == 5
+
+
+def test_bulk_upsert_same_key_twice(client, app):
+    rows = [
+        {"id": "P1", "nom_prenom": "Rui", "etat": "actif", "service": "commercial"},
+        {"id": "P1", "nom_prenom": "Rui", "etat": "repos", "service": "commercial"},
+    ]
+    resp = client.post("/write/personnel/bulk?on_conflict=update", json=rows, headers=HEADERS)
+
+    assert resp.get_json()["inserted"] == 1
+    assert Personnel.query.one().etat == EtatPersonnel.repos
+    assert client.get("/general/stats/personnel/count").get_json()["nb_personnel"] == 1
+    assert client.get("/general/stats/personnel/etat").get_json() == {"repos": 1}
+
+
+def test_bulk_errors(client, app):
+    assert client.post("/write/personnel/bulk", json=[]).status_code == 401
+    assert client.post("/write/inconnu/bulk", json=[], headers=HEADERS).status_code == 404
+    assert client.post("/write/personnel/bulk", json={"id": "P1"}, headers=HEADERS).status_code == 400
+    resp = client.post("/write/personnel/bulk", json=[{"id": "P1"}], headers=HEADERS)
+    assert resp.status_code == 400
+    assert resp.get_json()["inserted"] == 0
+
+
+def test_bulk_ndjson_row_limit(client, app, monkeypatch):
+    monkeypatch.setattr(bulk_routes, "MAX_BULK_ROWS", 2)
+    body = "\n".join(json.dumps({"type_op": "Vente"}) for _ in range(3))
+
+    resp = client.post("/write/operation/bulk", data=body,
+                       headers={**HEADERS, "Content-Type": "application/x-ndjson"})
+
+    assert resp.status_code == 413
+    assert OperationCommerciale.query.count() == 0
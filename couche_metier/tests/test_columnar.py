@@ -0,0 +1,85 @@
+import pytest
+from couche_metier.utils import columnar, data_agregation
+from couche_metier.utils.data_agregation import EXTERNAL_APIS, peer_mirror
+
+pytest.importorskip("pyarrow")
+
+HEADERS = {"x-api-key": "test-key"}
+
+
+# -----------------------------
+# Listes /general en colonnaire
+# -----------------------------
+def test_arrow_list_matches_json(client, bresil):
+    expected = client.get("/general/operations").get_json()
+
+    response = client.get("/general/operations", headers={"Accept": columnar.ARROW})
+
+    assert response.mimetype == columnar.ARROW
+    assert "Accept" in response.headers["Vary"]
+    frame = columnar.decode(response.data, response.content_type)
+    assert frame["id"].tolist() == [item["id"] for item in expected]
+    assert frame["km_parcourus"].dtype == float
+    assert frame["responsable_name"].tolist() == [item["responsable_name"] for item in expected]
+
+
+def test_parquet_delta_keeps_version_and_deleted(client, bresil):
+    since = int(client.get("/general/articles").headers["X-Change-Version"])
+    client.put("/write/article/1001", json={"collisions": 5}, headers=HEADERS)
+    client.delete("/write/article/1002", headers=HEADERS)
+    version = int(client.get("/general/articles").headers["X-Change-Version"])
+
+    response = client.get(f"/general/articles?since={since}", headers={"Accept": columnar.PARQUET})
+
+    payload = columnar.decode(response.data, response.content_type)
+    assert payload["version"] == version
+    assert payload["deleted"] == [1002]
+    assert payload["items"]["id"].tolist() == [1001]
+
+
+def test_browser_accept_gets_json(client, bresil):
+    response = client.get("/general/personnel", headers={"Accept": "text/html,*/*;q=0.8"})
+
+    assert response.mimetype == "application/json"
+
+
+def test_cache_and_etag_depend_on_format(client, bresil):
+    json_response = client.get("/general/personnel")
+    arrow = client.get("/general/personnel", headers={"Accept": columnar.ARROW,
+                                                      "If-None-Match": json_response.headers["ETag"]})
+
+    assert arrow.status_code == 200
+    assert arrow.headers["X-Cache"] == "MISS"
+    assert arrow.mimetype == columnar.ARROW
+
+
+# -----------------------------
+# Agrégation : Arrow demandé en premier
+# -----------------------------
+class _PeerResponse:
+    def __init__(self, response):
+        self.headers, self.content = response.headers, response.data
+        self.json = response.get_json
+
+    def raise_for_status(self):
+        pass
+
+
+@pytest.mark.parametrize("delta", [False, True])
+def test_aggregation_downloads_arrow(client, bresil, monkeypatch, delta):
+    accepts = []
+
+    def get(url, timeout, params=None, headers=None):
+        accepts.append(headers["Accept"])
+        return _PeerResponse(client.get(url.removeprefix("http://chili"), query_string=params, headers=headers))
+
+    peer_mirror.clear()
+    monkeypatch.setattr(data_agregation.sources_http, "get", get)
+    cfg = {"url": "http://chili/general/operations", "rename_map": {"km_parcourus": "km"}, "delta": delta}
+    monkeypatch.setitem(EXTERNAL_APIS, "operations", {"Chili": cfg})
+
+    assert data_agregation._load_source(("operations", "Chili"), cfg, 5) == 3
+
+    assert accepts[0].startswith(columnar.ARROW)
+    assert sorted(peer_mirror.select("operations", ["Chili"], ["km"])["km"].tolist()) == [20.0, 300.0, 400.0]
+    peer_mirror.clear()
@@ -0,0 +1,225 @@
+import time
+import pytest
+from couche_metier.utils import data_agregation
+from concurrent.futures import ThreadPoolExecutor, wait
+from couche_metier.utils.data_agregation import EXTERNAL_APIS, aggregate_data_multi, source_cache, source_health
+from couche_metier.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from couche_metier.utils.source_cache import SourceCache
+from couche_metier.utils.http_client import SourcesHttpClient
+
+
+# -----------------------------
+# Fausses régions : {url: (latence en s, données)}
+# -----------------------------
+PEERS = {
+    "http://rapide/operations": (0.05, [{"responsable": "E1", "kilometres": 10.0}]),
+    "http://moyen/operations": (0.2, [{"responsable": "E2", "kilometres": 20.0}]),
+    "http://lent/operations": (2.0, [{"responsable": "E3", "kilometres": 30.0}]),
+    "http://rapide/personnel": (0.2, [{"id": "E1", "nomPrenom": "Ana Souza"}]),
+}
+RENAME = {"responsable": "responsable_id", "kilometres": "km"}
+
+
+@pytest.fixture
+def peers(monkeypatch):
+    """
+    Remplace les appels HTTP par des régions simulées et compte les appels.
+    """
+    calls = []
+    source_cache.clear()
+    source_health.clear()
+
+    def fake_download(cfg, timeout):
+        calls.append(cfg["url"])
+        latency, data = PEERS[cfg["url"]]
+        time.sleep(latency)
+        return data
+
+    monkeypatch.setattr(data_agregation, "_download", fake_download)
+    monkeypatch.setitem(EXTERNAL_APIS, "operations", {
+        "Rapide": {"url": "http://rapide/operations", "rename_map": RENAME},
+        "Moyen": {"url": "http://moyen/operations", "rename_map": RENAME},
+    })
+    monkeypatch.setitem(EXTERNAL_APIS, "personnel", {
+        "Rapide": {"url": "http://rapide/personnel", "rename_map": {}},
+    })
+    yield calls
+    wait(list(source_cache._inflight.values()))  # un téléchargement en retard ne déborde pas sur le test suivant
+
+
+def aggregate_km(app):
+    """
+    Agrégation des km dans un contexte applicatif neuf (comme une nouvelle requête).
+    """
+    with app.app_context():
+        return aggregate_data_multi(external_key="operations", id_col="responsable_id", value_cols=["km"])
+
+
+def test_sources_interrogees_en_parallele(app, peers):
+    start = time.perf_counter()
+    df_all, sources = aggregate_data_multi(external_key="operations", id_col="responsable_id", value_cols=["km"])
+    elapsed = time.perf_counter() - start
+
+    assert sources == ["Rapide", "Moyen"]
+    assert sorted(df_all["responsable_id"]) == ["E1", "E2"]
+    # latence ~ la source la plus lente, pas la somme
+    assert elapsed < 0.24
+
+
+def test_source_en_retard_ignoree(app, peers, monkeypatch):
+    monkeypatch.setitem(EXTERNAL_APIS["operations"], "Lent", {"url": "http://lent/operations", "rename_map": RENAME})
+    monkeypatch.setattr(data_agregation, "DEADLINE", 0.5)
+
+    start = time.perf_counter()
+    df_all, sources = aggregate_data_multi(external_key="operations", id_col="responsable_id", value_cols=["km"])
+
+    assert time.perf_counter() - start < 1.0
+    assert "Lent" not in sources
+    assert sources == ["Rapide", "Moyen"]
+
+
+def test_telechargement_en_file_annule_a_l_echeance(app, peers, monkeypatch):
+    monkeypatch.setitem(EXTERNAL_APIS["operations"], "EnFile", {"url": "http://lent/operations", "rename_map": RENAME})
+    monkeypatch.setattr(source_cache, "executor", ThreadPoolExecutor(1))  # pool saturé
+
+    results = data_agregation.fetch_external_sources("operations", deadline=0.1)
+    time.sleep(0.4)  # "Moyen" est terminé : "EnFile" aurait démarré s'il était resté en file
+
+    assert list(results["operations"]) == ["Rapide"]
+    assert "http://lent/operations" not in peers
+    assert ("operations", "EnFile") not in source_cache._inflight
+
+
+def test_cache_evite_les_appels_repetes(app, peers):
+    for _ in range(3):
+        aggregate_km(app)
+
+    assert sorted(peers) == ["http://moyen/operations", "http://rapide/operations"]
+    assert source_cache.stats["hits"] == 4
+
+
+# -----------------------------
+# SourceCache
+# -----------------------------
+def test_cache_sert_les_donnees_perimees_pendant_le_rafraichissement():
+    cache = SourceCache(ThreadPoolExecutor(2), default_ttl=0, stale_ttl=60)
+    cache.put(("operations", "Egypte"), "ancien")
+
+    future = cache.get(("operations", "Egypte"), lambda: time.sleep(0.1) or "nouveau")
+
+    assert future.result() == "ancien"
+    assert cache.stats["stale_hits"] == 1
+    time.sleep(0.3)
+    assert cache._entries[("operations", "Egypte")][0] == "nouveau"
+
+
+def test_cache_un_seul_telechargement_par_cle():
+    cache = SourceCache(ThreadPoolExecutor(4))
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.1)
+        return [1, 2]
+
+    futures = [cache.get(("articles", "Egypte"), loader) for _ in range(5)]
+
+    assert [f.result() for f in futures] == [[1, 2]] * 5
+    assert len(calls) == 1
+
+
+def test_cache_eviction_lru():
+    cache = SourceCache(ThreadPoolExecutor(1), max_entries=2)
+    cache.put(("a", "x"), 1)
+    cache.put(("b", "x"), 2)
+    cache.get(("a", "x"), lambda: None)
+    cache.put(("c", "x"), 3)
+
+    assert list(cache._entries) == [("a", "x"), ("c", "x")]
+    assert cache.stats["evictions"] == 1
+
+
+def test_chaque_source_chargee_une_fois_par_requete(app, client, peers):
+    start = time.perf_counter()
+    res = client.get("/finance_gestion/responsable/max_km")
+    elapsed = time.perf_counter() - start
+
+    assert res.status_code == 200
+    assert res.get_json()["identifiant"] == "E2"
+    # opérations et personnel : un seul téléchargement chacun, en parallèle
+    assert sorted(peers) == ["http://moyen/operations", "http://rapide/operations", "http://rapide/personnel"]
+    assert elapsed < 0.35
+
+
+def test_route_compteurs_cache(app, client, peers):
+    aggregate_data_multi(external_key="operations", id_col="responsable_id", value_cols=["km"])
+
+    data = client.get("/general/sources/cache").get_json()
+
+    assert data["stats"]["misses"] == 2
+    assert set(data["entries"]) == {"operations/Rapide", "operations/Moyen"}
+
+
+# -----------------------------
+# SourcesHttpClient
+# -----------------------------
+def test_une_session_poolee_par_hote():
+    client = SourcesHttpClient(pool_size=4, retries=3)
+
+    s1 = client.session_for("https://egypte.example.com/operations")
+    s2 = client.session_for("https://egypte.example.com/personnel")
+    s3 = client.session_for("https://canada.example.com/operations")
+
+    assert s1 is s2 and s1 is not s3
+    adapter = s1.get_adapter("https://egypte.example.com/")
+    assert adapter._pool_maxsize == 4
+    assert adapter.max_retries.total == 3
+    assert "gzip" in s1.headers["Accept-Encoding"]
+
+
+
+# -----------------------------
+# Disjoncteurs
+# -----------------------------
+def test_disjoncteur_ouvert_apres_echecs_puis_referme_par_le_test():
+    executor = ThreadPoolExecutor(1)
+    breaker = CircuitBreaker("operations/Egypte", failure_threshold=2, reset_timeout=0.1)
+
+    def panne():
+        raise ConnectionError("hors ligne")
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call(panne, executor)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    # circuit ouvert : aucun appel, échec immédiat
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: pytest.fail("appel interdit"), executor)
+
+    time.sleep(0.15)
+    probed = []
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: "ok", executor, on_probe_success=probed.append)
+    executor.shutdown(wait=True)
+
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert probed == ["ok"]
+    assert breaker.snapshot()["error_rate"] == round(2 / 3, 3)
+
+
+def test_route_sante_des_sources(app, client, peers, monkeypatch):
+    def panne(cfg, timeout):
+        raise ConnectionError("hors ligne")
+
+    monkeypatch.setattr(data_agregation, "_download", panne)
+    for _ in range(3):
+        source_cache.clear()
+        aggregate_km(app)
+
+    data = client.get("/general/sources/health").get_json()
+
+    assert data["operations/Rapide"]["state"] == "open"
+    assert data["operations/Rapide"]["error_rate"] == 1.0
+    assert data["operations/Rapide"]["last_success"] is None
+    assert "articles/Egypte" in data
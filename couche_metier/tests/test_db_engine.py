@@ -0,0 +1,62 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool
+from couche_data.db_engine import TimedQueuePool, engine_options, pool_metrics, pool_snapshot
+
+POSTGRES = "postgresql://innov3d@localhost/bresil"
+
+
+# -----------------------------
+# Options du moteur
+# -----------------------------
+def test_postgres_defaults_and_env(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "3")
+    monkeypatch.setenv("DB_LOCK_TIMEOUT_MS", "800")
+
+    options = engine_options(POSTGRES)
+
+    assert options["poolclass"] is TimedQueuePool
+    assert (options["pool_size"], options["max_overflow"], options["pool_recycle"]) == (3, 10, 300)
+    assert options["pool_pre_ping"] is True
+    assert options["connect_args"]["options"] == "-c statement_timeout=30000 -c lock_timeout=800"
+
+
+def test_scripts_disable_statement_timeout():
+    assert "statement_timeout=0 " in engine_options(POSTGRES, statement_timeout=0)["connect_args"]["options"]
+
+
+def test_pgbouncer_mode_leaves_pooling_to_pgbouncer(monkeypatch):
+    monkeypatch.setenv("DB_PGBOUNCER", "1")
+
+    assert engine_options(POSTGRES) == {"poolclass": NullPool}
+
+
+def test_sqlite_keeps_flask_sqlalchemy_defaults():
+    assert engine_options("sqlite://") == {}
+
+
+# -----------------------------
+# Attente des emprunts au pool
+# -----------------------------
+def test_checkout_waits_and_timeouts_are_measured(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.sqlite'}", poolclass=TimedQueuePool,
+                           pool_size=1, max_overflow=0, pool_timeout=0.05)
+    before = pool_metrics.snapshot()
+
+    with engine.connect():
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+        report = pool_snapshot(engine)
+
+    assert report["checkouts"] == before["checkouts"] + 1
+    assert report["timeouts"] == before["timeouts"] + 1
+    assert (report["size"], report["checked_out"]) == (1, 1)
+    engine.dispose()
+
+
+def test_pool_route(client, app):
+    report = client.get("/general/db/pool").get_json()
+
+    assert report["pool"] == "StaticPool"  # base SQLite en mémoire des tests
+    assert set(report["wait_ms"]) == {"mean", "p95", "max"}
@@ -0,0 +1,68 @@
+import argparse
+from couche_data.db_connect import db
+from couche_data.db_seed import BASE_COUNTS, parse_counts, seed_database
+from couche_data.db_tables import Article, Formation, OperationCommerciale, Personnel, Surveillance
+
+COUNTS = {"personnel": 20, "operations": 2500, "articles": 700, "formations": 5, "surveillance": 4}
+
+
+def _snapshot():
+    ops = db.session.query(OperationCommerciale.responsable_id, OperationCommerciale.marge).order_by(OperationCommerciale.id).all()
+    names = [p.nom_prenom for p in Personnel.query.order_by(Personnel.id)]
+    return ops, names
+
+
+def test_seed_counts_and_foreign_keys(app):
+    inserted = seed_database(COUNTS, seed=7, chunk_size=1000)
+
+    assert inserted == COUNTS
+    assert OperationCommerciale.query.count() == 2500
+    assert db.session.query(Article.id).order_by(Article.id.desc()).first()[0] == 1000 + 700 - 1
+    assert Surveillance.query.count() == 4
+    assert Formation.query.first().date_formation is not None
+    ids = {p.id for p in Personnel.query}
+    assert {r for (r,) in db.session.query(OperationCommerciale.responsable_id).distinct()} <= ids
+
+
+def test_seed_is_deterministic(app):
+    seed_database(COUNTS, seed=7, chunk_size=1000)
+    first = _snapshot()
+    db.session.remove()
+    seed_database(COUNTS, seed=7, chunk_size=1000)
+    assert _snapshot() == first
+
+    db.session.remove()
+    seed_database(COUNTS, seed=8, chunk_size=1000)
+    assert _snapshot() != first
+
+
+def test_append_continues_ids_and_reuses_personnel(app):
+    seed_database(COUNTS, seed=7, chunk_size=1000)
+    db.session.remove()
+
+    inserted = seed_database({"personnel": 0, "operations": 10, "articles": 30, "formations": 0, "surveillance": 2},
+                             seed=8, chunk_size=7, reset=False)
+
+    assert inserted["articles"] == 30
+    assert Personnel.query.count() == 20
+    assert Article.query.count() == 730
+    assert db.session.query(db.func.max(Article.id)).scalar() == 1000 + 730 - 1
+    assert [s.zone for s in Surveillance.query.order_by(Surveillance.zone)] == [1, 2, 3, 4, 5, 6]
+    ids = {p.id for p in Personnel.query}
+    assert {r for (r,) in db.session.query(Article.responsable_id).distinct()} <= ids
+
+    seed_database({"personnel": 5, "operations": 0, "articles": 0, "formations": 0, "surveillance": 0},
+                  seed=9, reset=False)
+    assert db.session.query(db.func.max(Personnel.id)).scalar() == "BR0000024"
+
+
+def test_append_counts_only_explicit_tables():
+    args = argparse.Namespace(scale=1, append=True, **{name: None for name in BASE_COUNTS})
+    args.operations = 5000
+    assert parse_counts(args) == {"personnel": 0, "operations": 5000, "articles": 0, "formations": 0, "surveillance": 0}
+
+
+def test_parse_counts():
+    args = argparse.Namespace(scale=10, **{name: None for name in BASE_COUNTS})
+    args.operations = 5
+    assert parse_counts(args) == {"personnel": 500, "operations": 5, "articles": 2000, "formations": 200, "surveillance": 100}
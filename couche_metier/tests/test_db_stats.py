@@ -0,0 +1,59 @@
+from couche_data.db_connect import db
+from couche_data.db_stats import compute_stats, read_stat, read_stats, rebuild
+from couche_data.db_tables import Article, EtatEmballage, EtatPersonnel, OperationCommerciale, Personnel, Statistique
+
+HEADERS = {"x-api-key": "test-key"}
+
+
+def _counters():
+    return {(s.nom, s.cle): s.valeur for s in Statistique.query if s.valeur}
+
+
+def test_stats_endpoints(client, bresil):
+    assert client.get("/general/stats/personnel/count").get_json() == {"nb_personnel": 2}
+    assert client.get("/general/stats/articles/deformes").get_json() == {"nb_articles_deformes": 2}
+    assert client.get("/general/stats/operations/total_km").get_json() == {"total_km_parcourus": 720.0}
+    assert client.get("/general/stats/personnel/etat").get_json() == {"actif": 1, "repos": 1}
+    assert client.get("/general/stats/articles/per_zone").get_json() == {"zone_3": 2, "zone_4": 1}
+
+
+def test_orm_writes_keep_counters_in_sync(bresil):
+    article = db.session.get(Article, 1001)
+    article.zone = 4
+    article.etat_emballage = EtatEmballage.defo
+    db.session.delete(db.session.get(OperationCommerciale, 1))
+    personnel = db.session.get(Personnel, "B2")
+    personnel.etat = EtatPersonnel.conge
+    db.session.commit()
+
+    assert read_stats("articles_zone") == {"3": 1, "4": 2}
+    assert read_stat("articles_etat", "defo") == 3
+    assert read_stat("operations_km") == 420.0
+    assert read_stats("personnel_etat") == {"actif": 1, "conge": 1}
+    assert _counters() == compute_stats(db.session.connection())
+
+
+def test_write_routes_and_bulk_keep_counters_in_sync(client, bresil):
+    client.post("/write/operation/bulk", json=[{"type_op": "Vente", "km_parcourus": 5.0, "marge": 1.0}] * 3, headers=HEADERS)
+    client.post("/write/article/bulk?on_conflict=update", json=[
+        {"id": 1000, "zone": 7, "etat_emballage": "Correct"},
+        {"id": 3000, "zone": 7, "etat_emballage": "Déformé"},
+    ], headers=HEADERS)
+    client.delete("/write/personnel/B2", headers=HEADERS)
+
+    assert read_stat("operations_km") == 735.0
+    assert read_stat("operations_type", "vente") == 5
+    assert read_stats("articles_zone") == {"3": 1, "4": 1, "7": 2}
+    assert read_stat("personnel") == 1
+    assert _counters() == compute_stats(db.session.connection())
+
+
+def test_rebuild_reports_and_fixes_drift(bresil):
+    db.session.execute(Statistique.__table__.update().where(Statistique.nom == "personnel").values(valeur=40))
+    db.session.execute(Statistique.__table__.delete().where(Statistique.nom == "articles_zone"))
+
+    drift = rebuild(db.session.connection())
+
+    assert drift == {("personnel", ""): (40, 2), ("articles_zone", "3"): (0, 2), ("articles_zone", "4"): (0, 1)}
+    assert rebuild(db.session.connection()) == {}
+    assert read_stat("personnel") == 2
@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta
+import pytest
+from couche_data.db_changes import changes_since
+from couche_data.db_connect import db
+from couche_data.db_seed import seed_database
+from couche_data.db_tables import Modification
+from couche_metier.utils import data_agregation
+from couche_metier.utils.data_agregation import EXTERNAL_APIS, peer_mirror
+
+HEADERS = {"x-api-key": "test-key"}
+
+
+def _delta(client, url, since):
+    resp = client.get(url, query_string={"since": since})
+    assert resp.status_code == 200
+    assert resp.headers["X-Change-Version"] == str(resp.get_json()["version"])
+    return resp.get_json()
+
+
+# -----------------------------
+# Flux ?since= des listes /general
+# -----------------------------
+def test_since_returns_only_changes(client, bresil):
+    version = int(client.get("/general/articles").headers["X-Change-Version"])
+
+    client.put("/write/article/1001", json={"collisions": 5}, headers=HEADERS)
+    new_id = client.post("/write/article", json={"zone": 9}, headers=HEADERS).get_json()["id"]
+    client.delete("/write/article/1002", headers=HEADERS)
+
+    data = _delta(client, "/general/articles", version)
+    assert [(item["id"], item["zone"]) for item in data["items"]] == [(1001, 3), (new_id, 9)]
+    assert data["deleted"] == [1002]
+
+    assert _delta(client, "/general/articles", data["version"]) == {
+        "version": data["version"], "items": [], "deleted": [], "full": False,
+    }
+
+
+def test_since_zero_and_timestamp(client, bresil):
+    everything = _delta(client, "/general/personnel", 0)
+    assert sorted(item["id"] for item in everything["items"]) == ["B1", "B2"]
+
+    changed_at = db.session.query(db.func.min(Modification.date_modification)).scalar()
+    data = _delta(client, "/general/personnel", (changed_at - timedelta(seconds=1)).isoformat())
+    assert sorted(item["id"] for item in data["items"]) == ["B1", "B2"]
+
+
+def test_delta_after_seed_append_resends_the_table(client, app):
+    seed_database({"personnel": 3, "operations": 5, "articles": 0, "formations": 0, "surveillance": 0})
+    db.session.remove()
+    version = _delta(client, "/general/operations", 0)["version"]
+
+    seed_database({"personnel": 0, "operations": 4, "articles": 0, "formations": 0, "surveillance": 0}, reset=False)
+    db.session.remove()
+    data = _delta(client, "/general/operations", version)
+
+    assert data["full"] is True
+    assert len(data["items"]) == 9
+    assert _delta(client, "/general/operations", data["version"])["full"] is False
+
+
+def test_bulk_insert_is_journaled(client, app):
+    resp = client.post("/write/operation/bulk", json=[{"type_op": "Vente"}, {"type_op": "Achat"}], headers=HEADERS)
+    assert resp.status_code == 201
+
+    data = _delta(client, "/general/operations", "1")
+    assert len(data["items"]) == 1  # version 1 = première opération
+    assert data["items"][0]["type_op"] == "Achat"
+
+
+def test_safety_window_resends_late_commits(app):
+    """
+    PostgreSQL : la version 4 est validée après qu'un lecteur a renvoyé la version 5.
+    """
+    journal = Modification.__table__
+    now = datetime.utcnow()
+    with db.engine.begin() as conn:
+        conn.execute(journal.insert(), [
+            {"version": 5, "table_name": "articles", "cle": "1005", "operation": "upsert", "date_modification": now},
+        ])
+    with db.engine.begin() as conn:  # commit tardif
+        conn.execute(journal.insert(), [
+            {"version": 4, "table_name": "articles", "cle": "1004", "operation": "upsert",
+             "date_modification": now - timedelta(seconds=2)},
+        ])
+
+    with db.engine.connect() as conn:
+        assert changes_since(conn, "articles", 5, 5, window=timedelta(0)) == ([], [])
+        assert changes_since(conn, "articles", 5, 5, window=timedelta(seconds=60)) == (["1004", "1005"], [])
+
+
+@pytest.mark.parametrize("query", ["since=hier", "since=3&limit=10", "since=3&stream=ndjson"])
+def test_since_rejects_invalid_parameters(client, app, query):
+    assert client.get(f"/general/articles?{query}").status_code == 400
+
+
+# -----------------------------
+# Miroir d'une région paire
+# -----------------------------
+@pytest.fixture
+def portugal(client, monkeypatch):
+    """
+    Région paire "delta" servie par la même application (listes /general).
+    """
+    peer_mirror.clear()
+    requests = []
+
+    def download(cfg, timeout, params=None):
+        requests.append(params)
+        return client.get(cfg["url"].removeprefix("http://portugal"), query_string=params).get_json()
+
+    monkeypatch.setattr(data_agregation, "_download", download)
+    monkeypatch.setitem(EXTERNAL_APIS, "operations", {
+        "Portugal": {"url": "http://portugal/general/operations", "delta": True, "rename_map": {"km_parcourus": "km"}},
+    })
+    yield requests
+    peer_mirror.clear()
+
+
+def _peer_km():
+    """
+    Synchronise le miroir (dans le thread du test, comme le ferait le pool de téléchargement).
+    """
+    data_agregation._load_source(("operations", "Portugal"), EXTERNAL_APIS["operations"]["Portugal"], 5)
+    return sorted(peer_mirror.select("operations", ["Portugal"], ["km"])["km"].tolist())
+
+
+def test_mirror_applies_deltas(client, bresil, portugal):
+    assert _peer_km() == [20.0, 300.0, 400.0]
+
+    client.put("/write/operation/1", json={"km_parcourus": 310.0}, headers=HEADERS)
+    client.delete("/write/operation/3", headers=HEADERS)
+    assert _peer_km() == [310.0, 400.0]
+
+    version = peer_mirror.version(("operations", "Portugal"))
+    assert portugal == [{"since": 0}, {"since": version - 2}]
+    mirror = client.get("/general/sources/mirror").get_json()["operations/Portugal"]
+    assert (mirror["version"], mirror["rows"]) == (version, 2)
+
+
+def test_mirror_replaced_after_peer_reload(client, app, portugal):
+    seed_database({"personnel": 3, "operations": 5, "articles": 0, "formations": 0, "surveillance": 0})
+    db.session.remove()
+    assert len(_peer_km()) == 5
+
+    seed_database({"personnel": 0, "operations": 4, "articles": 0, "formations": 0, "surveillance": 0}, reset=False)
+    db.session.remove()
+
+    assert len(_peer_km()) == 9
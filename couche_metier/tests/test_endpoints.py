@@ -0,0 +1,197 @@
+import pytest
+from couche_metier.utils import data_agregation
+from couche_metier.utils.data_agregation import EXTERNAL_APIS, source_cache, source_health
+
+
+# -----------------------------
+# Région simulée "Egypte" (mêmes noms de champs que la vraie API)
+# -----------------------------
+EGYPTE = {
+    "operations": [
+        {"responsable": "E1", "kilometres": 900.0, "marge": 100.0, "type": "Vente", "id": 1},
+        {"responsable": "E1", "kilometres": 50.0, "marge": 40.0, "type": "Achat", "id": 2},
+        {"responsable": "E2", "kilometres": 10.0, "marge": 300.0, "type": "Vente", "id": 3},
+    ],
+    "personnel": [
+        {"id": "E1", "nomPrenom": "Amr Said"},
+        {"id": "E2", "nomPrenom": "Mona Adel"},
+    ],
+    "releves": [
+        {"zone": 1, "releve_id": 1, "co2": 420.5},
+        {"zone": 2, "releve_id": 2, "co2": 380.25},
+    ],
+    "articles": [
+        {"id": 1, "zone": 1, "etatEmballage": "abimé", "responsable": "E1", "collisions": 0},
+        {"id": 2, "zone": 1, "etatEmballage": "intact", "responsable": "E1", "collisions": 0},
+        {"id": 3, "zone": 2, "etatEmballage": "abimé", "responsable": "E2", "collisions": 2},
+    ],
+    "machines": [
+        {"zone": 4, "cadence": 12.0, "etat": "ok"},
+        {"zone": 5, "cadence": 7.5, "etat": "ok"},
+    ],
+}
+RENAME_MAPS = {
+    "operations": {"responsable": "responsable_id", "kilometres": "km", "marge": "marge", "type": "type_op"},
+    "personnel": {},
+    "releves": {"releve_id": "id"},
+    "articles": {"etatEmballage": "etat_emballage", "responsable": "responsable_id"},
+    "machines": {"cadence": "cadence_de_production"},
+}
+
+
+@pytest.fixture
+def egypte(monkeypatch):
+    """
+    Remplace toutes les sources externes par la région simulée.
+    """
+    source_cache.clear()
+    source_health.clear()
+    for key, rename_map in RENAME_MAPS.items():
+        monkeypatch.setitem(EXTERNAL_APIS, key, {
+            "Egypte": {"url": f"http://egypte/{key}", "rename_map": rename_map},
+        })
+    monkeypatch.setattr(data_agregation, "_download", lambda cfg, timeout: EGYPTE[cfg["url"].rsplit("/", 1)[1]])
+
+
+# -----------------------------
+# Finance & Gestion
+# -----------------------------
+def test_responsable_max_km(client, bresil, egypte):
+    data = client.get("/finance_gestion/responsable/max_km").get_json()
+
+    assert data["identifiant"] == "E1"
+    assert data["responsable"] == "Amr Said"
+    assert data["total_km_parcourus"] == 950.0
+    assert data["source_max"] == "Egypte"
+    assert data["sources_responded"] == ["local (Brésil)", "Egypte"]
+
+
+def test_max_km_per_source(client, bresil, egypte):
+    data = client.get("/finance_gestion/responsable/max_km_per_source").get_json()
+
+    assert data == [
+        {"source": "local (Brésil)", "responsable_id": "B1", "responsable_name": "Ana Souza", "max_km": 700.0},
+        {"source": "Egypte", "responsable_id": "E1", "responsable_name": "Amr Said", "max_km": 950.0},
+    ]
+
+
+def test_marges_par_responsable(client, bresil, egypte):
+    data = client.get("/finance_gestion/marges_par_responsable").get_json()
+
+    assert {(d["source"], d["responsable_id"]): d["total_marge"] for d in data} == {
+        ("local (Brésil)", "B1"): 750.0,
+        ("local (Brésil)", "B2"): 80.0,
+        ("Egypte", "E1"): 140.0,
+        ("Egypte", "E2"): 300.0,
+    }
+
+
+def test_operations_par_type(client, bresil, egypte):
+    data = client.get("/finance_gestion/operations_par_type").get_json()
+
+    assert {(d["source"], d["type_op"]): d["count"] for d in data} == {
+        ("local (Brésil)", "Vente"): 2,
+        ("local (Brésil)", "Achat"): 1,
+        ("Egypte", "Vente"): 2,
+        ("Egypte", "Achat"): 1,
+    }
+
+
+def test_unknown_operation_type_is_kept(client, bresil, egypte, monkeypatch):
+    monkeypatch.setitem(EGYPTE, "operations", [
+        *EGYPTE["operations"], {"responsable": "E3", "kilometres": 5.0, "marge": 1.0, "type": "Troc", "id": 4},
+    ])
+
+    counts = client.get("/finance_gestion/operations_par_type").get_json()
+    vente = client.get("/assistance_commerciale/responsables_vente").get_json()
+
+    assert {(d["source"], d["type_op"]): d["count"] for d in counts}[("Egypte", "Troc")] == 1
+    assert vente["nombre_responsables_vente"] == 4  # tout sauf les achats, comme avant
+
+
+def test_operations_without_id_are_counted(client, bresil, egypte, monkeypatch):
+    monkeypatch.setitem(EGYPTE, "operations", [
+        *EGYPTE["operations"], {"responsable": "E2", "kilometres": 1.0, "marge": 1.0, "type": "Vente", "id": None},
+    ])
+
+    data = client.get("/finance_gestion/operations_par_type").get_json()
+
+    assert {(d["source"], d["type_op"]): d["count"] for d in data}[("Egypte", "Vente")] == 3
+
+
+def test_drone_plus_ancien(client, bresil, egypte):
+    data = client.get("/finance_gestion/drone/plus_ancien").get_json()
+
+    assert data["zone"] == 1
+    assert data["drone_age"] == 5
+
+
+# -----------------------------
+# Assistance commerciale
+# -----------------------------
+def test_zone_co2_min(client, egypte):
+    data = client.get("/assistance_commerciale/zone/co2_min").get_json()
+
+    assert data["zone"] == 2
+    assert data["co2_level"] == 380.25
+
+
+def test_zone_co2_min_per_source(client, egypte):
+    data = client.get("/assistance_commerciale/zone/co2_min_per_source").get_json()
+
+    assert data == [{"source": "Egypte", "zone": 2, "co2_level": 380.25}]
+
+
+def test_responsables_vente(client, bresil, egypte):
+    data = client.get("/assistance_commerciale/responsables_vente").get_json()
+    per_source = client.get("/assistance_commerciale/responsables_vente_per_source").get_json()
+
+    assert data["nombre_responsables_vente"] == 3
+    assert per_source == [
+        {"source": "local (Brésil)", "nombre_responsables_vente": 1},
+        {"source": "Egypte", "nombre_responsables_vente": 2},
+    ]
+
+
+# -----------------------------
+# Recherche & Développement
+# -----------------------------
+def test_articles_deformes_sans_collision(client, bresil, egypte):
+    data = client.get("/recherche_developpement/articles/deformes_sans_collision").get_json()
+    per_source = client.get("/recherche_developpement/articles/deformes_sans_collision_per_source").get_json()
+
+    assert data["articles_deformes_sans_collision"] == 2
+    assert per_source["articles_deformes_sans_collision"] == [
+        {"source": "local (DB)", "count": 1},
+        {"source": "Egypte", "count": 1},
+    ]
+
+
+def test_local_source_listed_without_matching_rows(client, app, egypte):
+    data = client.get("/recherche_developpement/articles/deformes_sans_collision").get_json()
+
+    assert data["articles_deformes_sans_collision"] == 1
+    assert data["sources_responded"] == ["local (DB)", "Egypte"]
+
+
+@pytest.mark.parametrize("url, field, empty, local", [
+    ("/recherche_developpement/articles/deformes_sans_collision", "articles_deformes_sans_collision", 0, "local (DB)"),
+    ("/recherche_developpement/articles/deformes_sans_collision_per_source", "articles_deformes_sans_collision",
+     [], "local (DB)"),
+    ("/assistance_commerciale/responsables_vente", "nombre_responsables_vente", 0, "local (Brésil)"),
+])
+def test_local_source_listed_without_any_rows(client, app, egypte, monkeypatch, url, field, empty, local):
+    monkeypatch.setitem(EGYPTE, "articles", [])
+    monkeypatch.setitem(EGYPTE, "operations", [])
+
+    data = client.get(url).get_json()
+
+    assert data[field] == empty
+    assert data["sources_responded"] == [local]  # requête locale réussie, sans ligne
+    assert data["num_sources_responded"] == 1
+
+
+def test_machine_faible_cadence(client, egypte):
+    data = client.get("/recherche_developpement/machine/faible_cadence").get_json()
+
+    assert data["machines_faible_cadence"] == [{"source": "Egypte", "zone_machine": 5, "cadence": 7.5}]
@@ -0,0 +1,87 @@
+import json
+from sqlalchemy import event
+from couche_data.db_connect import db
+from datetime import date
+from couche_data.db_tables import Article, Formation, ServicePersonnel
+
+
+# -----------------------------
+# Listes /general : pagination et streaming
+# -----------------------------
+def test_liste_complete_sans_parametre(client, bresil):
+    data = client.get("/general/articles").get_json()
+
+    assert [a["id"] for a in data] == [1000, 1001, 1002]
+    assert data[0]["responsable_name"] == "Ana Souza"
+    assert data[0]["etat_emballage"] == "Déformé"
+
+
+def test_pagination_par_cle(client, bresil):
+    page1 = client.get("/general/articles?limit=2")
+    page2 = client.get(f"/general/articles?limit=2&after={page1.headers['X-Next-After']}")
+
+    assert [a["id"] for a in page1.get_json()] == [1000, 1001]
+    assert [a["id"] for a in page2.get_json()] == [1002]
+    assert "X-Next-After" not in page2.headers
+
+
+def test_pagination_cle_texte(client, bresil):
+    data = client.get("/general/personnel?after=B1").get_json()
+
+    assert [p["id"] for p in data] == ["B2"]
+
+
+def test_pagination_invalide(client, bresil):
+    assert client.get("/general/operations?limit=-1").status_code == 400
+    assert client.get("/general/operations?after=abc").status_code == 400
+    assert client.get("/general/operations?stream=xml").status_code == 400
+
+
+def test_streaming_ndjson(client, bresil):
+    res = client.get("/general/operations?stream=ndjson")
+
+    assert res.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in res.get_data(as_text=True).splitlines()]
+    assert [o["responsable_name"] for o in lines] == ["Ana Souza", "Ana Souza", "João Lima"]
+
+
+def test_streaming_tableau_json(client, bresil):
+    res = client.get("/general/surveillance?stream=json&after=1")
+
+    assert res.mimetype == "application/json"
+    assert [s["zone"] for s in json.loads(res.get_data(as_text=True))] == [2]
+
+
+# -----------------------------
+# Nom du responsable : jointure, sans lecture complète de Personnel
+# -----------------------------
+def test_nom_du_responsable_en_une_requete(client, bresil):
+    db.session.add(Article(id=2000, zone=9, responsable_id=None, collisions=0))
+    db.session.commit()
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.engine, "before_cursor_execute", listener)
+    try:
+        data = client.get("/general/articles").get_json()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", listener)
+
+    statements = [s for s in statements if "journal_modifications" not in s]  # en-tête X-Change-Version
+    assert len(statements) == 1 and "JOIN personnel" in statements[0]
+    assert data[-1]["responsable_name"] == "Inconnu"
+
+
+# -----------------------------
+# Lecture par colonnes : enums et dates convertis comme avant
+# -----------------------------
+def test_enums_et_dates_convertis(client, bresil):
+    db.session.add(Formation(nom_formation="Sécurité", sujet=ServicePersonnel.cyber_securite,
+                             date_formation=date(2024, 1, 15)))
+    db.session.commit()
+
+    personnel = client.get("/general/personnel").get_json()
+    formation = client.get("/general/formations").get_json()[0]
+
+    assert [(p["etat"], p["service"]) for p in personnel] == [("actif", "commercial"), ("repos", "logistique")]
+    assert formation["sujet"] == "cyber sécurité"
+    assert formation["date_formation"] == "2024-01-15"
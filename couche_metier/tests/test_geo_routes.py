@@ -0,0 +1,98 @@
+import pytest
+from couche_data.db_connect import db
+from couche_data.db_tables import Article, EtatEmballage, Personnel
+from couche_metier.tests.test_migrations import query_plans
+
+HEADERS = {"x-api-key": "test-key"}
+
+
+@pytest.fixture
+def entrepot(bresil):
+    """
+    Articles positionnés dans l'entrepôt (en plus de ceux de bresil, sans position).
+    """
+    db.session.add_all([
+        Article(id=1, zone=1, etat_emballage=EtatEmballage.correct, position="0,0,0"),
+        Article(id=2, zone=1, etat_emballage=EtatEmballage.correct, position="1,1,0"),
+        Article(id=3, zone=2, etat_emballage=EtatEmballage.defo, position="5,5,5"),
+        Article(id=4, zone=2, etat_emballage=EtatEmballage.defo, position="40,0,2"),
+    ])
+    db.session.commit()
+
+
+def test_coordinates_follow_position(bresil):
+    personnel = db.session.get(Personnel, "B1")
+    assert (personnel.lat, personnel.lon) == (-23.55, -46.63)
+
+    personnel.position = "pas une position"
+    assert (personnel.lat, personnel.lon) == (None, None)
+
+
+def test_bulk_insert_fills_coordinates(client, app):
+    client.post("/write/article/bulk", json=[
+        {"id": 1, "zone": 1, "position": "1,2,3"},
+        {"id": 2, "zone": 1, "position": "1,2"},
+    ], headers=HEADERS)
+
+    assert (db.session.get(Article, 1).pos_x, db.session.get(Article, 1).pos_z) == (1.0, 3.0)
+    assert db.session.get(Article, 2).pos_x is None
+
+
+def test_personnel_radius(client, bresil):
+    near = client.get("/general/geo/personnel/radius?lat=-23.5&lon=-46.6&r=50").get_json()
+    both = client.get("/general/geo/personnel/radius?lat=-23.5&lon=-46.6&r=500").get_json()
+
+    assert [p["id"] for p in near] == ["B1"]
+    assert near[0]["distance"] < 10
+    assert [p["id"] for p in both] == ["B1", "B2"]
+    assert 300 < both[1]["distance"] < 400
+
+
+def test_nearest(client, entrepot):
+    articles = client.get("/general/geo/articles/nearest?x=4&y=4&z=4&k=3").get_json()
+    personnel = client.get("/general/geo/personnel/nearest?lat=-22.9&lon=-43.2&k=5").get_json()
+
+    assert [a["id"] for a in articles] == [3, 2, 1]
+    assert articles[0]["distance"] == pytest.approx(3 ** 0.5)
+    assert [p["id"] for p in personnel] == ["B2", "B1"]
+
+
+def test_nearest_includes_corners_of_the_box(client, app):
+    db.session.add_all([Article(id=n, zone=1, position=position)
+                        for n, position in enumerate(["0,0,0", "0.5,0,0", "1.5,1.5,1.5"], start=1)])
+    db.session.commit()
+
+    data = client.get("/general/geo/articles/nearest?x=0&y=0&z=0&k=3").get_json()
+
+    assert [a["id"] for a in data] == [1, 2, 3]
+
+
+def test_nearest_with_fewer_rows_than_k(client, entrepot):
+    data = client.get("/general/geo/articles/nearest?x=0&y=0&z=0&k=10").get_json()
+
+    assert [a["id"] for a in data] == [1, 2, 3, 4]  # y compris l'article isolé à 40
+
+
+def test_box(client, entrepot):
+    data = client.get("/general/geo/articles/box?min_x=0&max_x=5&min_y=0&max_y=5&min_z=0&max_z=1").get_json()
+
+    assert [a["id"] for a in data] == [1, 2]
+    assert data[1]["pos_y"] == 1.0
+
+
+def test_geo_errors(client, app):
+    assert client.get("/general/geo/machines/box").status_code == 400
+    assert client.get("/general/geo/personnel/radius?lat=1&lon=2").status_code == 400
+    assert client.get("/general/geo/articles/nearest?x=1&y=2&z=3&k=0").status_code == 400
+
+
+def test_non_finite_coordinates_are_rejected(client, entrepot):
+    assert client.get("/general/geo/personnel/nearest?lat=nan&lon=2").status_code == 400
+    assert client.get("/general/geo/articles/nearest?x=inf&y=0&z=0").status_code == 400
+    assert client.get("/general/geo/articles/radius?x=0&y=0&z=0&r=inf").status_code == 400
+
+
+def test_box_uses_index(client, entrepot):
+    plans = query_plans(client, "/general/geo/articles/box?min_x=0&max_x=5&min_y=0&max_y=5&min_z=0&max_z=1")
+
+    assert any("ix_articles_pos" in plan for plan in plans), plans
@@ -0,0 +1,64 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import requests
+
+pytest.importorskip("gevent")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+NB_REQUESTS = 100
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def gevent_server():
+    """
+    Un seul worker gunicorn gevent, lancé avec la configuration de production.
+    """
+    port = _free_port()
+    env = {**os.environ, "PORT": str(port), "WEB_CONCURRENCY": "1",
+           "INNOV3D_WORKER_CLASS": "gevent", "DATABASE_URL": "sqlite://"}
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "couche_metier/gunicorn.conf.py",
+         "--bind", f"127.0.0.1:{port}", "couche_metier.tests.gevent_app:app"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(100):
+            try:
+                requests.get(f"{url}/general/sources/cache", timeout=1)
+                break
+            except requests.RequestException:
+                time.sleep(0.1)
+        yield url
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def test_one_gevent_worker_serves_concurrent_aggregations(gevent_server):
+    url = f"{gevent_server}/assistance_commerciale/zone/co2_min"
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(NB_REQUESTS) as pool:
+        responses = list(pool.map(lambda _: requests.get(url, timeout=30), range(NB_REQUESTS)))
+    elapsed = time.perf_counter() - start
+
+    assert [r.status_code for r in responses] == [200] * NB_REQUESTS
+    assert {r.json()["zone"] for r in responses} == {2}
+    # Un worker synchrone les traiterait l'une après l'autre (≥ 100 × 0,5 s)
+    assert elapsed < 10, elapsed
+
+    # Les requêtes simultanées partagent les téléchargements en cours
+    downloads = requests.get(f"{gevent_server}/tests/downloads").json()["downloads"]
+    assert downloads < NB_REQUESTS / 2, downloads
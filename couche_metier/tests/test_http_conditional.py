@@ -0,0 +1,98 @@
+import gzip
+import json
+from couche_data import db_changes
+from couche_data.db_connect import db
+from couche_data.db_seed import seed_database
+
+HEADERS = {"x-api-key": "test-key"}
+
+
+# -----------------------------
+# Validateurs tirés du journal
+# -----------------------------
+def test_unchanged_list_returns_304_without_running_the_route(client, bresil):
+    first = client.get("/general/articles")
+    assert first.headers["ETag"].startswith('W/"')
+    assert "Last-Modified" in first.headers
+
+    response = client.get("/general/articles", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert response.status_code == 304
+    assert response.data == b""
+    assert "X-Cache" not in response.headers  # ni la route ni le cache n'ont été sollicités
+
+
+def test_write_to_a_dependency_changes_the_etag(client, bresil):
+    etag = client.get("/general/articles").headers["ETag"]
+
+    client.post("/write/personnel", json={"id": "B3", "nom_prenom": "Rui Costa", "etat": "actif",
+                                          "service": "commercial"}, headers=HEADERS)
+    response = client.get("/general/articles", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_if_modified_since(client, bresil):
+    last_modified = client.get("/general/operations").headers["Last-Modified"]
+
+    response = client.get("/general/operations", headers={"If-Modified-Since": last_modified})
+
+    assert response.status_code == 304
+
+
+def test_query_args_have_their_own_etag(client, bresil):
+    etag = client.get("/general/operations?limit=1").headers["ETag"]
+
+    assert client.get("/general/operations?limit=2", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_seeded_tables_get_a_version(client, app):
+    seed_database({"personnel": 3, "operations": 5, "articles": 0, "formations": 0, "surveillance": 0})
+    db.session.remove()
+
+    assert client.get("/general/operations").headers["ETag"].startswith('W/"')
+
+
+# -----------------------------
+# Compression
+# -----------------------------
+def test_large_response_is_gzipped(client, app):
+    seed_database({"personnel": 20, "operations": 200, "articles": 0, "formations": 0, "surveillance": 0})
+    db.session.remove()
+    plain = client.get("/general/operations")
+
+    response = client.get("/general/operations", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert int(response.headers["Content-Length"]) < len(plain.data)
+    assert json.loads(gzip.decompress(response.data)) == plain.get_json()
+
+
+def test_small_response_is_not_compressed(client, bresil):
+    response = client.get("/general/stats/personnel/count", headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in response.headers
+    assert response.get_json() == {"nb_personnel": 2}
+
+
+def test_stream_is_compressed_on_the_fly(client, bresil):
+    response = client.get("/general/personnel?stream=ndjson", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    lines = gzip.decompress(response.data).decode().splitlines()
+    assert [json.loads(line)["id"] for line in lines] == ["B1", "B2"]
+
+
+def test_write_from_another_worker_is_not_served_from_cache(client, bresil, monkeypatch):
+    client.get("/general/stats/articles/per_zone")
+
+    monkeypatch.setattr(db_changes, "_commit_hooks", [])  # invalidation locale non reçue
+    client.post("/write/article", json={"zone": 2}, headers=HEADERS)
+    response = client.get("/general/stats/articles/per_zone")
+
+    assert response.headers["X-Cache"] == "MISS"
+    assert response.get_json()["zone_2"] == 1
+    etag = response.headers["ETag"]
+    assert client.get("/general/stats/articles/per_zone", headers={"If-None-Match": etag}).status_code == 304
@@ -0,0 +1,89 @@
+import pytest
+import sqlalchemy as sa
+from couche_data.db_connect import db
+from couche_data.db_migrate import current_version, downgrade, load_migrations, upgrade
+from couche_data.migrations.v0002_index_filtres import INDEXES
+from couche_metier.utils.data_agregation import EXTERNAL_APIS
+
+
+def _index_names(engine):
+    inspector = sa.inspect(engine)
+    return {ix["name"] for table in inspector.get_table_names() for ix in inspector.get_indexes(table)}
+
+
+# -----------------------------
+# Migrations
+# -----------------------------
+def test_upgrade_and_downgrade():
+    engine = sa.create_engine("sqlite://")
+    latest = load_migrations()[-1].VERSION
+
+    assert upgrade(engine) == list(range(1, latest + 1))
+    assert current_version(engine) == latest
+    assert upgrade(engine) == []  # idempotent
+    assert {name for name, _, _ in INDEXES} <= _index_names(engine)
+
+    assert downgrade(engine, 1) == list(range(latest, 1, -1))
+    assert current_version(engine) == 1
+    assert not {name for name, _, _ in INDEXES} & _index_names(engine)
+    assert "articles" in sa.inspect(engine).get_table_names()
+
+
+def test_upgrade_existing_create_all_database(app):
+    """
+    Une base créée par db.create_all() (sans schema_version) se migre sans erreur.
+    """
+    assert upgrade(db.engine)
+    assert current_version(db.engine) == load_migrations()[-1].VERSION
+
+
+def test_models_declare_migration_indexes():
+    declared = {
+        (ix.name, ix.table.name, tuple(col.name for col in ix.columns))
+        for table in db.metadata.tables.values() for ix in table.indexes
+    }
+    assert {(name, table, tuple(cols)) for name, table, cols in INDEXES} <= declared
+
+
+# -----------------------------
+# Plans d'exécution des routes
+# -----------------------------
+def query_plans(client, url):
+    """
+    Exécute la route et renvoie le plan SQLite (EXPLAIN QUERY PLAN) de chaque SELECT émis.
+    """
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    sa.event.listen(db.engine, "before_cursor_execute", capture)
+    try:
+        assert client.get(url).status_code == 200
+    finally:
+        sa.event.remove(db.engine, "before_cursor_execute", capture)
+
+    with db.engine.connect() as conn:
+        return [
+            " | ".join(row[3] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql, params))
+            for sql, params in statements
+        ]
+
+
+@pytest.mark.parametrize("url, index", [
+    ("/general/stats/articles/deformes", "sqlite_autoindex_statistiques_1"),
+    ("/general/stats/articles/per_zone", "sqlite_autoindex_statistiques_1"),
+    ("/general/stats/personnel/etat", "sqlite_autoindex_statistiques_1"),
+    ("/recherche_developpement/articles/repartition_emballage", "ix_articles_etat_emballage_collisions"),
+    ("/recherche_developpement/articles/deformes_sans_collision", "ix_articles_etat_emballage_collisions"),
+    ("/assistance_commerciale/responsables_vente", "ix_operations_commerciales_type_op"),
+])
+def test_routes_use_index(client, bresil, monkeypatch, url, index):
+    for key in ("articles", "operations"):
+        monkeypatch.setitem(EXTERNAL_APIS, key, {})
+
+    plans = query_plans(client, url)
+
+    assert plans
+    assert any(index in plan for plan in plans), plans
@@ -0,0 +1,79 @@
+import pandas as pd
+from couche_metier.utils.peer_mirror import PeerMirror
+
+
+def _operations(mirror):
+    mirror.replace(("operations", "Egypte"), pd.DataFrame({
+        "responsable_id": ["E1", "E1", "E2"], "km": [900.0, 50.0, 10.0],
+    }))
+    mirror.replace(("operations", "Canada"), pd.DataFrame({
+        "responsable_id": ["C1", "E1"], "km": [120.0, 5.0], "marge": [1.5, None],
+    }))
+
+
+# -----------------------------
+# Lecture des sources
+# -----------------------------
+def test_select_keeps_source_order_and_aggregates_in_sql():
+    mirror = PeerMirror()
+    _operations(mirror)
+
+    raw = mirror.select("operations", ["Canada", "Egypte"], ["responsable_id", "km"])
+    assert raw["source"].tolist() == ["Canada", "Canada", "Egypte", "Egypte", "Egypte"]
+
+    summed = mirror.select("operations", ["Egypte", "Canada"], ["responsable_id", "km"],
+                           group_by="responsable_id", aggregate="sum")
+    assert summed.values.tolist() == [
+        ["Egypte", "E1", 950.0], ["Egypte", "E2", 10.0], ["Canada", "C1", 120.0], ["Canada", "E1", 5.0],
+    ]
+
+
+def test_source_without_requested_column_is_skipped():
+    mirror = PeerMirror()
+    _operations(mirror)
+
+    data = mirror.select("operations", ["Egypte", "Canada"], ["responsable_id", "marge"])
+
+    assert data["source"].unique().tolist() == ["Canada"]
+    assert data["marge"].tolist()[0] == 1.5
+
+
+def test_replace_drops_previous_rows():
+    mirror = PeerMirror()
+    _operations(mirror)
+    mirror.replace(("operations", "Egypte"), pd.DataFrame({"responsable_id": ["E3"], "km": [1.0]}))
+
+    assert mirror.select("operations", ["Egypte"], ["responsable_id"])["responsable_id"].tolist() == ["E3"]
+    assert mirror.snapshot()["operations/Canada"]["rows"] == 2
+
+
+def test_cross_region_query_in_one_statement():
+    mirror = PeerMirror()
+    _operations(mirror)
+
+    best = mirror.query(
+        "SELECT responsable_id, SUM(km) AS km FROM mirror_operations"
+        " GROUP BY responsable_id ORDER BY km DESC LIMIT 1"
+    )
+
+    assert best.values.tolist() == [["E1", 955.0]]
+
+
+# -----------------------------
+# Sources "delta" et persistance
+# -----------------------------
+def test_delta_payloads_and_file_persistence(tmp_path):
+    path = str(tmp_path / "miroir.sqlite")
+    key = ("articles", "Portugal")
+    mirror = PeerMirror(path)
+    mirror.apply(key, {"version": 4, "deleted": [], "items": [
+        {"id": 1, "etatEmballage": "intact"}, {"id": 2, "etatEmballage": "abimé"},
+    ]}, rename_map={"etatEmballage": "etat_emballage"}, full=True)
+    mirror.apply(key, {"version": 6, "deleted": [1], "items": [{"id": 2, "etatEmballage": "intact"}]},
+                 rename_map={"etatEmballage": "etat_emballage"})
+
+    reopened = PeerMirror(path)
+    assert reopened.version(key) == 6
+    assert reopened.select("articles", ["Portugal"], ["id", "etat_emballage"]).values.tolist() == [
+        ["Portugal", 2, "intact"],
+    ]
@@ -0,0 +1,112 @@
+import time
+from concurrent.futures import Future
+import pytest
+from couche_metier.utils import data_agregation, response_cache
+from couche_metier.utils.data_agregation import EXTERNAL_APIS, prefetcher
+from couche_metier.utils.prefetch import PrefetchScheduler
+from couche_metier.tests.test_endpoints import egypte  # noqa: F401 (fixture)
+
+
+def _future(result=None, error=None):
+    future = Future()
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+    return future
+
+
+# -----------------------------
+# Ordonnanceur
+# -----------------------------
+def test_run_once_refreshes_every_source():
+    refreshed = []
+
+    def refresh(key, cfg):
+        refreshed.append(key)
+        return _future(error=IOError("injoignable")) if key == "b" else _future(cfg)
+
+    scheduler = PrefetchScheduler(lambda: [("a", 1), ("b", 2), ("c", 3)], refresh)
+    scheduler.run_once()
+
+    assert refreshed == ["a", "b", "c"]
+    assert scheduler.stats == {"runs": 1, "refreshed": 2, "errors": 1}
+    assert scheduler.snapshot()["last_run"] is not None
+
+
+def test_next_delay_stays_within_jitter():
+    scheduler = PrefetchScheduler(list, None, interval=10, jitter=0.2)
+
+    delays = [scheduler.next_delay() for _ in range(200)]
+
+    assert all(8 <= d <= 12 for d in delays)
+    assert len(set(delays)) > 1
+
+
+# -----------------------------
+# Endpoints servis depuis les instantanés
+# -----------------------------
+@pytest.fixture
+def prefetched(egypte, monkeypatch):
+    """
+    Préchargement actif (une passe, puis plus rien avant la fin du test) ;
+    tout téléchargement ultérieur fait échouer la source.
+    """
+    monkeypatch.setattr(prefetcher, "interval", 3600)
+    prefetcher.start()
+    deadline = time.monotonic() + 5
+    while prefetcher.stats["runs"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    downloads = []
+
+    def no_download(cfg, timeout):
+        downloads.append(cfg["url"])
+        raise IOError("appel sortant pendant la requête")
+
+    monkeypatch.setattr(data_agregation, "_download", no_download)
+    yield downloads
+    prefetcher.stop()
+    prefetcher.stats.update(runs=0, refreshed=0, errors=0)
+
+
+def test_endpoints_read_snapshots_without_outbound_calls(client, prefetched, monkeypatch):
+    # TTL nul : sans préchargement, chaque requête retéléchargerait les sources
+    for key in ("releves", "machines"):
+        monkeypatch.setitem(EXTERNAL_APIS[key]["Egypte"], "cache_ttl", 0)
+        monkeypatch.setitem(EXTERNAL_APIS[key]["Egypte"], "stale_ttl", 0)
+
+    co2 = client.get("/assistance_commerciale/zone/co2_min")
+    machines = client.get("/recherche_developpement/machine/faible_cadence")
+
+    assert prefetched == []
+    assert co2.get_json()["zone"] == 2
+    assert machines.get_json()["machines_faible_cadence"][0]["zone_machine"] == 5
+    assert 0 <= co2.get_json()["data_age_seconds"] < 5
+    assert float(co2.headers["X-Data-Age-Seconds"]) == co2.get_json()["data_age_seconds"]
+
+
+def test_cached_response_reports_age_when_served(client, prefetched, monkeypatch):
+    first = client.get("/assistance_commerciale/zone/co2_min")
+    later = time.time() + 20
+    monkeypatch.setattr(response_cache.time, "time", lambda: later)
+
+    hit = client.get("/assistance_commerciale/zone/co2_min")
+
+    assert hit.headers["X-Cache"] == "HIT"
+    assert hit.get_json()["data_age_seconds"] >= first.get_json()["data_age_seconds"] + 19
+    assert float(hit.headers["X-Data-Age-Seconds"]) == hit.get_json()["data_age_seconds"]
+
+
+def test_prefetch_status_route(client, prefetched):
+    data = client.get("/general/sources/prefetch").get_json()
+
+    assert data["running"] is True
+    assert data["stats"]["runs"] == 1
+    assert data["stats"]["refreshed"] == len(data_agregation._prefetch_sources())
+
+
+def test_local_only_response_has_no_age_header(client):
+    response = client.get("/general/stats/personnel/count")
+
+    assert "X-Data-Age-Seconds" not in response.headers
@@ -0,0 +1,80 @@
+from flask import jsonify
+from couche_metier.utils.response_cache import LocalBackend, ResponseCache
+
+HEADERS = {"x-api-key": "test-key"}
+
+
+# -----------------------------
+# Cache des routes
+# -----------------------------
+def test_second_call_is_served_from_cache(client, bresil):
+    first = client.get("/general/stats/operations/total_km")
+    second = client.get("/general/stats/operations/total_km")
+
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.get_json() == first.get_json()
+    assert client.get("/general/cache/responses").get_json()["stats"]["hits"] == 1
+
+
+def test_write_invalidates_only_dependent_routes(client, bresil):
+    client.get("/general/stats/operations/total_km")
+    client.get("/general/stats/personnel/count")
+
+    client.post("/write/operation", json={"type_op": "Vente", "km_parcourus": 1000.0}, headers=HEADERS)
+
+    km = client.get("/general/stats/operations/total_km")
+    personnel = client.get("/general/stats/personnel/count")
+    assert km.headers["X-Cache"] == "MISS"
+    assert km.get_json()["total_km_parcourus"] == 1720.0
+    assert personnel.headers["X-Cache"] == "HIT"
+
+
+def test_bulk_write_invalidates(client, bresil):
+    client.get("/general/stats/personnel/count")
+    rows = [{"id": "B9", "nom_prenom": "Rui", "etat": "actif", "service": "commercial"}]
+    client.post("/write/personnel/bulk", json=rows, headers=HEADERS)
+
+    response = client.get("/general/stats/personnel/count")
+    assert response.headers["X-Cache"] == "MISS"
+    assert response.get_json()["nb_personnel"] == 3
+
+
+def test_if_none_match_returns_304(client, bresil):
+    etag = client.get("/general/personnel").headers["ETag"]
+
+    response = client.get("/general/personnel", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.data == b""
+
+
+def test_query_args_are_part_of_the_key(client, bresil):
+    client.get("/general/personnel?limit=1")
+
+    assert client.get("/general/personnel?limit=2").headers["X-Cache"] == "MISS"
+    assert client.get("/general/personnel?limit=1").headers["X-Cache"] == "HIT"
+
+
+# -----------------------------
+# Backend partagé
+# -----------------------------
+def test_shared_backend_propagates_invalidation(app):
+    shared = LocalBackend()  # remplace Redis
+    worker_a, worker_b = ResponseCache(shared=shared), ResponseCache(shared=shared)
+    calls = []
+
+    def view():
+        calls.append(1)
+        return jsonify({"n": len(calls)})
+
+    view_a, view_b = worker_a.cached("articles")(view), worker_b.cached("articles")(view)
+    with app.test_request_context("/x"):
+        assert view_a().headers["X-Cache"] == "MISS"
+        assert view_b().headers["X-Cache"] == "HIT"  # rempli par l'autre worker
+
+        worker_a.invalidate({"articles"})
+        response = view_b()
+
+    assert response.headers["X-Cache"] == "MISS"
+    assert response.get_json() == {"n": 2}
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+from couche_data.db_tables import EtatEmballage, TypeOperation
+from couche_metier.utils.data_agregation import VOCABULARIES
+from couche_metier.utils.vocabulaire import Vocabulary
+
+
+def test_etat_emballage_aliases():
+    raw = pd.Series([EtatEmballage.defo, "abimé", "Abimé", " ABIME ", "EtatEmballage.defo",
+                     "intact", EtatEmballage.correct, None, "inconnu"], index=range(10, 19))
+
+    normalized = VOCABULARIES["etat_emballage"].normalize(raw)
+
+    assert list(normalized.index) == list(raw.index)
+    assert list(normalized.cat.categories) == ["Déformé", "Correct"]
+    assert normalized.iloc[:7].tolist() == ["Déformé"] * 5 + ["Correct"] * 2
+    assert normalized.iloc[7:].isna().all()
+
+
+def test_type_op_matches_enum_values():
+    normalized = VOCABULARIES["type_op"].normalize(pd.Series([TypeOperation.vente, "Vente", "achat", "sale"]))
+
+    assert normalized.tolist() == ["Vente", "Vente", "Achat", "Vente"]
+    assert set(VOCABULARIES["type_op"].categories) == {t.value for t in TypeOperation}
+
+
+def test_codes_map_distinct_values_once():
+    vocabulary = Vocabulary({"Oui": ["yes", "o"], "Non": ["no"]}, "reponse")
+
+    codes = vocabulary.codes(["yes", "no", "yes", np.nan, "Oui", "peut-être"])
+
+    assert codes.tolist() == [0, 1, 0, -1, 0, -1]
+
+
+def test_unknown_labels_can_be_kept():
+    raw = pd.Series([TypeOperation.achat, "sale", "troc", None, "troc"])
+
+    normalized = VOCABULARIES["type_op"].normalize(raw, keep_unknown=True)
+
+    assert normalized.iloc[[0, 1, 2, 4]].tolist() == ["Achat", "Vente", "troc", "troc"]
+    assert pd.isna(normalized.iloc[3])
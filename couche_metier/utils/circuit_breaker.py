@@ -0,0 +1,140 @@
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+
+class CircuitOpenError(Exception):
+    """
+    Source ignorée sans appel réseau : son disjoncteur est ouvert.
+    """
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur d'une source externe.
+
+    - closed : les appels passent ; `failure_threshold` échecs consécutifs ouvrent le circuit
+    - open : les appels échouent immédiatement (CircuitOpenError) ; après `reset_timeout`
+      secondes, un appel de test est lancé en arrière-plan (half_open)
+    - half_open : le test est en cours ; succès -> closed, échec -> open
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name, failure_threshold=3, reset_timeout=30, window=20):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.last_latency = None
+        self.last_success = None
+        self.last_error = None
+        self._outcomes = deque(maxlen=window)  # True = succès, False = échec
+        self._lock = threading.Lock()
+
+    def call(self, fn, executor, on_probe_success=None):
+        """
+        Exécute `fn` si le circuit le permet.
+        Si le circuit est ouvert depuis assez longtemps, un test est soumis à `executor` ;
+        son résultat est transmis à `on_probe_success` en cas de succès.
+        """
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at >= self.reset_timeout:
+                    self.state = self.HALF_OPEN
+                    executor.submit(self._probe, fn, on_probe_success)
+                raise CircuitOpenError(f"circuit ouvert pour {self.name}")
+            if self.state == self.HALF_OPEN:
+                raise CircuitOpenError(f"test en cours pour {self.name}")
+        return self._execute(fn)
+
+    def snapshot(self):
+        """
+        État de santé de la source, pour la supervision.
+        """
+        with self._lock:
+            return {
+                "state": self.state,
+                "last_latency_ms": round(self.last_latency * 1000, 1) if self.last_latency is not None else None,
+                "error_rate": round(self._outcomes.count(False) / len(self._outcomes), 3) if self._outcomes else None,
+                "consecutive_failures": self.consecutive_failures,
+                "last_success": self.last_success.isoformat() if self.last_success else None,
+                "last_error": self.last_error,
+            }
+
+    # --- Exécution et enregistrement des résultats ---
+    def _execute(self, fn):
+        start = time.monotonic()
+        try:
+            result = fn()
+        except Exception as e:
+            self._record_failure(time.monotonic() - start, e)
+            raise
+        self._record_success(time.monotonic() - start)
+        return result
+
+    def _probe(self, fn, on_probe_success):
+        try:
+            result = self._execute(fn)
+        except Exception:
+            return
+        if on_probe_success is not None:
+            on_probe_success(result)
+
+    def _record_success(self, latency):
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self.last_latency = latency
+            self.last_success = datetime.now(timezone.utc)
+            self._outcomes.append(True)
+
+    def _record_failure(self, latency, error):
+        with self._lock:
+            self.consecutive_failures += 1
+            self.last_latency = latency
+            self.last_error = f"{type(error).__name__}: {error}"
+            self._outcomes.append(False)
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class HealthRegistry:
+    """
+    Disjoncteurs de toutes les sources externes, indexés par (external_key, pays).
+    """
+
+    def __init__(self, **breaker_settings):
+        self.breaker_settings = breaker_settings
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, key):
+        """
+        Renvoie le disjoncteur de `key` (créé au premier appel).
+        """
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                breaker = CircuitBreaker("/".join(key), **self.breaker_settings)
+                self._breakers[key] = breaker
+            return breaker
+
+    def clear(self):
+        """
+        Oublie tous les disjoncteurs (retour à l'état closed).
+        """
+        with self._lock:
+            self._breakers.clear()
+
+    def snapshot(self):
+        """
+        {"external_key/pays": état de santé} pour toutes les sources connues.
+        """
+        with self._lock:
+            breakers = list(self._breakers.items())
+        return {"/".join(key): breaker.snapshot() for key, breaker in breakers}
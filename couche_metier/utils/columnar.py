@@ -0,0 +1,92 @@
+"""
+Formats colonnaires (Apache Arrow IPC, Parquet) pour l'échange de listes entre régions.
+
+Une liste de 100 000 lignes en Arrow est plus petite que le JSON équivalent et se lit
+sans analyse ligne par ligne : le DataFrame arrive déjà typé. Le format est négocié
+par l'en-tête Accept. pyarrow est installé par requirements.txt ; s'il manque,
+seul JSON est proposé (et demandé aux régions paires).
+
+Les réponses ?since= gardent leur version, leurs clés supprimées et l'indicateur de
+resynchronisation complète dans les métadonnées du schéma ("version", "deleted", "full").
+"""
+import io
+import json
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pa = None
+
+ARROW = "application/vnd.apache.arrow.stream"
+PARQUET = "application/vnd.apache.parquet"
+JSON = "application/json"
+
+FORMATS = [ARROW, PARQUET] if pa is not None else []
+
+# En-tête Accept des appels sortants : colonnaire d'abord, JSON en repli
+ACCEPT = ", ".join([*FORMATS, f"{JSON};q=0.5"])
+
+
+def negotiate(accept):
+    """
+    Format colonnaire demandé par l'en-tête Accept (MIMEAccept de Flask), ou None pour JSON.
+    Un client sans préférence (*/*, absent) reçoit JSON.
+    """
+    if not FORMATS or not accept:
+        return None
+    best = accept.best_match([JSON, *FORMATS])  # à égalité, JSON l'emporte
+    return best if best in FORMATS else None
+
+
+def encode(items, mimetype, names=(), metadata=None):
+    """
+    Encode une liste de lignes (dicts) en Arrow IPC ou Parquet.
+
+    Args:
+        items: lignes sérialisées
+        mimetype: ARROW ou PARQUET
+        names: colonnes (schéma d'une liste vide)
+        metadata: {clé: valeur JSON} ajouté aux métadonnées du schéma
+    """
+    table = pa.Table.from_pylist(items) if items else pa.table({name: pa.array([], pa.null()) for name in names})
+    if metadata:
+        table = table.replace_schema_metadata({key: json.dumps(value) for key, value in metadata.items()})
+
+    sink = io.BytesIO()
+    if mimetype == PARQUET:
+        pa.parquet.write_table(table, sink)
+    else:
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue()
+
+
+def is_columnar(content_type):
+    return (content_type or "").split(";")[0].strip() in (ARROW, PARQUET)
+
+
+def decode(content, content_type):
+    """
+    Lit une réponse colonnaire.
+
+    Returns:
+        DataFrame, ou {"version", "items": DataFrame, "deleted", "full"} pour une réponse ?since=
+    """
+    buffer = io.BytesIO(content)
+    if content_type.split(";")[0].strip() == PARQUET:
+        table = pa.parquet.read_table(buffer)
+    else:
+        table = pa.ipc.open_stream(buffer).read_all()
+
+    frame = table.to_pandas()
+    metadata = table.schema.metadata or {}
+    if b"version" in metadata:
+        return {
+            "version": json.loads(metadata[b"version"]),
+            "items": frame,
+            "deleted": json.loads(metadata.get(b"deleted", b"[]")),
+            "full": json.loads(metadata.get(b"full", b"false")),
+        }
+    return frame
@@ -0,0 +1,97 @@
+import zlib
+from flask import request
+from .columnar import ARROW
+
+try:
+    import brotli  # optionnel : sans lui, seul gzip est proposé
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = {"application/json", "application/x-ndjson", "text/csv", "text/plain", "text/html", ARROW}
+
+
+class _GzipStream:
+    def __init__(self, level):
+        self._z = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31 : en-tête gzip
+
+    def chunk(self, data):
+        return self._z.compress(data) + self._z.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._z.flush()
+
+
+class _BrotliStream:
+    def __init__(self, quality):
+        self._c = brotli.Compressor(quality=quality)
+
+    def chunk(self, data):
+        return self._c.process(data) + self._c.flush()
+
+    def finish(self):
+        return self._c.finish()
+
+
+def _compress_stream(chunks, compressor):
+    """
+    Compresse un flux morceau par morceau : chaque morceau est envoyé dès qu'il est produit.
+    """
+    for data in chunks:
+        if isinstance(data, str):
+            data = data.encode()
+        if data:
+            yield compressor.chunk(data)
+    yield compressor.finish()
+
+
+def init_compression(app, min_size=1024, gzip_level=6, brotli_quality=5):
+    """
+    Compresse les réponses texte/JSON selon l'en-tête Accept-Encoding du client
+    (brotli si le paquet est installé, sinon gzip).
+
+    - réponses complètes : compressées à partir de `min_size` octets
+    - réponses streamées (?stream=) : compressées à la volée, morceau par morceau
+
+    L'ETag d'une réponse compressée devient faible (même ressource, autre encodage) :
+    il reste valable pour If-None-Match quel que soit l'encodage demandé.
+
+    Args:
+        app: application Flask
+        min_size: taille minimale (octets) d'un corps à compresser
+        gzip_level: niveau zlib (1 à 9)
+        brotli_quality: qualité brotli (0 à 11)
+    """
+    encodings = ["br", "gzip"] if brotli is not None else ["gzip"]
+
+    @app.after_request
+    def _compress(response):
+        if response.mimetype not in COMPRESSIBLE or response.direct_passthrough:
+            return response
+        if response.status_code != 200 or "Content-Encoding" in response.headers:
+            return response
+        response.vary.add("Accept-Encoding")
+
+        encoding = request.accept_encodings.best_match(encodings)
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            compressor = _BrotliStream(brotli_quality) if encoding == "br" else _GzipStream(gzip_level)
+            response.response = _compress_stream(response.response, compressor)
+            response.headers.pop("Content-Length", None)
+        else:
+            body = response.get_data()
+            if len(body) < min_size:
+                return response
+            if encoding == "br":
+                response.set_data(brotli.compress(body, quality=brotli_quality))
+            else:
+                response.set_data(zlib.compress(body, gzip_level, wbits=31))
+
+        response.headers["Content-Encoding"] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    return _compress
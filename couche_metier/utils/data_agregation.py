@@ -1,25 +1,334 @@
-import requests
+import numpy as np
 import pandas as pd
 import os 
 import json
+import math
+from flask import g, has_app_context
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import partial
+from couche_metier.utils.source_cache import SourceCache
+from couche_metier.utils.http_client import SourcesHttpClient
+from couche_metier.utils.circuit_breaker import HealthRegistry
+from couche_metier.utils.vocabulaire import Vocabulary
+from couche_metier.utils.prefetch import PrefetchScheduler
+from couche_metier.utils.peer_mirror import PeerMirror
+from couche_metier.utils.response_cache import ResponseCache, redis_backend
+from couche_metier.utils import columnar
 
 # --- Chemin vers le dossier courant ---
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 # --- Charger la configuration des APIs externes depuis le fichier JSON ---
 config_path = os.path.join(BASE_DIR, "Innov3D_endpt.json")
-with open(config_path) as f:
+with open(config_path, encoding="utf-8") as f:
     EXTERNAL_APIS = json.load(f)
 
+# --- Paramètres techniques (bloc "_settings", qui n'est pas une source de données) ---
+SETTINGS = EXTERNAL_APIS.pop("_settings", {})
+FETCH_SETTINGS = SETTINGS.get("fetch", {})
+MAX_WORKERS = FETCH_SETTINGS.get("max_workers", 8)   # appels sortants simultanés (tout le processus)
+REQUEST_TIMEOUT = FETCH_SETTINGS.get("timeout", 10)  # timeout d'un appel HTTP (s)
+DEADLINE = FETCH_SETTINGS.get("deadline", 10)        # échéance globale d'une agrégation (s)
+CACHE_SETTINGS = SETTINGS.get("cache", {})
+HTTP_SETTINGS = SETTINGS.get("http", {})
+BREAKER_SETTINGS = SETTINGS.get("circuit_breaker", {})
+MIRROR_SETTINGS = SETTINGS.get("mirror", {})
+RESPONSE_CACHE_SETTINGS = SETTINGS.get("response_cache", {})
+PREFETCH_SETTINGS = dict(SETTINGS.get("prefetch", {}))
+PREFETCH_ENABLED = PREFETCH_SETTINGS.pop("enabled", False)
 
-def aggregate_data_multi(local_query=None, external_key=None, id_col=None, value_cols=None, local_source="local"):
+# --- Vocabulaires communs des colonnes catégorielles (alias régionaux -> libellé local) ---
+VOCABULARIES = {
+    name: Vocabulary(labels, name)
+    for name, labels in SETTINGS.get("vocabularies", {}).items()
+}
+
+# --- Pool de threads partagé pour interroger les régions en parallèle ---
+# Au plus deux tâches par source à la fois (téléchargement unique par source + test du
+# disjoncteur) : avec un thread de chacune par source, une source lente n'occupe que
+# les siens et ne retarde jamais le téléchargement des autres.
+SOURCE_COUNT = sum(len(sources) for sources in EXTERNAL_APIS.values())
+_executor = ThreadPoolExecutor(max_workers=max(MAX_WORKERS, 2 * SOURCE_COUNT), thread_name_prefix="innov3d-fetch")
+
+# --- Cache des sources externes (fraîcheur de chaque source du miroir), partagé par tous les blueprints ---
+source_cache = SourceCache(_executor, **CACHE_SETTINGS)
+
+# --- Cache des réponses GET (local, + Redis partagé si INNOV3D_CACHE_URL est défini) ---
+response_cache = ResponseCache(
+    shared=redis_backend(os.environ["INNOV3D_CACHE_URL"]) if os.getenv("INNOV3D_CACHE_URL") else None,
+    **RESPONSE_CACHE_SETTINGS,
+)
+
+# --- Sessions HTTP poolées (keep-alive) vers les autres régions ---
+sources_http = SourcesHttpClient(**{"pool_size": MAX_WORKERS, **HTTP_SETTINGS})
+
+# --- Miroir local (SQLite) des données des régions, lu par les agrégations ---
+peer_mirror = PeerMirror(os.getenv("INNOV3D_MIRROR_PATH", MIRROR_SETTINGS.get("path", ":memory:")))
+
+# --- Disjoncteurs et état de santé de chaque source ---
+source_health = HealthRegistry(**BREAKER_SETTINGS)
+
+
+def _prefetch_sources():
+    """
+    Sources interrogeables (avec une URL) : liste de ((external_key, pays), cfg).
+    """
+    return [
+        ((external_key, country), cfg)
+        for external_key, sources in EXTERNAL_APIS.items()
+        for country, cfg in sources.items()
+        if "url" in cfg
+    ]
+
+
+def _prefetch_source(key, cfg):
+    """
+    Rafraîchit une source dans le cache partagé (toujours via son disjoncteur).
+    """
+    return source_cache.refresh(key, partial(_guarded_load, key, cfg, REQUEST_TIMEOUT))
+
+
+# --- Préchargement périodique des sources (instantanés tenus à jour en arrière-plan) ---
+prefetcher = PrefetchScheduler(_prefetch_sources, _prefetch_source, **PREFETCH_SETTINGS)
+
+
+def init_external_sources(app):
+    """
+    Prépare l'accès aux sources externes pour l'application (appelé après create_app()).
+    Démarre le préchargement si "_settings.prefetch.enabled" ou INNOV3D_PREFETCH=1.
+    """
+    urls = [cfg["url"] for _, cfg in _prefetch_sources()]
+    sources_http.init_app(app, urls)
+    app.after_request(_data_age_header)
+
+    if os.getenv("INNOV3D_PREFETCH", "1" if PREFETCH_ENABLED else "0") == "1":
+        prefetcher.start()
+
+
+def data_age_seconds():
+    """
+    Âge (en secondes) de la plus ancienne donnée externe utilisée par la requête en cours,
+    None si aucune source externe n'a répondu.
+    """
+    ages = g.get("_external_ages") if has_app_context() else None
+    return round(max(ages.values()), 1) if ages else None
+
+
+def _data_age_header(response):
+    """
+    Ajoute l'en-tête X-Data-Age-Seconds aux réponses construites à partir de sources externes
+    (sauf s'il est déjà posé, ex : réponse servie par le cache et vieillie par lui).
+    """
+    age = data_age_seconds()
+    if age is not None:
+        response.headers.setdefault("X-Data-Age-Seconds", str(age))
+    return response
+
+
+def _download(cfg, timeout, params=None):
+    """
+    Télécharge les données d'une source externe : Arrow / Parquet en priorité
+    (DataFrame déjà typé, voir columnar.decode), JSON si la source ne le propose pas.
+    """
+    headers = {"Accept": columnar.ACCEPT} if columnar.FORMATS else None
+    response = sources_http.get(cfg["url"], timeout=timeout, params=params, headers=headers)
+    response.raise_for_status()
+    content_type = response.headers.get("Content-Type")
+    if columnar.is_columnar(content_type):
+        return columnar.decode(response.content, content_type)
+    return response.json()
+
+
+def _sync_mirror(key, cfg, timeout):
+    """
+    Met à jour le miroir d'une source "delta" (liste /general d'une région paire) :
+    toutes les lignes la première fois, puis seulement les changements depuis la
+    dernière version reçue. Une version distante inférieure (base paire réinitialisée)
+    déclenche une resynchronisation complète ; une réponse "full" (table rechargée en
+    masse chez la paire) remplace tout le miroir.
+
+    Returns:
+        nombre de lignes reçues
+    """
+    since = peer_mirror.version(key)
+    payload = _download(cfg, timeout, {"since": since or 0})
+    if since and payload["version"] < since:
+        print(f"Version distante en recul pour {key} ({payload['version']} < {since}) : resynchronisation")
+        since, payload = 0, _download(cfg, timeout, {"since": 0})
+    peer_mirror.apply(key, payload, cfg.get("id_field", "id"), cfg.get("rename_map"), full=not since or payload.get("full", False))
+    return len(payload["items"])
+
+
+def _load_source(key, cfg, timeout):
+    """
+    Télécharge une source externe et l'enregistre dans le miroir local, aux noms
+    de colonnes locaux (rename_map appliqué).
+
+    Returns:
+        nombre de lignes reçues
+    """
+    if cfg.get("delta"):
+        return _sync_mirror(key, cfg, timeout)
+    data = _download(cfg, timeout)
+    frame = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+    if cfg.get("rename_map"):
+        frame = frame.rename(columns=cfg["rename_map"])
+    peer_mirror.replace(key, frame)
+    return len(frame)
+
+
+def _guarded_load(key, cfg, timeout):
+    """
+    Chargement protégé par le disjoncteur de la source : lève CircuitOpenError
+    immédiatement si la source est en panne. Un test réussi alimente le cache.
+    """
+    return source_health.breaker(key).call(
+        partial(_load_source, key, cfg, timeout),
+        _executor,
+        on_probe_success=partial(source_cache.put, key),
+    )
+
+
+def sources_health_report():
+    """
+    État de santé de toutes les sources configurées (y compris jamais interrogées).
+    """
+    for external_key, sources in EXTERNAL_APIS.items():
+        for country in sources:
+            source_health.breaker((external_key, country))
+    return source_health.snapshot()
+
+
+def fetch_external_sources(*external_keys, timeout=None, deadline=None):
+    """
+    Interroge en parallèle toutes les sources des clés demandées de EXTERNAL_APIS,
+    en passant par le cache partagé (TTL propre à chaque source : "cache_ttl", "stale_ttl")
+    et par le disjoncteur de chaque source (une source en panne est ignorée sans attente).
+    Tant que le préchargement tourne, l'instantané en cache est servi quel que soit son âge :
+    seule une source jamais chargée provoque un appel sortant.
+
+    Les sources qui n'ont pas répondu avant l'échéance (deadline) sont abandonnées :
+    elles n'apparaissent pas dans le résultat et ne bloquent pas la réponse. Un
+    téléchargement encore en file (pas démarré) est annulé : il n'occupera pas un
+    thread du pool pour une réponse déjà partie.
+
+    Les données elles-mêmes sont dans le miroir local (peer_mirror) ; le cache ne
+    décide que du moment où une source est à nouveau téléchargée.
+
+    Returns:
+        dict {external_key: {pays: nombre de lignes reçues}} dans l'ordre de la configuration
+    """
+    timeout = REQUEST_TIMEOUT if timeout is None else timeout
+    deadline = DEADLINE if deadline is None else deadline
+    prefetched = prefetcher.running
+
+    futures = {
+        (external_key, country): source_cache.get(
+            (external_key, country),
+            partial(_guarded_load, (external_key, country), cfg, timeout),
+            ttl=math.inf if prefetched else cfg.get("cache_ttl"),
+            stale_ttl=cfg.get("stale_ttl"),
+        )
+        for external_key in external_keys
+        for country, cfg in EXTERNAL_APIS.get(external_key, {}).items()
+    }
+    results = {external_key: {} for external_key in external_keys}
+    if not futures:
+        return results
+
+    done, _ = wait(futures.values(), timeout=deadline)
+
+    for (external_key, country), future in futures.items():
+        if future not in done:
+            # démarré : il continue et alimentera le cache ; en file : annulé
+            future.cancel()
+            print(f"Délai dépassé pour {external_key} ({country}) : source ignorée")
+            continue
+        try:
+            results[external_key][country] = future.result()
+        except Exception as e:
+            print(f"Erreur lors de la récupération de {external_key} pour {country}: {e}")
+    return results
+
+
+def load_external_sources(*external_keys):
+    """
+    Contexte de données de la requête : chaque source (external_key, pays) n'est chargée
+    qu'une fois par requête, et les clés manquantes sont chargées ensemble, en parallèle.
+    Appeler cette fonction en tête d'endpoint avec toutes les clés utilisées
+    (ex : "operations", "personnel") évite des allers-retours successifs.
+    L'âge de chaque source chargée est noté pour data_age_seconds().
+
+    Returns:
+        dict {external_key: {pays: nombre de lignes reçues}} ; les sources présentes
+        sont à jour dans peer_mirror
+    """
+    loaded = g.setdefault("_external_sources", {}) if has_app_context() else {}
+    ages = g.setdefault("_external_ages", {}) if has_app_context() else {}
+
+    missing = [key for key in dict.fromkeys(external_keys) if key not in loaded]
+    if missing:
+        loaded.update(fetch_external_sources(*missing))
+        for key in missing:
+            for country in loaded[key]:
+                age = source_cache.age((key, country))
+                if age is not None:
+                    ages[(key, country)] = age
+
+    return {key: loaded[key] for key in external_keys}
+
+
+def assemble_frame(parts, columns):
+    """
+    Construit en une seule allocation le DataFrame de toutes les sources.
+
+    Args:
+        parts: liste de (source, {colonne: tableau}) dans l'ordre des sources
+        columns: colonnes à conserver (hors "source")
+
+    Returns:
+        DataFrame typé : colonnes numériques en int/float, "source" catégorielle
+    """
+    if not parts:
+        return pd.DataFrame(columns=columns + ["source"])
+
+    data = {
+        col: np.concatenate([arrays[col] for _, arrays in parts])
+        for col in columns
+    }
+    lengths = [len(arrays[columns[0]]) for _, arrays in parts]
+    data["source"] = pd.Categorical.from_codes(
+        np.repeat(np.arange(len(parts)), lengths),
+        categories=[source for source, _ in parts],
+    )
+    frame = pd.DataFrame(data, copy=False)
+
+    # colonnes "object" ne contenant que des nombres (ex : JSON mixte) -> int/float
+    for col in columns:
+        if frame[col].dtype == object:
+            frame[col] = frame[col].infer_objects()
+    return frame
+
+
+def aggregate_data_multi(local_query=None, external_key=None, id_col=None, value_cols=None, local_source="local",
+                         aggregate=None):
     """
     Agrège les données locales et externes avec plusieurs colonnes numériques.
+
+    Args:
+        aggregate: None (lignes brutes) ou "sum" / "count" / "size" (COUNT(*)) pour travailler sur
+            des agrégats partiels : local_query doit alors déjà être groupée par id_col en SQL
+            (ex : GROUP BY responsable_id avec SUM(km)), et chaque source externe
+            est réduite de la même façon dans le miroir (GROUP BY source, id_col). df_all contient
+            une ligne par (source, id_col) ; re-sommer les colonnes donne le total global.
     Returns:
-        df_all: DataFrame contenant toutes les sources
-        sources_responded: liste des sources ayant répondu
+        df_all: DataFrame contenant toutes les sources ("source" est catégorielle :
+                grouper avec observed=True)
+        sources_responded: liste des sources ayant répondu (la base locale dès que sa requête
+                aboutit, même si elle ne renvoie aucune ligne)
     """
-    df_all = pd.DataFrame(columns=[id_col] + value_cols + ["source"])
+    columns = [id_col] + value_cols
+    parts = []
     sources_responded = []
 
     # --- Base locale ---
@@ -27,36 +336,27 @@ def aggregate_data_multi(local_query=None, external_key=None, id_col=None, value
         try:
             local_data = local_query.all()
             if local_data:
-                df_local = pd.DataFrame(local_data, columns=[id_col]+value_cols)
-                df_local["source"] = local_source
-                df_all = pd.concat([df_all, df_local], ignore_index=True)
-                sources_responded.append(local_source)
+                df_local = pd.DataFrame(local_data, columns=columns)
+                parts.append((local_source, {col: df_local[col].to_numpy() for col in columns}))
+            sources_responded.append(local_source)  # a répondu, même sans ligne (requête filtrée en SQL)
         except:
             pass
 
-    # --- APIs externes ---
-    for country, cfg in EXTERNAL_APIS.get(external_key, {}).items():
-        try:
-            # Récupération des données externes
-            ext_data = pd.DataFrame(requests.get(cfg["url"], timeout=10).json())
-            if ext_data.empty:
-                continue
-
-            # Appliquer le rename_map si présent
-            if "rename_map" in cfg and cfg["rename_map"]:
-                ext_data = ext_data.rename(columns=cfg["rename_map"])
-
-            # Ajouter la colonne source
-            ext_data["source"] = country
+    # --- APIs externes : synchronisées dans le miroir (en parallèle, une fois par requête),
+    #     puis lues en une seule requête SQL (agrégat partiel par source si `aggregate`) ---
+    countries = list(load_external_sources(external_key)[external_key])
+    try:
+        df_ext = peer_mirror.select(external_key, countries, columns,
+                                    group_by=id_col if aggregate else None, aggregate=aggregate)
+    except Exception as e:
+        print(f"Erreur lors de la lecture du miroir {external_key}: {e}")
+        df_ext = pd.DataFrame(columns=["source"] + columns)
 
-            # Concaténer uniquement les colonnes demandées
-            df_all = pd.concat([df_all, ext_data[[id_col]+value_cols+["source"]]], ignore_index=True)
-            sources_responded.append(country)
-        except Exception as e:
-            print(f"Erreur lors de la récupération de {external_key} pour {country}: {e}")
-            continue
+    for country, selected in df_ext.groupby("source", sort=False):
+        parts.append((country, {col: selected[col].to_numpy() for col in columns}))
+        sources_responded.append(country)
 
-    return df_all, sources_responded
+    return assemble_frame(parts, columns), sources_responded
 
 
 def build_id_map(local_query=None, external_key=None, id_field=None, value_field=None):
@@ -87,22 +387,13 @@ def build_id_map(local_query=None, external_key=None, id_field=None, value_field
     # ---------------------------
     # APIs externes
     # ---------------------------
-    for cfg in EXTERNAL_APIS.get(external_key, {}).values():
-        try:
-            ext_data = requests.get(cfg["url"], timeout=5).json()
-            rename_map = cfg.get("rename_map", {})
-            ext_id_field = rename_map.get(id_field, id_field)
-            ext_value_field = rename_map.get(value_field, value_field)
-
-            df_ext = pd.DataFrame(ext_data)
-            if ext_id_field in df_ext.columns and ext_value_field in df_ext.columns:
-                df_ext = df_ext.dropna(subset=[ext_id_field, ext_value_field])
-                id_map.update(
-                    df_ext.set_index(ext_id_field)[ext_value_field].astype(str).to_dict()
-                )
-
-        except Exception as e:
-            print(f"Erreur lors de la récupération de {external_key} depuis {cfg.get('url')}: {e}")
-            continue
+    # (miroir local, rename_map déjà appliqué ; une source plus loin dans la configuration l'emporte)
+    countries = list(load_external_sources(external_key)[external_key])
+    try:
+        df_ext = peer_mirror.select(external_key, countries, [id_field, value_field])
+        df_ext = df_ext.dropna(subset=[id_field, value_field])
+        id_map.update(zip(df_ext[id_field], df_ext[value_field].astype(str)))
+    except Exception as e:
+        print(f"Erreur lors de la lecture du miroir {external_key}: {e}")
 
     return id_map
@@ -0,0 +1,85 @@
+import threading
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class SourcesHttpClient:
+    """
+    Sessions HTTP persistantes vers les APIs des autres régions :
+    une Session par hôte, avec pool de connexions keep-alive,
+    relances avec backoff et réponses compressées (gzip).
+
+    Comme `db = SQLAlchemy()`, l'instance est créée au chargement du module
+    et attachée à l'application par init_app() dans create_app().
+    """
+
+    def __init__(self, pool_size=8, retries=2, backoff_factor=0.3, status_forcelist=(502, 503, 504)):
+        self.pool_size = pool_size
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.status_forcelist = tuple(status_forcelist)
+        self._sessions = {}  # "schéma://hôte" -> Session
+        self._lock = threading.Lock()
+
+    def init_app(self, app, urls=()):
+        """
+        Enregistre le client sur l'application et ouvre les sessions des hôtes connus.
+        Les paramètres peuvent être surchargés par la config Flask (INNOV3D_HTTP_*).
+        """
+        self.pool_size = app.config.get("INNOV3D_HTTP_POOL_SIZE", self.pool_size)
+        self.retries = app.config.get("INNOV3D_HTTP_RETRIES", self.retries)
+        self.backoff_factor = app.config.get("INNOV3D_HTTP_BACKOFF", self.backoff_factor)
+        app.extensions["innov3d_http"] = self
+
+        for url in urls:
+            self.session_for(url)
+
+    def session_for(self, url):
+        """
+        Renvoie la Session partagée de l'hôte de `url` (créée au premier appel).
+        """
+        parts = urlsplit(url)
+        host = f"{parts.scheme}://{parts.netloc}"
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = self._new_session()
+                self._sessions[host] = session
+            return session
+
+    def get(self, url, timeout, **kwargs):
+        """
+        GET via la session poolée de l'hôte.
+        """
+        return self.session_for(url).get(url, timeout=timeout, **kwargs)
+
+    def close(self):
+        """
+        Ferme toutes les connexions ouvertes.
+        """
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+    def _new_session(self):
+        retry = Retry(
+            total=self.retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=self.status_forcelist,
+            allowed_methods=frozenset(["GET"]),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=retry)
+
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update({
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+        })
+        return session
@@ -0,0 +1,252 @@
+import json
+import sqlite3
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+# Agrégations traduites en SQL (mêmes noms que pandas)
+SQL_AGGREGATES = {"sum": "SUM", "count": "COUNT", "min": "MIN", "max": "MAX", "mean": "AVG"}
+ROW_COUNT = "size"  # nombre de lignes du groupe (COUNT(*)), valeurs nulles comprises
+
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _bindable(value):
+    """
+    Valeur acceptée par sqlite3 : structures JSON imbriquées sérialisées, NaN -> NULL.
+    """
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+class PeerMirror:
+    """
+    Miroir local (SQLite embarqué) des données des régions paires.
+
+    Chaque external_key a sa table "mirror_<external_key>" : une colonne "source" (pays),
+    une colonne "_id" (clé distante des sources "delta") et les colonnes de la source aux
+    noms locaux (rename_map appliqué), ajoutées au fil des sources rencontrées.
+    La table mirror_sources garde, par (external_key, pays), les colonnes fournies par la
+    source, la dernière version reçue (sources "delta") et l'instant de synchronisation.
+
+    Les agrégations multi-régions (aggregate_data_multi) sont une seule requête SQL
+    sur les index (source, colonne de regroupement) au lieu d'un assemblage pandas
+    des DataFrames téléchargés.
+
+    Sources "delta" : la première synchronisation demande ?since=0 (toutes les lignes),
+    les suivantes ?since=<dernière version reçue> et n'appliquent que les changements.
+
+    Args:
+        path: fichier SQLite, ou ":memory:" (miroir propre au processus)
+    """
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._tables = {}  # external_key -> colonnes de données existantes
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA busy_timeout=5000")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS mirror_sources ("
+                " external_key TEXT NOT NULL, source TEXT NOT NULL, version INTEGER,"
+                " columns TEXT NOT NULL, synced_at REAL NOT NULL,"
+                " PRIMARY KEY (external_key, source))"
+            )
+
+    # --- Écriture ---
+    def replace(self, key, frame, version=None):
+        """
+        Remplace toutes les lignes de la source `key` = (external_key, pays) par `frame`.
+        """
+        self._write(key, frame, version, full=True)
+
+    def apply(self, key, payload, id_field="id", rename_map=None, full=False):
+        """
+        Applique une réponse ?since= ({"version", "items", "deleted"}) d'une source "delta" ;
+        full=True remplace tout le contenu (réponse à ?since=0).
+        """
+        frame = pd.DataFrame(payload["items"])
+        frame.insert(0, "_id", frame[id_field] if id_field in frame else None)
+        if rename_map:
+            frame = frame.rename(columns=rename_map)
+        self._write(key, frame, payload["version"], full=full, deleted=payload["deleted"])
+
+    def _write(self, key, frame, version, full, deleted=()):
+        external_key, source = key
+        table = self._table(external_key)
+        columns = list(frame.columns)
+        values = frame.astype(object).where(frame.notna(), None).to_numpy().tolist()
+        rows = [[source, *map(_bindable, row)] for row in values]
+
+        with self._lock:
+            self._columns(external_key, columns)
+            previous = self._source_columns(external_key, source)
+            self._conn.execute("BEGIN")
+            try:
+                if full:
+                    self._conn.execute(f"DELETE FROM {table} WHERE source = ?", (source,))
+                else:
+                    stale = [*deleted, *(frame["_id"].tolist() if "_id" in frame else [])]
+                    for start in range(0, len(stale), 500):
+                        chunk = stale[start:start + 500]
+                        self._conn.execute(
+                            f"DELETE FROM {table} WHERE source = ? AND _id IN ({','.join('?' * len(chunk))})",
+                            (source, *chunk),
+                        )
+                if rows:
+                    names = ", ".join(["source", *map(_quote, columns)])
+                    self._conn.executemany(
+                        f"INSERT INTO {table} ({names}) VALUES ({','.join('?' * (len(columns) + 1))})", rows
+                    )
+                provided = columns if full or previous is None else list(dict.fromkeys(previous + columns))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO mirror_sources VALUES (?, ?, ?, ?, ?)",
+                    (external_key, source, version, json.dumps([c for c in provided if c != "_id"]), time.time()),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    # --- Lecture ---
+    def version(self, key):
+        """
+        Dernière version reçue pour `key`, None si jamais synchronisée.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version FROM mirror_sources WHERE external_key = ? AND source = ?", key
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def select(self, external_key, sources, columns, group_by=None, aggregate=None):
+        """
+        Lignes des `sources` pour les `columns` demandées, en une requête SQL ;
+        avec aggregate ("sum", "count", ...) : une ligne par (source, group_by).
+        aggregate="size" compte les lignes de chaque groupe dans les autres colonnes,
+        qui n'ont alors pas à exister dans la source.
+        Une source qui ne fournit pas toutes les colonnes est ignorée (message).
+
+        Returns:
+            DataFrame ["source"] + columns, lignes groupées par source dans l'ordre de `sources`
+        """
+        result_columns = ["source"] + list(columns)
+        with self._lock:
+            eligible = []
+            for source in sources:
+                provided = self._source_columns(external_key, source)
+                if not provided:
+                    continue  # source vide
+                required = [group_by] if aggregate == ROW_COUNT else columns
+                missing = [col for col in required if col not in provided]
+                if missing:
+                    print(f"Colonnes {missing} absentes de {external_key} pour {source} : source ignorée")
+                else:
+                    eligible.append(source)
+            if not eligible:
+                return pd.DataFrame(columns=result_columns)
+
+            table = _quote(f"mirror_{external_key}")
+            placeholders = ",".join("?" * len(eligible))
+            if aggregate:
+                self._index(external_key, group_by)
+                selected = ", ".join(
+                    _quote(col) if col == group_by
+                    else f"COUNT(*) AS {_quote(col)}" if aggregate == ROW_COUNT
+                    else f"{SQL_AGGREGATES[aggregate]}({_quote(col)}) AS {_quote(col)}"
+                    for col in columns
+                )
+                sql = (f"SELECT source, {selected} FROM {table} WHERE source IN ({placeholders})"
+                       f" GROUP BY source, {_quote(group_by)}")
+            else:
+                sql = (f"SELECT source, {', '.join(map(_quote, columns))} FROM {table}"
+                       f" WHERE source IN ({placeholders}) ORDER BY rowid")
+            rows = self._conn.execute(sql, eligible).fetchall()
+
+        frame = pd.DataFrame.from_records(rows, columns=result_columns)
+        order = {source: rank for rank, source in enumerate(eligible)}
+        ranks = frame["source"].map(order).to_numpy()
+        return frame.iloc[np.argsort(ranks, kind="stable")].reset_index(drop=True)
+
+    def query(self, sql, params=()):
+        """
+        Requête SQL libre sur le miroir (analyses multi-régions), résultat en DataFrame.
+        """
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            columns = [d[0] for d in cursor.description]
+            return pd.DataFrame.from_records(cursor.fetchall(), columns=columns)
+
+    def clear(self):
+        with self._lock:
+            for external_key in list(self._tables):
+                self._conn.execute(f"DROP TABLE IF EXISTS {_quote(f'mirror_{external_key}')}")
+            self._conn.execute("DELETE FROM mirror_sources")
+            self._tables.clear()
+
+    def snapshot(self):
+        """
+        Version, nombre de lignes et date de synchronisation de chaque source, pour la supervision.
+        """
+        with self._lock:
+            sources = self._conn.execute(
+                "SELECT external_key, source, version, synced_at FROM mirror_sources ORDER BY external_key, source"
+            ).fetchall()
+            report = {}
+            for external_key, source, version, synced_at in sources:
+                count = self._conn.execute(
+                    f"SELECT COUNT(*) FROM {_quote(f'mirror_{external_key}')} WHERE source = ?", (source,)
+                ).fetchone()[0]
+                report[f"{external_key}/{source}"] = {
+                    "version": version,
+                    "rows": count,
+                    "age_seconds": round(time.time() - synced_at, 1),
+                }
+            return report
+
+    # --- Schéma (appelé sous verrou, sauf _table) ---
+    def _table(self, external_key):
+        with self._lock:
+            if external_key not in self._tables:
+                self._conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {_quote(f'mirror_{external_key}')} (source TEXT NOT NULL, _id)"
+                )
+                self._conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS {_quote(f'ix_mirror_{external_key}_source_id')}"
+                    f" ON {_quote(f'mirror_{external_key}')} (source, _id)"
+                )
+                existing = self._conn.execute(f"PRAGMA table_info({_quote(f'mirror_{external_key}')})").fetchall()
+                self._tables[external_key] = {row[1] for row in existing}
+        return _quote(f"mirror_{external_key}")
+
+    def _columns(self, external_key, columns):
+        """
+        Ajoute à la table les colonnes encore inconnues (sans type : valeurs JSON telles quelles).
+        """
+        known = self._tables[external_key]
+        for col in columns:
+            if col not in known:
+                self._conn.execute(f"ALTER TABLE {_quote(f'mirror_{external_key}')} ADD COLUMN {_quote(col)}")
+                known.add(col)
+
+    def _index(self, external_key, column):
+        if column in self._tables.get(external_key, ()):
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {_quote(f'ix_mirror_{external_key}_source_{column}')}"
+                f" ON {_quote(f'mirror_{external_key}')} (source, {_quote(column)})"
+            )
+
+    def _source_columns(self, external_key, source):
+        row = self._conn.execute(
+            "SELECT columns FROM mirror_sources WHERE external_key = ? AND source = ?", (external_key, source)
+        ).fetchone()
+        return None if row is None else json.loads(row[0])
@@ -0,0 +1,114 @@
+import random
+import threading
+import time
+from concurrent.futures import wait
+from datetime import datetime, timezone
+
+
+class PrefetchScheduler:
+    """
+    Préchargement périodique des sources externes : un thread de fond rafraîchit toutes
+    les sources à intervalle régulier (± jitter, pour ne pas solliciter toutes les
+    régions au même instant depuis chaque worker). Tant qu'il tourne, les endpoints
+    lisent le dernier instantané du cache sans appel sortant.
+
+    Args:
+        sources: fonction sans argument renvoyant la liste des (clé, cfg) à rafraîchir
+        refresh: fonction (clé, cfg) -> Future du téléchargement
+        interval: période moyenne entre deux passes (s)
+        jitter: variation relative de la période (0.2 -> ±20 %)
+        timeout: attente maximale d'une passe (s)
+    """
+
+    def __init__(self, sources, refresh, interval=30, jitter=0.2, timeout=30):
+        self.sources = sources
+        self.refresh = refresh
+        self.interval = interval
+        self.jitter = jitter
+        self.timeout = timeout
+        self.stats = {"runs": 0, "refreshed": 0, "errors": 0}
+        self.last_run = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """
+        Démarre le thread de préchargement (sans effet s'il tourne déjà).
+        """
+        with self._lock:
+            if self.running:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="innov3d-prefetch", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """
+        Arrête le thread après la passe en cours.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def next_delay(self):
+        """
+        Attente avant la prochaine passe : interval ± jitter.
+        """
+        return self.interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def run_once(self):
+        """
+        Rafraîchit toutes les sources en parallèle et attend la fin de la passe.
+        Une source en erreur conserve son instantané précédent (dont l'âge augmente).
+        """
+        futures = {}
+        for key, cfg in self.sources():
+            try:
+                futures[key] = self.refresh(key, cfg)
+            except Exception as e:
+                print(f"Préchargement impossible pour {key}: {e}")
+                self.stats["errors"] += 1
+
+        done, _ = wait(futures.values(), timeout=self.timeout)
+        for key, future in futures.items():
+            if future not in done:
+                print(f"Préchargement de {key} : délai dépassé")
+                self.stats["errors"] += 1
+            elif future.exception() is not None:
+                print(f"Préchargement de {key} : {future.exception()}")
+                self.stats["errors"] += 1
+            else:
+                self.stats["refreshed"] += 1
+
+        self.stats["runs"] += 1
+        self.last_run = time.time()
+
+    def snapshot(self):
+        """
+        État du préchargement, pour la supervision.
+        """
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "jitter": self.jitter,
+            "stats": dict(self.stats),
+            "last_run": (
+                datetime.fromtimestamp(self.last_run, timezone.utc).isoformat()
+                if self.last_run else None
+            ),
+        }
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Erreur du préchargement : {e}")
+            if self._stop.wait(self.next_delay()):
+                break
@@ -0,0 +1,237 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import Response, g, make_response, request
+from . import columnar
+
+
+class LocalBackend:
+    """
+    Stockage clé -> octets en mémoire (LRU, expiration), avec le sous-ensemble de l'API
+    Redis utilisé par ResponseCache (get, set(ex=), mget, incr, delete, flushdb).
+    Sert de niveau local devant Redis, et remplace Redis quand il n'est pas configuré.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # clé -> (valeur, expiration ou None)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def mget(self, keys):
+        return [self.get(key) for key in keys]
+
+    def set(self, key, value, ex=None):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ex if ex else None)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return True
+
+    def incr(self, key):
+        with self._lock:
+            value, expires_at = self._entries.get(key, (b"0", None))
+            value = int(value) + 1
+            self._entries[key] = (str(value).encode(), expires_at)
+            return value
+
+    def delete(self, *keys):
+        with self._lock:
+            return sum(self._entries.pop(key, None) is not None for key in keys)
+
+    def flushdb(self):
+        with self._lock:
+            self._entries.clear()
+        return True
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def redis_backend(url):
+    """
+    Client Redis (paquet redis, optionnel) ; None si absent.
+    """
+    try:
+        import redis
+    except ImportError:
+        print("Paquet redis absent : cache des réponses local au processus")
+        return None
+    return redis.Redis.from_url(url, socket_timeout=0.5)
+
+
+class ResponseCache:
+    """
+    Cache des réponses GET à deux niveaux : LRU en mémoire du processus, puis backend
+    partagé optionnel (Redis) entre workers et instances.
+
+    Chaque endpoint déclare les tables dont il dépend (tags). La clé d'une réponse
+    contient la version courante de chacun de ses tags : invalider un tag (écriture
+    dans la table) incrémente sa version et rend inaccessibles d'un coup toutes les
+    réponses qui en dépendent, sans les énumérer. Les versions des tags sont tenues
+    dans le backend partagé s'il existe (invalidation visible de tous les workers).
+
+    Les réponses servies portent un ETag (empreinte du corps) ; une requête
+    If-None-Match correspondante reçoit 304 sans corps.
+
+    Args:
+        max_entries: taille du LRU local
+        ttl: durée de vie par défaut d'une réponse (s)
+        shared: backend partagé compatible Redis (ou None)
+    """
+
+    HEADER_FIELDS = ("X-Data-Age-Seconds", "X-Change-Version", "X-Next-After", "Vary")
+
+    def __init__(self, max_entries=256, ttl=30, shared=None):
+        self.ttl = ttl
+        self.local = LocalBackend(max_entries)
+        self.shared = shared
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "invalidations": 0, "errors": 0}
+
+    @property
+    def tags_backend(self):
+        return self.shared if self.shared is not None else self.local
+
+    # --- Tags ---
+    def tag_versions(self, tags):
+        values = self.tags_backend.mget([f"tag:{tag}" for tag in tags])
+        return [int(value or 0) for value in values]
+
+    def invalidate(self, tags):
+        """
+        Invalide toutes les réponses qui dépendent d'un des `tags`.
+        """
+        for tag in tags:
+            self.tags_backend.incr(f"tag:{tag}")
+        self.stats["invalidations"] += len(tags)
+
+    # --- Lecture / écriture ---
+    def key(self, tags):
+        args = sorted(request.args.items(multi=True))
+        fmt = columnar.negotiate(request.accept_mimetypes)  # JSON ou colonnaire : réponses distinctes
+        variant = g.get("cache_variant")  # version des données posée par la route (ex : versioned)
+        route = f"{request.path}?{json.dumps(args)}|{fmt}|{variant}"
+        versions = ".".join(map(str, self.tag_versions(tags)))
+        return f"resp:{hashlib.sha1(route.encode()).hexdigest()}:{versions}"
+
+    def get(self, key):
+        value = self.local.get(key)
+        if value is None and self.shared is not None:
+            value = self.shared.get(key)
+            if value is not None:
+                self.local.set(key, value, ex=self.ttl)
+        return value
+
+    def set(self, key, value, ttl):
+        self.local.set(key, value, ex=ttl)
+        if self.shared is not None:
+            self.shared.set(key, value, ex=ttl)
+        self.stats["stores"] += 1
+
+    def clear(self):
+        self.local.flushdb()
+        for name in self.stats:
+            self.stats[name] = 0
+
+    def snapshot(self):
+        return {
+            "stats": dict(self.stats),
+            "local_entries": len(self.local),
+            "shared": type(self.shared).__name__ if self.shared is not None else None,
+            "ttl": self.ttl,
+        }
+
+    # --- Décorateur ---
+    def cached(self, *tags, ttl=None):
+        """
+        Met en cache les réponses 200 (non streamées) d'un endpoint GET.
+
+        Args:
+            tags: tables dont dépend la réponse (ex : "operations_commerciales")
+            ttl: durée de vie propre à l'endpoint (défaut : celle du cache)
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                try:
+                    key = self.key(tags)
+                    entry = self.get(key)
+                except Exception as e:
+                    print(f"Cache des réponses indisponible : {e}")
+                    self.stats["errors"] += 1
+                    return view(*args, **kwargs)
+
+                if entry is not None:
+                    self.stats["hits"] += 1
+                    return self._restore(entry, "HIT")
+
+                self.stats["misses"] += 1
+                response = view(*args, **kwargs)
+                if not isinstance(response, Response):
+                    response = make_response(response)
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+
+                entry = self._dump(response)
+                try:
+                    self.set(key, entry, ttl or self.ttl)
+                except Exception as e:
+                    print(f"Réponse non mise en cache : {e}")
+                    self.stats["errors"] += 1
+                return self._restore(entry, "MISS")
+            return wrapper
+        return decorator
+
+    def _dump(self, response):
+        body = response.get_data()
+        meta = {
+            "mimetype": response.mimetype,
+            "headers": {name: response.headers[name] for name in self.HEADER_FIELDS if name in response.headers},
+            "etag": hashlib.sha1(body).hexdigest(),
+            "stored_at": time.time(),
+        }
+        return json.dumps(meta).encode() + b"\n" + body
+
+    def _restore(self, entry, status):
+        meta, body = entry.split(b"\n", 1)
+        meta = json.loads(meta)
+        if status == "HIT":
+            age = time.time() - meta["stored_at"]
+            body = self._age_data(meta, body, age)
+        response = Response(body, mimetype=meta["mimetype"], headers=meta["headers"])
+        response.set_etag(meta["etag"])
+        response.headers["X-Cache"] = status
+        if status == "HIT":
+            response.headers["Age"] = str(int(age))
+        return response.make_conditional(request)
+
+    @staticmethod
+    def _age_data(meta, body, age):
+        """
+        Vieillit de `age` secondes le champ "data_age_seconds" d'un corps JSON (âge des
+        données externes au moment de la mise en cache) et le recopie dans l'en-tête
+        X-Data-Age-Seconds, posé après la mise en cache pour les réponses calculées.
+        """
+        if meta["mimetype"] != "application/json" or b'"data_age_seconds"' not in body:
+            return body
+        payload = json.loads(body)
+        if not isinstance(payload, dict) or payload.get("data_age_seconds") is None:
+            return body
+        payload["data_age_seconds"] = round(payload["data_age_seconds"] + age, 1)
+        meta["headers"]["X-Data-Age-Seconds"] = str(payload["data_age_seconds"])
+        return json.dumps(payload).encode()
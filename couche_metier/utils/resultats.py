@@ -0,0 +1,55 @@
+def totals(df, keys, values, how="sum"):
+    """
+    Agrégation en une seule passe groupby multi-clés (ex: ["source", "responsable_id"]).
+
+    Args:
+        df: DataFrame assemblé par aggregate_data_multi
+        keys: colonne ou liste de colonnes de regroupement
+        values: colonne ou liste de colonnes à agréger
+        how: fonction d'agrégation pandas ("sum", "count", "nunique", ...)
+
+    Returns:
+        DataFrame à plat (clés en colonnes), trié par clés
+    """
+    return df.groupby(keys, observed=True)[values].agg(how).reset_index()
+
+
+def extreme_per_group(df, group, value, how="max"):
+    """
+    Ligne portant le maximum (ou minimum) de `value` dans chaque groupe,
+    sans boucle par groupe (idxmax/idxmin vectorisés).
+    """
+    grouped = df.groupby(group, observed=True)[value]
+    index = grouped.idxmax() if how == "max" else grouped.idxmin()
+    return df.loc[index.to_numpy()].reset_index(drop=True)
+
+
+def map_names(ids, mapping):
+    """
+    Traduit une série d'identifiants via `mapping` ; un identifiant inconnu est conservé.
+    """
+    return ids.map(mapping).fillna(ids)
+
+
+def records(df, columns, decimals=None):
+    """
+    Liste de dicts JSON construite par colonnes : chaque colonne est convertie une fois
+    en liste de valeurs Python natives (tolist), puis les lignes sont assemblées par zip.
+
+    Args:
+        df: DataFrame source
+        columns: {champ JSON: nom de colonne de df, ou Series alignée sur df}
+        decimals: {champ JSON: nombre de décimales} pour les champs à arrondir
+
+    Returns:
+        list[dict]
+    """
+    decimals = decimals or {}
+    names, arrays = [], []
+    for name, column in columns.items():
+        series = df[column] if isinstance(column, str) else column
+        if name in decimals:
+            series = series.round(decimals[name])
+        names.append(name)
+        arrays.append(series.tolist())
+    return [dict(zip(names, row)) for row in zip(*arrays)]
@@ -0,0 +1,34 @@
+import numpy as np
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+
+class Innov3DJSONProvider(DefaultJSONProvider):
+    """
+    Sérialiseur JSON de l'application, basé sur orjson (encodage natif, bien plus
+    rapide que json) : accepte en plus les scalaires et tableaux numpy produits
+    par les agrégations pandas. Les clés restent triées, comme avec Flask.
+    """
+
+    options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, np.generic):
+            return o.item()
+        if isinstance(o, np.ndarray):
+            return o.tolist()
+        return DefaultJSONProvider.default(o)
+
+    def dumps_bytes(self, obj):
+        """
+        Encode `obj` en JSON (bytes UTF-8).
+        """
+        return orjson.dumps(obj, default=self.default, option=self.options)
+
+    def dumps(self, obj, **kwargs):
+        return self.dumps_bytes(obj).decode()
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype=self.mimetype)
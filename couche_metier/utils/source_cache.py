@@ -0,0 +1,153 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from functools import partial
+
+
+def _resolved(data):
+    """
+    Renvoie un Future déjà résolu avec `data`.
+    """
+    future = Future()
+    future.set_result(data)
+    return future
+
+
+class SourceCache:
+    """
+    Cache LRU à durée de vie (TTL) des données brutes des sources externes,
+    partagé par tout le processus et indexé par (external_key, pays).
+
+    - donnée fraîche (âge < ttl) : servie directement
+    - donnée périmée (âge < ttl + stale_ttl) : servie directement, rafraîchie en arrière-plan
+    - donnée absente ou trop ancienne : téléchargée ; les appels simultanés
+      pour la même clé partagent un seul téléchargement
+
+    Un téléchargement annulé avant d'avoir démarré (Future.cancel, pool saturé) est
+    oublié : l'appel suivant en soumet un nouveau.
+    """
+
+    def __init__(self, executor, max_entries=64, default_ttl=60, stale_ttl=300):
+        self.executor = executor
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self._entries = OrderedDict()  # clé -> (données, instant de stockage)
+        self._inflight = {}            # clé -> Future du téléchargement en cours
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "errors": 0, "evictions": 0}
+
+    def get(self, key, loader, ttl=None, stale_ttl=None):
+        """
+        Renvoie un Future résolu avec les données de `key`.
+
+        Args:
+            key: (external_key, pays)
+            loader: fonction sans argument qui télécharge les données
+            ttl / stale_ttl: durées propres à la source (défaut : valeurs du cache)
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        stale_ttl = self.stale_ttl if stale_ttl is None else stale_ttl
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                data, stored_at = entry
+                age = time.monotonic() - stored_at
+                if age < ttl:
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return _resolved(data)
+                if age < ttl + stale_ttl:
+                    self._entries.move_to_end(key)
+                    self.stats["stale_hits"] += 1
+                    if key not in self._inflight:
+                        self.stats["refreshes"] += 1
+                    self._load(key, loader)
+                    return _resolved(data)
+
+            self.stats["misses"] += 1
+            return self._load(key, loader)
+
+    def refresh(self, key, loader):
+        """
+        Force le téléchargement de `key` quel que soit l'âge de l'entrée
+        (préchargement) ; partage un téléchargement déjà en cours.
+        """
+        with self._lock:
+            if key not in self._inflight:
+                self.stats["refreshes"] += 1
+            return self._load(key, loader)
+
+    def age(self, key):
+        """
+        Âge (en secondes) des données de `key`, None si absentes.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            return None if entry is None else time.monotonic() - entry[1]
+
+    def put(self, key, data):
+        """
+        Enregistre (ou remplace) les données de `key` et applique l'éviction LRU.
+        """
+        with self._lock:
+            self._entries[key] = (data, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def clear(self):
+        """
+        Vide le cache et remet les compteurs à zéro.
+        """
+        with self._lock:
+            self._entries.clear()
+            for name in self.stats:
+                self.stats[name] = 0
+
+    def snapshot(self):
+        """
+        Compteurs et âge (en secondes) de chaque entrée, pour la supervision.
+        """
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "stats": dict(self.stats),
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "entries": {
+                    "/".join(key): round(now - stored_at, 1)
+                    for key, (_, stored_at) in self._entries.items()
+                },
+            }
+
+    # --- Téléchargement (un seul à la fois par clé) ---
+    def _load(self, key, loader):
+        future = self._inflight.get(key)
+        if future is None:
+            future = self.executor.submit(self._run, key, loader)
+            self._inflight[key] = future
+            future.add_done_callback(partial(self._forget_cancelled, key))
+        return future
+
+    def _forget_cancelled(self, key, future):
+        if future.cancelled():
+            with self._lock:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+
+    def _run(self, key, loader):
+        try:
+            data = loader()
+        except Exception:
+            with self._lock:
+                self.stats["errors"] += 1
+                self._inflight.pop(key, None)
+            raise
+        self.put(key, data)
+        with self._lock:
+            self._inflight.pop(key, None)
+        return data
@@ -0,0 +1,84 @@
+import enum
+import unicodedata
+import numpy as np
+import pandas as pd
+
+
+def vocabulary_key(value):
+    """
+    Forme de comparaison d'une valeur brute : valeur d'un enum, dernier segment de
+    "Enum.membre", minuscules, sans accents ni espaces autour.
+    """
+    if isinstance(value, enum.Enum):
+        value = value.value
+    text = str(value).split(".")[-1].strip().lower()
+    return "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+
+
+class Vocabulary:
+    """
+    Vocabulaire commun d'une colonne partagée entre régions (ex: etat_emballage, type_op).
+
+    Les libellés canoniques sont ceux de l'API locale (valeurs des enums) ; chaque région
+    peut employer ses propres alias, déclarés dans le bloc "_settings.vocabularies" de
+    Innov3D_endpt.json. La traduction se fait sur les valeurs distinctes (pd.factorize)
+    puis par codes de catégorie, sans fonction appelée ligne à ligne.
+
+    Args:
+        labels: {libellé canonique: [alias, ...]}
+        name: nom de la colonne (messages)
+    """
+
+    def __init__(self, labels, name=""):
+        self.name = name
+        self.categories = list(labels)
+        self.lookup = {}
+        for code, (label, aliases) in enumerate(labels.items()):
+            for alias in [label, *aliases]:
+                self.lookup[vocabulary_key(alias)] = code
+
+    def _translate(self, values):
+        """
+        Codes bruts (pd.factorize), valeurs distinctes et code de catégorie de chacune (-1 si inconnue).
+        """
+        raw_codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=True)
+        mapped = np.array([self.lookup.get(vocabulary_key(u), -1) for u in uniques], dtype=np.int64)
+        return raw_codes, uniques, mapped
+
+    def codes(self, values):
+        """
+        Codes de catégorie (-1 si valeur absente ou inconnue) d'une série de valeurs brutes.
+        """
+        raw_codes, uniques, mapped = self._translate(values)
+
+        unknown = [u for u, code in zip(uniques, mapped) if code == -1]
+        if unknown:
+            print(f"Vocabulaire {self.name} : valeurs inconnues ignorées {unknown}")
+
+        mapped = np.append(mapped, -1)  # raw_codes == -1 (valeur manquante) -> -1
+        return mapped[raw_codes]
+
+    def normalize(self, values, keep_unknown=False):
+        """
+        Série catégorielle des libellés canoniques, de même index que `values`.
+        Une valeur absente donne NaN ; une valeur inconnue aussi, sauf avec keep_unknown=True
+        où elle est gardée telle quelle (valeur d'un enum, sinon texte brut) comme catégorie
+        supplémentaire.
+        """
+        if not keep_unknown:
+            categorical = pd.Categorical.from_codes(self.codes(values), categories=self.categories)
+            return pd.Series(categorical, index=getattr(values, "index", None), name=self.name)
+
+        raw_codes, uniques, mapped = self._translate(values)
+        categories = list(self.categories)
+        for position, code in enumerate(mapped):
+            if code == -1:
+                raw = uniques[position]
+                label = raw.value if isinstance(raw, enum.Enum) else str(raw)
+                if label not in categories:
+                    categories.append(label)
+                mapped[position] = categories.index(label)
+
+        mapped = np.append(mapped, -1)
+        categorical = pd.Categorical.from_codes(mapped[raw_codes], categories=categories)
+        return pd.Series(categorical, index=getattr(values, "index", None), name=self.name)
@@ -5,8 +5,16 @@ from couche_metier.general.post_routes import write_bp
 from couche_metier.general.get_routes import general_bp
 from couche_metier.recherche_developpement import rd_bp
 from couche_metier.finance_gestion import finance_bp
+from couche_data.db_changes import on_commit
+from couche_metier.utils.compression import init_compression
+from couche_metier.utils.data_agregation import SETTINGS, init_external_sources, response_cache
+from couche_metier.utils.serialisation import Innov3DJSONProvider
 
 app = create_app()
+app.json = Innov3DJSONProvider(app)
+init_external_sources(app)
+on_commit(response_cache.invalidate)  # une écriture invalide les réponses qui dépendent de ses tables
+init_compression(app, **SETTINGS.get("compression", {}))
 
 # Enregistrement des blueprints
 app.register_blueprint(assistance_bp)